@@ -70,6 +70,7 @@ with DAG(
                 "MONGO_DB": os.getenv("MONGO_DB"),
                 "MONGO_HEALTHCHECK_RETRIES": os.getenv("MONGO_HEALTHCHECK_RETRIES"),
                 "INSARAMA_NET": os.getenv("INSARAMA_NET"),
+                "STAGING_FORMAT": os.getenv("STAGING_FORMAT"),
             },
         )
 
@@ -128,6 +129,32 @@ with DAG(
             environment={
                 "DATA_FILE_DIRECTORY": os.getenv("SCRAPPER_DATA_FILE_DIRECTORY"),
                 "NUMBER_OF_MEDIA_TO_SCRAP": os.getenv("NUMBER_OF_MEDIA_TO_SCRAP"),
+                "SCRAPPER_PARALLEL_CATEGORIES": os.getenv(
+                    "SCRAPPER_PARALLEL_CATEGORIES"
+                ),
+                "SCRAPPER_QUOTAS": os.getenv("SCRAPPER_QUOTAS"),
+                "SCRAPPER_MAX_WORKERS": os.getenv("SCRAPPER_MAX_WORKERS"),
+                "SCRAPPER_MAX_REQUESTS_PER_HOST": os.getenv(
+                    "SCRAPPER_MAX_REQUESTS_PER_HOST"
+                ),
+                "SCRAPPER_BROWSE_LOOKAHEAD": os.getenv("SCRAPPER_BROWSE_LOOKAHEAD"),
+                "SCRAPPER_FAN_OUT_SECTIONS": os.getenv("SCRAPPER_FAN_OUT_SECTIONS"),
+                "SCRAPPER_POOL_CONNECTIONS": os.getenv("SCRAPPER_POOL_CONNECTIONS"),
+                "SCRAPPER_POOL_MAXSIZE": os.getenv("SCRAPPER_POOL_MAXSIZE"),
+                "SCRAPPER_CACHE_ENABLED": os.getenv("SCRAPPER_CACHE_ENABLED"),
+                "SCRAPPER_CACHE_TTLS": os.getenv("SCRAPPER_CACHE_TTLS"),
+                "SCRAPPER_OFFLINE_REPLAY": os.getenv("SCRAPPER_OFFLINE_REPLAY"),
+                "SCRAPPER_INITIAL_RATE": os.getenv("SCRAPPER_INITIAL_RATE"),
+                "SCRAPPER_MIN_RATE": os.getenv("SCRAPPER_MIN_RATE"),
+                "SCRAPPER_MAX_RATE": os.getenv("SCRAPPER_MAX_RATE"),
+                "SCRAPPER_TARGET_LATENCY": os.getenv("SCRAPPER_TARGET_LATENCY"),
+                "SCRAPPER_HTML_PARSER": os.getenv("SCRAPPER_HTML_PARSER"),
+                "SCRAPPER_PARTIAL_PARSING": os.getenv("SCRAPPER_PARTIAL_PARSING"),
+                "SCRAPPER_LEAN_MEDIA": os.getenv("SCRAPPER_LEAN_MEDIA"),
+                "SCRAPPER_MEMORY_LOG_EVERY": os.getenv("SCRAPPER_MEMORY_LOG_EVERY"),
+                "SCRAPPER_CHECKPOINT_MAX_AGE": os.getenv("SCRAPPER_CHECKPOINT_MAX_AGE"),
+                "SCRAPPER_OUTPUT_FORMAT": os.getenv("SCRAPPER_OUTPUT_FORMAT"),
+                "SCRAPPER_SHARD_MAX_RECORDS": os.getenv("SCRAPPER_SHARD_MAX_RECORDS"),
             },
             mounts=[
                 Mount(
@@ -162,6 +189,16 @@ with DAG(
                 "METACRITIC_DATA_FILE_DIRECTORY": os.getenv(
                     "SCRAPPER_DATA_FILE_DIRECTORY"
                 ),
+                "WRANGLER_TYPED_DECODING": os.getenv("WRANGLER_TYPED_DECODING"),
+                "WRANGLER_PROCESSES": os.getenv("WRANGLER_PROCESSES"),
+                "IMDB_CACHE_DIRECTORY": os.getenv("IMDB_CACHE_DIRECTORY"),
+                "WRANGLER_SPILL_DIRECTORY": os.getenv("WRANGLER_SPILL_DIRECTORY"),
+                "WRANGLER_MEMORY_BUDGET_MB": os.getenv("WRANGLER_MEMORY_BUDGET_MB"),
+                "SURROGATE_KEY_STRATEGY": os.getenv("SURROGATE_KEY_STRATEGY"),
+                "SURROGATE_KEYS": os.getenv("SURROGATE_KEYS"),
+                # Staging
+                "STAGING_FORMAT": os.getenv("STAGING_FORMAT"),
+                "STAGING_DATA_FILE_DIRECTORY": os.getenv("STAGING_DATA_FILE_DIRECTORY"),
                 # Mongo
                 "MONGO_USERNAME": os.getenv("MONGO_USERNAME"),
                 "MONGO_PASSWORD": os.getenv("MONGO_PASSWORD"),
@@ -186,6 +223,7 @@ with DAG(
             image="staging/sqlpersistor",
             api_version="auto",
             auto_remove=True,
+            mount_tmp_dir=False,
             command="sh -c '/app/scripts/start.sh'",
             docker_url="unix://var/run/docker.sock",
             network_mode=os.getenv("INSARAMA_NET"),
@@ -203,7 +241,19 @@ with DAG(
                 "DW_POSTGRES_USER": os.getenv("DW_POSTGRES_USER"),
                 "DW_POSTGRES_PASSWORD": os.getenv("DW_POSTGRES_PASSWORD"),
                 "DW_POSTGRES_LOAD_BATCH_SIZE": os.getenv("DW_POSTGRES_LOAD_BATCH_SIZE"),
+                "SURROGATE_KEY_STRATEGY": os.getenv("SURROGATE_KEY_STRATEGY"),
+                "SURROGATE_KEYS": os.getenv("SURROGATE_KEYS"),
+                # Staging
+                "STAGING_FORMAT": os.getenv("STAGING_FORMAT"),
+                "STAGING_DATA_FILE_DIRECTORY": os.getenv("STAGING_DATA_FILE_DIRECTORY"),
             },
+            mounts=[
+                Mount(
+                    source="insarama_source_data",
+                    target=os.getenv("DATA_FILE_DIRECTORY"),
+                    type="volume",
+                )
+            ],
         )
 
         # --- Tâche 4b : Persisting to Neo4J ---
@@ -213,6 +263,7 @@ with DAG(
             image="staging/neo4jpersistor",
             api_version="auto",
             auto_remove=True,
+            mount_tmp_dir=False,
             command="sh -c '/app/scripts/start.sh'",
             docker_url="unix://var/run/docker.sock",
             network_mode=os.getenv("INSARAMA_NET"),
@@ -227,7 +278,17 @@ with DAG(
                 # Neo4J
                 "DW_NEO_HOST": os.getenv("DW_NEO_HOST"),
                 "DW_NEO_LOAD_BATCH_SIZE": os.getenv("DW_NEO_LOAD_BATCH_SIZE"),
+                # Staging
+                "STAGING_FORMAT": os.getenv("STAGING_FORMAT"),
+                "STAGING_DATA_FILE_DIRECTORY": os.getenv("STAGING_DATA_FILE_DIRECTORY"),
             },
+            mounts=[
+                Mount(
+                    source="insarama_source_data",
+                    target=os.getenv("DATA_FILE_DIRECTORY"),
+                    type="volume",
+                )
+            ],
         )
 
         stop_mongo_server = BashOperator(
@@ -3,6 +3,12 @@
 # ------------------------------
 # start-compose.sh
 # ------------------------------
+
+if [ "$STAGING_FORMAT" = "parquet" ]; then
+  echo "< Parquet staging: no transient MongoDB server needed >"
+  exit 0
+fi
+
 echo "[ Checking for existing container '$MONGO_HOST_NAME'... ]"
 # On supprime (-f force) le conteneur. 
 # "|| true" permet de ne pas planter le script si le conteneur n'existe pas.
@@ -0,0 +1,63 @@
+from typing import Callable
+from utils.logger import LOG
+import queue
+import threading
+
+WriteJob = Callable[[], None]
+Submit = Callable[[WriteJob], None]
+
+
+class CrawlOrchestrator:
+    """
+    Runs the category crawls in parallel, one thread per category.
+    Crawls share the HTTP client (pool + rate limiter) of their scrappers and
+    hand every write (JSON file, journal) to a single writer thread, in order.
+    """
+
+    _STOP = object()
+
+    def __init__(self, write_queue_size: int = 64):
+        # Bounded: a slow disk slows the crawls down instead of piling up media
+        self._write_queue = queue.Queue(maxsize=write_queue_size)
+        self._crawls: dict[str, Callable[[Submit], None]] = {}
+        self.errors: dict[str, Exception] = {}
+
+    def add(self, name: str, crawl: Callable[[Submit], None]) -> None:
+        # crawl(submit) scrapes a category and submits its write jobs
+        self._crawls[name] = crawl
+
+    def submit(self, job: WriteJob) -> None:
+        self._write_queue.put(job)
+
+    def _writer(self) -> None:
+        while True:
+            job = self._write_queue.get()
+            if job is self._STOP:
+                return
+            try:
+                job()
+            except Exception as e:
+                LOG.error(f"Write failed: {e}")
+
+    def _run_crawl(self, name: str, crawl: Callable[[Submit], None]) -> None:
+        try:
+            crawl(self.submit)
+        except Exception as e:
+            # Other categories keep going
+            LOG.error(f"{name} crawl failed: {e}")
+            self.errors[name] = e
+
+    def run(self) -> dict[str, Exception]:
+        writer = threading.Thread(target=self._writer, name="writer")
+        writer.start()
+        crawlers = [
+            threading.Thread(target=self._run_crawl, args=(name, crawl), name=name)
+            for name, crawl in self._crawls.items()
+        ]
+        for crawler in crawlers:
+            crawler.start()
+        for crawler in crawlers:
+            crawler.join()
+        self._write_queue.put(self._STOP)
+        writer.join()
+        return self.errors
@@ -1,15 +1,88 @@
 from urllib.parse import quote_plus
+from functools import partial
 import os
-import json
+import sys
 from metacritic_scrapper import *
+from crawl_orchestrator import CrawlOrchestrator, Submit
 
+from utils import (
+    HttpClient,
+    ResponseCache,
+    PageParser,
+    AdaptiveRateLimiter,
+    CheckpointJournal,
+    ShardSink,
+    peak_rss_mb,
+    serializer,
+)
 from utils.logger import LOG
 
 DATA_FILE_DIRECTORY = os.environ.get("DATA_FILE_DIRECTORY")
 NUMBER_OF_MEDIA_TO_SCRAP = int(os.environ.get("NUMBER_OF_MEDIA_TO_SCRAP"))
+# Per category quota overrides: "GAMES=500,MOVIES=200"
+SCRAPPER_QUOTAS = {
+    name.strip(): int(quota)
+    for name, quota in (
+        item.split("=", 1)
+        for item in os.environ.get("SCRAPPER_QUOTAS", "").split(",")
+        if "=" in item
+    )
+}
+# Crawl the three categories at once, saves go through a single writer thread
+SCRAPPER_PARALLEL_CATEGORIES = (
+    os.environ.get("SCRAPPER_PARALLEL_CATEGORIES", "0") == "1"
+)
+# Concurrent crawl: number of media scraped at once and requests in flight per host
+SCRAPPER_MAX_WORKERS = int(os.environ.get("SCRAPPER_MAX_WORKERS", 1))
+SCRAPPER_MAX_REQUESTS_PER_HOST = int(
+    os.environ.get("SCRAPPER_MAX_REQUESTS_PER_HOST", 4)
+)
+# Browse pages loaded ahead of the one being scraped
+SCRAPPER_BROWSE_LOOKAHEAD = int(os.environ.get("SCRAPPER_BROWSE_LOOKAHEAD", 0))
+# Fetch every platform/season review batch of a media at once
+SCRAPPER_FAN_OUT_SECTIONS = os.environ.get("SCRAPPER_FAN_OUT_SECTIONS", "0") == "1"
+# Keep-alive pool: hosts kept and connections kept per host
+SCRAPPER_POOL_CONNECTIONS = int(os.environ.get("SCRAPPER_POOL_CONNECTIONS", 4))
+SCRAPPER_POOL_MAXSIZE = int(
+    os.environ.get("SCRAPPER_POOL_MAXSIZE", SCRAPPER_MAX_REQUESTS_PER_HOST)
+)
+# On-disk response cache: re-runs only ask the server for stale pages
+SCRAPPER_CACHE_ENABLED = os.environ.get("SCRAPPER_CACHE_ENABLED", "0") == "1"
+SCRAPPER_CACHE_DIRECTORY = os.environ.get(
+    "SCRAPPER_CACHE_DIRECTORY", f"{DATA_FILE_DIRECTORY}/.http_cache"
+)
+SCRAPPER_CACHE_TTLS = ResponseCache.parse_ttls(os.environ.get("SCRAPPER_CACHE_TTLS"))
+# Replay a previous crawl from the cache only, without any network request
+SCRAPPER_OFFLINE_REPLAY = os.environ.get("SCRAPPER_OFFLINE_REPLAY", "0") == "1"
+# HTML backend ("lxml" or "html.parser") and parsing of the read containers only
+SCRAPPER_HTML_PARSER = os.environ.get("SCRAPPER_HTML_PARSER", "html.parser")
+SCRAPPER_PARTIAL_PARSING = os.environ.get("SCRAPPER_PARTIAL_PARSING", "0") == "1"
+# Adaptive pace per host (requests/s), 0 disables the rate limiter
+SCRAPPER_INITIAL_RATE = float(os.environ.get("SCRAPPER_INITIAL_RATE", 0))
+SCRAPPER_MIN_RATE = float(os.environ.get("SCRAPPER_MIN_RATE", 0.5))
+SCRAPPER_MAX_RATE = float(os.environ.get("SCRAPPER_MAX_RATE", 20))
+# Responses slower than this (seconds) slow the host pace down
+SCRAPPER_TARGET_LATENCY = float(os.environ.get("SCRAPPER_TARGET_LATENCY", 2.0))
+# Drop the main page parse tree of every yielded media
+SCRAPPER_LEAN_MEDIA = os.environ.get("SCRAPPER_LEAN_MEDIA", "0") == "1"
+# Peak RSS is logged every N saved media
+SCRAPPER_MEMORY_LOG_EVERY = int(os.environ.get("SCRAPPER_MEMORY_LOG_EVERY", 1000))
+# Crawl journals: a crashed run resumes at its last browse cursor
+SCRAPPER_CHECKPOINT_DIRECTORY = os.environ.get(
+    "SCRAPPER_CHECKPOINT_DIRECTORY", f"{DATA_FILE_DIRECTORY}/.checkpoints"
+)
+# Seconds a saved media is not scraped again (0: always re-scraped)
+SCRAPPER_CHECKPOINT_MAX_AGE = float(
+    os.environ.get("SCRAPPER_CHECKPOINT_MAX_AGE", 7 * 24 * 3600)
+)
+# "json": one pretty-printed file per media, "ndjson": rolling gzip shards per category
+SCRAPPER_OUTPUT_FORMAT = os.environ.get("SCRAPPER_OUTPUT_FORMAT", "json")
+SCRAPPER_SHARD_MAX_RECORDS = int(os.environ.get("SCRAPPER_SHARD_MAX_RECORDS", 5000))
 
 
-def save_game_json(media, output_folder=f"{DATA_FILE_DIRECTORY}/GAMES"):
+def save_game_json(
+    media, output_folder=f"{DATA_FILE_DIRECTORY}/GAMES", sink: ShardSink | None = None
+):
     os.makedirs(output_folder, exist_ok=True)
 
     filename = f"{media.element_pagination_title}.json"
@@ -27,14 +100,21 @@ def save_game_json(media, output_folder=f"{DATA_FILE_DIRECTORY}/GAMES"):
         },
     }
 
-    with open(os.path.join(output_folder, filename), "w", encoding="utf8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    if sink is not None:
+        sink.write(media.element_pagination_title, data)
+        LOG.info(f"Saved record → {media.element_pagination_title}")
+        return
+
+    with open(os.path.join(output_folder, filename), "wb") as f:
+        f.write(serializer.dumps(data, pretty=True))
 
     LOG.info(f"Saved JSON → {filename}")
 
 
 def save_movie_json(
-    media: MediaInfoPages, output_folder=f"{DATA_FILE_DIRECTORY}/MOVIES"
+    media: MediaInfoPages,
+    output_folder=f"{DATA_FILE_DIRECTORY}/MOVIES",
+    sink: ShardSink | None = None,
 ):
     os.makedirs(output_folder, exist_ok=True)
 
@@ -53,15 +133,24 @@ def save_movie_json(
         },
     }
 
+    if sink is not None:
+        sink.write(media.element_pagination_title, data)
+        LOG.info(f"Saved record → {media.element_pagination_title}")
+        return
+
     filepath = os.path.join(output_folder, filename)
 
-    with open(filepath, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    with open(filepath, "wb") as f:
+        f.write(serializer.dumps(data, pretty=True))
 
     LOG.info(f"Saved JSON: {filepath}")
 
 
-def save_tv_json(media, output_folder=f"{DATA_FILE_DIRECTORY}/TV_SHOWS"):
+def save_tv_json(
+    media,
+    output_folder=f"{DATA_FILE_DIRECTORY}/TV_SHOWS",
+    sink: ShardSink | None = None,
+):
     os.makedirs(output_folder, exist_ok=True)
 
     filename = f"{media.element_pagination_title}.json"
@@ -79,46 +168,181 @@ def save_tv_json(media, output_folder=f"{DATA_FILE_DIRECTORY}/TV_SHOWS"):
         },
     }
 
-    with open(os.path.join(output_folder, filename), "w", encoding="utf8") as f:
-        json.dump(data, f, indent=4, ensure_ascii=False)
+    if sink is not None:
+        sink.write(media.element_pagination_title, data)
+        LOG.info(f"Saved record → {media.element_pagination_title}")
+        return
+
+    with open(os.path.join(output_folder, filename), "wb") as f:
+        f.write(serializer.dumps(data, pretty=True))
 
     LOG.info(f"Saved JSON → {filename}")
 
 
-if __name__ == "__main__":
+def log_memory(count: int) -> None:
+    if count % SCRAPPER_MEMORY_LOG_EVERY == 0:
+        LOG.info(f"Peak RSS after {count} media: {peak_rss_mb():.1f} MB")
 
-    LOG.info("Starting Metacritic Scrapper...")
 
-    scr_TV_SHOWS = MetacriticScrapper(
-        MetacriticCategory.TV_SHOWS, user_agent={"User-agent": "Mozilla/5.0"}
+def scrap_category(
+    category: MetacriticCategory,
+    user_agent: dict[str:str],
+    save_media,
+    label: str,
+    http_client: HttpClient,
+    page_parser: PageParser,
+    submit: Submit | None = None,
+) -> None:
+    # submit: hands write jobs to the orchestrator writer, run inline when None
+    submit = submit or (lambda job: job())
+    quota = SCRAPPER_QUOTAS.get(category.name, NUMBER_OF_MEDIA_TO_SCRAP)
+    journal = CheckpointJournal(
+        f"{SCRAPPER_CHECKPOINT_DIRECTORY}/{category.name}.checkpoint.jsonl",
+        max_age=SCRAPPER_CHECKPOINT_MAX_AGE,
     )
+    start_page = 1
     count = 0
-    for media in scr_TV_SHOWS:
-        LOG.info(f"\n===  Saving Tv_shows {count+1}===")
-        save_tv_json(media)
-        count += 1
-        if count >= NUMBER_OF_MEDIA_TO_SCRAP:
-            break
-
-    scr_GAMES = MetacriticScrapper(
-        MetacriticCategory.GAMES, user_agent={"User-agent": "Mozilla/5.0"}
+    if journal.resumable:
+        start_page = journal.cursor[0]
+        count = journal.run_saved
+        LOG.info(f"Resuming {category} at page {start_page} ({count} media saved)")
+    journal.start()
+    sink = None
+    if SCRAPPER_OUTPUT_FORMAT == "ndjson":
+        sink = ShardSink(
+            f"{DATA_FILE_DIRECTORY}/{category.name}",
+            max_records_per_shard=SCRAPPER_SHARD_MAX_RECORDS,
+        )
+
+    def finish(completed: bool = True) -> None:
+        # A failed crawl keeps its journal resumable, files are closed either way
+        if completed:
+            journal.mark_completed()
+        journal.close()
+        if sink is not None:
+            sink.close()
+
+    if count >= quota:
+        submit(finish)
+        return
+
+    def already_saved(slug: str) -> bool:
+        if not journal.is_fresh(slug):
+            return False
+        if sink is not None:
+            return slug in sink
+        return os.path.exists(f"{DATA_FILE_DIRECTORY}/{category.name}/{slug}.json")
+
+    completed = False
+    scr = None
+    try:
+        scr = MetacriticScrapper(
+            category,
+            user_agent=user_agent,
+            max_workers=SCRAPPER_MAX_WORKERS,
+            http_client=http_client,
+            fan_out_sections=SCRAPPER_FAN_OUT_SECTIONS,
+            page_parser=page_parser,
+            lean=SCRAPPER_LEAN_MEDIA,
+            start_page=start_page,
+            skip_slug=already_saved,
+            browse_lookahead=SCRAPPER_BROWSE_LOOKAHEAD,
+        )
+        for media in scr:
+            count += 1
+
+            def write(media=media, cursor=scr.cursor, count=count) -> None:
+                LOG.info(f"\n===  Saving {label} {count}===")
+                save_media(media, sink=sink)
+                journal.record_saved(media.element_pagination_title, cursor)
+                log_memory(count)
+
+            submit(write)
+            if count >= quota:
+                break
+        completed = True
+    finally:
+        if scr is not None:
+            scr.close()
+        # Runs even when the crawl raises, the journal and shards are not left open
+        submit(partial(finish, completed))
+    LOG.info(f"HTTP connection stats: {http_client.stats()}")
+
+
+if __name__ == "__main__":
+
+    LOG.info("Starting Metacritic Scrapper...")
+
+    response_cache = None
+    if SCRAPPER_CACHE_ENABLED or SCRAPPER_OFFLINE_REPLAY:
+        LOG.info(f"Using response cache at <{SCRAPPER_CACHE_DIRECTORY}>")
+        response_cache = ResponseCache(SCRAPPER_CACHE_DIRECTORY, SCRAPPER_CACHE_TTLS)
+
+    rate_limiter = None
+    if SCRAPPER_INITIAL_RATE > 0:
+        rate_limiter = AdaptiveRateLimiter(
+            initial_rate=SCRAPPER_INITIAL_RATE,
+            min_rate=SCRAPPER_MIN_RATE,
+            max_rate=SCRAPPER_MAX_RATE,
+            target_latency=SCRAPPER_TARGET_LATENCY,
+        )
+
+    # One pooled client for every category, connections stay warm between them
+    http_client = HttpClient(
+        pool_connections=SCRAPPER_POOL_CONNECTIONS,
+        pool_maxsize=SCRAPPER_POOL_MAXSIZE,
+        max_requests_per_host=SCRAPPER_MAX_REQUESTS_PER_HOST,
+        cache=response_cache,
+        offline=SCRAPPER_OFFLINE_REPLAY,
+        rate_limiter=rate_limiter,
     )
-    count = 0
-    for media in scr_GAMES:
-        LOG.info(f"\n===  Saving game {count+1}===")
-        save_game_json(media)
-        count += 1
-        if count >= NUMBER_OF_MEDIA_TO_SCRAP:
-            break
-
-    scr_MOVIES = MetacriticScrapper(
-        MetacriticCategory.MOVIES,
-        user_agent={"User-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"},
+    page_parser = PageParser(
+        backend=SCRAPPER_HTML_PARSER, partial=SCRAPPER_PARTIAL_PARSING
     )
-    count = 0
-    for media in scr_MOVIES:
-        LOG.info(f"\n=== Saving movie {count+1}===")
-        save_movie_json(media)
-        count += 1
-        if count >= NUMBER_OF_MEDIA_TO_SCRAP:
-            break
+
+    crawls = [
+        (
+            MetacriticCategory.TV_SHOWS,
+            {"User-agent": "Mozilla/5.0"},
+            save_tv_json,
+            "Tv_shows",
+        ),
+        (
+            MetacriticCategory.GAMES,
+            {"User-agent": "Mozilla/5.0"},
+            save_game_json,
+            "game",
+        ),
+        (
+            MetacriticCategory.MOVIES,
+            {"User-agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64)"},
+            save_movie_json,
+            "movie",
+        ),
+    ]
+    if SCRAPPER_PARALLEL_CATEGORIES:
+        orchestrator = CrawlOrchestrator()
+        for category, user_agent, save_media, label in crawls:
+            orchestrator.add(
+                category.name,
+                partial(
+                    scrap_category,
+                    category,
+                    user_agent,
+                    save_media,
+                    label,
+                    http_client,
+                    page_parser,
+                ),
+            )
+        errors = orchestrator.run()
+        if errors:
+            LOG.error(f"Failed categories: {', '.join(errors)}")
+            http_client.close()
+            sys.exit(1)
+    else:
+        for category, user_agent, save_media, label in crawls:
+            scrap_category(
+                category, user_agent, save_media, label, http_client, page_parser
+            )
+    http_client.close()
@@ -1,18 +1,29 @@
+from typing import Callable
 from bs4 import BeautifulSoup
 from metacritic_review import MetacriticReview
 from attr import dataclass
 
 
-@dataclass
+@dataclass(slots=True)
 class MediaInfoPages:
     element_pagination_title: str
-    main_page: BeautifulSoup
+    # None in lean mode: the parse tree is dropped once the details are extracted
+    main_page: BeautifulSoup | None
 
     # platform/season: reviews list
     critic_reviews: dict[str, list[MetacriticReview]]
     user_reviews: dict[str, list[MetacriticReview]]
 
     media_details: dict | None = None
+    # Lean mode: re-creates the main page soup on demand (served by the response cache if enabled)
+    main_page_loader: Callable[[], BeautifulSoup] | None = None
+
+    def get_main_page(self) -> BeautifulSoup | None:
+        if self.main_page is not None:
+            return self.main_page
+        if self.main_page_loader is not None:
+            return self.main_page_loader()  # not kept, callers own the tree
+        return None
 
     def to_dict(self):
         return {
@@ -1,4 +1,6 @@
+from concurrent.futures import Executor
 from metacritic_review import MetacriticReview
+from utils import HttpClient
 import requests
 import time
 import random
@@ -12,6 +14,8 @@ class MetacriticReviewAPIHandler:
         isCritics: bool = True,
         response_limit: int = 20,
         max_retries: int = 3,
+        http_client: HttpClient | None = None,
+        executor: Executor | None = None,
     ):
         if "User-agent" not in user_agent:
             raise ValueError(f"User-agent not defined: {user_agent}")
@@ -21,11 +25,16 @@ class MetacriticReviewAPIHandler:
         self.isCritics = isCritics
         self.response_limit = response_limit
         self.max_retries = max_retries
+        self.http_client = http_client
+        # Offsets are fetched concurrently when an executor is given
+        self.executor = executor
 
         # Safe initialization
         data = self._requestReviewAPI(0)
         self.totalReviews = int(data.get("totalResults", 0))
         self._init_error = data.get("_error")
+        # Offset 0 already fetched, reused by getReviews
+        self._first_batch = data
 
     # RETRY + GRACEFUL FAILURE
 
@@ -39,7 +48,7 @@ class MetacriticReviewAPIHandler:
 
         for attempt in range(1, self.max_retries + 1):
             try:
-                response = requests.get(api_link, headers=self.USER_AGENT, timeout=10)
+                response = self._get(api_link)
             except Exception as e:
                 last_error = {
                     "type": "request_exception",
@@ -48,6 +57,17 @@ class MetacriticReviewAPIHandler:
                     "url": api_link,
                 }
             else:
+                # Throttled answers were already retried by the HTTP client
+                if self.http_client is not None and self.http_client.retries(
+                    response.status_code
+                ):
+                    last_error = {
+                        "type": "throttled",
+                        "status_code": response.status_code,
+                        "attempt": attempt,
+                        "url": api_link,
+                    }
+                    break
                 # Retry only on server-side issues
                 if response.status_code >= 500:
                     last_error = {
@@ -56,6 +76,9 @@ class MetacriticReviewAPIHandler:
                         "attempt": attempt,
                         "url": api_link,
                     }
+                    # Offline replay miss, retrying cannot help
+                    if getattr(response, "from_cache", False):
+                        break
                 else:
                     try:
                         payload = response.json()
@@ -88,11 +111,19 @@ class MetacriticReviewAPIHandler:
             "_error": {**last_error, "retries_exhausted": True},
         }
 
+    def _get(self, api_link: str) -> requests.Response:
+        if self.http_client is None:
+            return requests.get(api_link, headers=self.USER_AGENT, timeout=10)
+        return self.http_client.get(api_link, headers=self.USER_AGENT, timeout=10)
+
     def getTotalReviews(self) -> int:
         return self.totalReviews
 
     def getReviewBatch(self, offset: int) -> list[MetacriticReview]:
-        data = self._requestReviewAPI(offset)
+        if offset == 0 and self._first_batch is not None:
+            data = self._first_batch
+        else:
+            data = self._requestReviewAPI(offset)
 
         if data.get("_error"):
             return []
@@ -105,8 +136,15 @@ class MetacriticReviewAPIHandler:
         if self.totalReviews == 0:
             return []
 
+        offsets = range(0, min(self.totalReviews, self.response_limit), 10)
+        if self.executor is None:
+            batches = [self.getReviewBatch(offset) for offset in offsets]
+        else:
+            # map keeps the offset order
+            batches = self.executor.map(self.getReviewBatch, offsets)
+
         reviews = []
-        for offset in range(0, min(self.totalReviews, self.response_limit), 10):
-            reviews.extend(self.getReviewBatch(offset))
+        for batch in batches:
+            reviews.extend(batch)
 
         return reviews
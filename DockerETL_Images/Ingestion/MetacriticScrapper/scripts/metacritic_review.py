@@ -2,6 +2,18 @@ import textwrap
 
 
 class MetacriticReview:
+    # No per-instance __dict__: a crawl keeps hundreds of thousands of reviews alive
+    __slots__ = (
+        "author",
+        "company",
+        "quote",
+        "rating",
+        "post_date",
+        "full_review_src_url",
+        "spoiler",
+        "isCritic",
+    )
+
     author: str
     company: str | None
     quote: str
@@ -1,9 +1,12 @@
-import requests
 import re
 
+from collections import deque
+from functools import partial
+from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
 from metacritic_api_handler import MetacriticReviewAPIHandler
 from media_info_pages import MediaInfoPages
-from utils import MetacriticCategory
+from utils import MetacriticCategory, HttpClient, PageParser, PageType
 from bs4 import BeautifulSoup
 
 
@@ -34,13 +37,76 @@ class MetacriticScrapper:
 
         PLATFORM_LI = "c-gameDetails_listItem " + "g-color-gray70 " + "u-inline-block"
 
-    def __init__(self, category: MetacriticCategory, user_agent: dict[str:str]):
+    def __init__(
+        self,
+        category: MetacriticCategory,
+        user_agent: dict[str:str],
+        max_workers: int = 1,
+        max_requests_per_host: int = 4,
+        http_client: HttpClient | None = None,
+        fan_out_sections: bool = False,
+        page_parser: PageParser | None = None,
+        lean: bool = False,
+        start_page: int = 1,
+        skip_slug: Callable[[str], bool] | None = None,
+        browse_lookahead: int = 0,
+    ):
         if "User-agent" not in user_agent:
             raise f"User-agent not defined: {user_agent}"
+        if max_workers <= 0:
+            raise ValueError(f"max_workers must be > 0 (current: {max_workers})")
+        if browse_lookahead < 0:
+            raise ValueError(
+                f"browse_lookahead must be >= 0 (current: {browse_lookahead})"
+            )
 
-        self.page_num = 1  # 581 for testing end
+        self.page_num = start_page  # 581 for testing end
         self.current_elmt_num = 1
         self.USER_AGENT = user_agent
+        # Resume: slugs already saved are not scraped again
+        self.skip_slug = skip_slug
+        # (page_num, element number) of the last yielded media
+        self.cursor = None
+
+        # Concurrent crawl: up to max_workers media scraped at once, yielded in browse order
+        self.max_workers = max_workers
+        # Pooled keep-alive client, shared between scrappers when given
+        self._owns_http_client = http_client is None
+        self.http_client = http_client or HttpClient(
+            max_requests_per_host=max_requests_per_host
+        )
+        max_requests_per_host = self.http_client.host_limiter.max_requests_per_host
+        # HTML backend (lxml / html.parser), optionally only building the read containers
+        self.page_parser = page_parser or PageParser()
+        # Lean mode: yielded media do not keep their main page parse tree alive
+        self.lean = lean
+        self._media_executor = None
+        self._section_executor = None
+        self._request_executor = None
+        self._pending_media = deque()
+        if max_workers > 1:
+            self._media_executor = ThreadPoolExecutor(
+                max_workers=max_workers, thread_name_prefix="media"
+            )
+        # Fan-out: every platform/season critic and user review handler runs at once
+        if fan_out_sections:
+            self._section_executor = ThreadPoolExecutor(
+                max_workers=2 * max_requests_per_host, thread_name_prefix="section"
+            )
+        # Prefetch: the next browse_lookahead pages are loaded while the current one is scraped
+        self.browse_lookahead = browse_lookahead
+        self._browse_executor = None
+        self._browse_prefetch = {}
+        if browse_lookahead > 0:
+            self._browse_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="browse"
+            )
+        if max_workers > 1 or fan_out_sections:
+            # Leaf requests only (review API offsets), never waits on other tasks
+            self._request_executor = ThreadPoolExecutor(
+                max_workers=2 * max_requests_per_host, thread_name_prefix="request"
+            )
+
         # Pagination details to obtain browse page, review APIs and platform/season info container tag
         if category == MetacriticCategory.GAMES:
             self.pagination_info = {
@@ -67,53 +133,132 @@ class MetacriticScrapper:
             f"https://www.metacritic.com/browse/{self.pagination_info["browse"]}/"
         )
 
+        self.MAX_PAGES = self.page_num  # Known once the first page is loaded
         self._loadCurrentPage()
 
-        self.MAX_PAGES = int(
-            self.browse_page_soup.find_all("span", class_=self.cssClassTags.NAV_SPAN)[
-                -1
-            ]
-            .find("span", class_=self.cssClassTags.NAV_INNER_SPAN)
-            .text.strip()
+        nav_spans = self.browse_page_soup.find_all(
+            "span", class_=self.cssClassTags.NAV_SPAN
         )
+        # No pagination: single page, or first browse page missing from offline cache
+        self.MAX_PAGES = 1
+        if nav_spans:
+            self.MAX_PAGES = int(
+                nav_spans[-1]
+                .find("span", class_=self.cssClassTags.NAV_INNER_SPAN)
+                .text.strip()
+            )
 
         # self.MAX_PAGES = 582 # for testing end
+        self._prefetchBrowsePages()
 
     def __iter__(self):
         return self
 
     def __next__(self) -> MediaInfoPages:
+        if self._media_executor is None:
+            element = self._takeNextElement()
+            if element is None:
+                raise StopIteration
+            self.cursor, element_title = element
+            return self._extractMediaInfo(element_title)
+
+        # Keep the window of media in flight full
+        while len(self._pending_media) < self.max_workers:
+            element = self._takeNextElement()
+            if element is None:
+                break
+            cursor, element_title = element
+            self._pending_media.append(
+                (
+                    cursor,
+                    self._media_executor.submit(self._extractMediaInfo, element_title),
+                )
+            )
+
+        if not self._pending_media:
+            self.close()
+            raise StopIteration
+
+        self.cursor, future = self._pending_media.popleft()
+        return future.result()
+
+    def close(self) -> None:
+        # Drops media still in flight (e.g. quota reached) and stops worker threads
+        for _, future in self._pending_media:
+            future.cancel()
+        self._pending_media.clear()
+        for future in self._browse_prefetch.values():
+            future.cancel()
+        self._browse_prefetch.clear()
+        for executor in (
+            self._browse_executor,
+            self._media_executor,
+            self._section_executor,
+            self._request_executor,
+        ):
+            if executor is not None:
+                executor.shutdown(wait=True, cancel_futures=True)
+        if self._owns_http_client:
+            self.http_client.close()
+
+    def _moveToNextElement(self) -> bool:
         # if all elements viewed, load next page
-        if self.current_elmt_num > self.max_elements:
+        while self.current_elmt_num > self.max_elements:
             print("Loading next page...")
             self.page_num += 1
             if self.page_num > self.MAX_PAGES:
                 print("All pages viewed.")
-                raise StopIteration
+                return False
             self._loadCurrentPage()
-
-        return self._extractMediaInfoFromCurrent()
+        return True
 
     def _loadCurrentPage(self) -> None:
         self.current_elmt_num = 1  # Reset current element number
-        self.browse_page_soup = self._loadPageFromUrl(
-            self.url + f"?page={self.page_num}"
-        )  # Load page soup
-        self._extractCurrentPageElements()
+        prefetched = self._browse_prefetch.pop(self.page_num, None)
+        if prefetched is not None:
+            self.browse_page_soup, self.browse_element_list = prefetched.result()
+        else:
+            self.browse_page_soup, self.browse_element_list = self._fetchBrowsePage(
+                self.page_num
+            )
+        self.max_elements = len(self.browse_element_list)
+        self._prefetchBrowsePages()
         print(f"Loaded page {self.page_num} with {self.max_elements} elements.")
 
-    def _loadPageFromUrl(self, url) -> BeautifulSoup:
-        response = requests.get(url, headers=self.USER_AGENT)
-        return BeautifulSoup(response.text, "html.parser")
+    def _fetchBrowsePage(self, page_num: int) -> tuple[BeautifulSoup, list[str]]:
+        soup = self._loadPageFromUrl(self.url + f"?page={page_num}", PageType.BROWSE)
+        return soup, self._extractPageElements(soup)
+
+    def _prefetchBrowsePages(self) -> None:
+        # Bounded lookahead: at most browse_lookahead pages loaded ahead
+        if self._browse_executor is None:
+            return
+        last_page = min(self.page_num + self.browse_lookahead, self.MAX_PAGES)
+        for page_num in range(self.page_num + 1, last_page + 1):
+            if page_num not in self._browse_prefetch:
+                self._browse_prefetch[page_num] = self._browse_executor.submit(
+                    self._fetchBrowsePage, page_num
+                )
+
+    def _loadPageFromUrl(self, url, page_type: PageType | None = None) -> BeautifulSoup:
+        response = self.http_client.get(url, headers=self.USER_AGENT)
+        if response.status_code != 200:
+            print(f"Got HTTP {response.status_code} for {url}")
+        return self.page_parser.parse(response.text, page_type)
 
-    def _extractCurrentPageElements(self) -> None:
-        elements_container = self.browse_page_soup.find(
+    def _extractPageElements(self, browse_page_soup: BeautifulSoup) -> list[str]:
+        browse_element_list = []
+        listings = browse_page_soup.find(
             "div", class_=self.cssClassTags.PAGE_ELMTS_CONTAINER
-        ).findChildren("div", class_=self.cssClassTags.PAGE_ELMTS_SUBCONTAINER)
+        )
+        if listings is None:  # e.g. page not in offline cache
+            return browse_element_list
+        elements_container = listings.findChildren(
+            "div", class_=self.cssClassTags.PAGE_ELMTS_SUBCONTAINER
+        )
         # There are two subcontainers to search
-        self.browse_element_list = []
-        for i in range(2):
-            for elmt in elements_container[i].find_all(
+        for container in elements_container[:2]:
+            for elmt in container.find_all(
                 "div", class_=self.cssClassTags.ELEMENT_CONTAINER, recursive=False
             ):
                 a = elmt.find("a", class_=self.cssClassTags.ELMT_a)
@@ -123,8 +268,8 @@ class MetacriticScrapper:
                     trimmed = a["href"][:-1]
                     # we find the first / from the right thus taking TITLE
                     element_pagination_title = trimmed[trimmed.rfind("/") + 1 :]
-                    self.browse_element_list.append(element_pagination_title)
-        self.max_elements = len(self.browse_element_list)
+                    browse_element_list.append(element_pagination_title)
+        return browse_element_list
 
     def _extractCastFromCredits(self, slug: str, browse_type: str):
         """
@@ -132,7 +277,7 @@ class MetacriticScrapper:
         browse_type must be 'movie' or 'tv'
         """
         credits_url = f"https://www.metacritic.com/{browse_type}/{slug}/credits/"
-        soup = self._loadPageFromUrl(credits_url)
+        soup = self._loadPageFromUrl(credits_url, PageType.CREDITS)
 
         cast = []
 
@@ -463,23 +608,68 @@ class MetacriticScrapper:
 
         return media_details
 
-    def _extractMediaInfoFromCurrent(self) -> MediaInfoPages:
+    def _takeNextElement(self) -> tuple[tuple[int, int], str] | None:
+        # Next (cursor, title) to scrape, skipped slugs are passed over
+        while self._moveToNextElement():
+            cursor = (self.page_num, self.current_elmt_num)
+            current_element_title = self.browse_element_list[self.current_elmt_num - 1]
+            self.current_elmt_num += 1  # This element already taken
+            if self.skip_slug is not None and self.skip_slug(current_element_title):
+                print(f"Skipping already saved {current_element_title}")
+                continue
+            return cursor, current_element_title
+        return None
+
+    def _buildReviewAPIHandler(
+        self, base_link: str, isCritics: bool
+    ) -> MetacriticReviewAPIHandler:
+        return MetacriticReviewAPIHandler(
+            base_link,
+            user_agent=self.USER_AGENT,
+            isCritics=isCritics,
+            http_client=self.http_client,
+            executor=self._request_executor,
+        )
+
+    def _fetchSectionReviews(
+        self, review_jobs: list[tuple[str, str, bool]]
+    ) -> tuple[dict, dict]:
+        """
+        review_jobs: [(section_display, review_base_link, isCritics), ...]
+        Fetched concurrently in fan-out mode, merged back in job order.
+        """
+
+        def fetch(job):
+            _, base_link, isCritics = job
+            return self._buildReviewAPIHandler(base_link, isCritics).getReviews()
+
+        if self._section_executor is None:
+            results = map(fetch, review_jobs)
+        else:
+            results = self._section_executor.map(fetch, review_jobs)
+
+        critic_reviews = {}
+        user_reviews = {}
+        for (section_display, _, isCritics), reviews in zip(review_jobs, results):
+            if isCritics:
+                critic_reviews[section_display] = reviews
+            else:
+                user_reviews[section_display] = reviews
+        return critic_reviews, user_reviews
+
+    def _extractMediaInfo(self, current_element_title: str) -> MediaInfoPages:
         main_soup = None
         media_details = None
 
-        current_element_title = self.browse_element_list[self.current_elmt_num - 1]
-        self.current_elmt_num += 1  # This element already taken
-
         review_p_inf = self.pagination_info["reviews"]
 
         main_page_link = f"https://www.metacritic.com/{self.pagination_info["browse"]}/{current_element_title}/"
         critics_reviews_base_link = f"critic/{review_p_inf[0]}/{current_element_title}"
         user_reviews_base_link = f"user/{review_p_inf[0]}/{current_element_title}"
 
-        main_soup = self._loadPageFromUrl(main_page_link)
+        main_soup = self._loadPageFromUrl(main_page_link, PageType.MEDIA)
 
-        critic_reviews = {}
-        user_reviews = {}
+        review_jobs = []
 
         # VIDEO GAMES
         if review_p_inf[1]:  # if contains sections
@@ -508,45 +698,40 @@ class MetacriticScrapper:
                         continue
                     section_display = section_slug
 
-                criticsReviewHandler = MetacriticReviewAPIHandler(
-                    critics_reviews_base_link + f"/{review_p_inf[1]}/{section_slug}",
-                    user_agent=self.USER_AGENT,
-                    isCritics=True,
+                section_link = f"/{review_p_inf[1]}/{section_slug}"
+                review_jobs.append(
+                    (section_display, critics_reviews_base_link + section_link, True)
                 )
-
-                userReviewHandler = MetacriticReviewAPIHandler(
-                    user_reviews_base_link + f"/{review_p_inf[1]}/{section_slug}",
-                    user_agent=self.USER_AGENT,
-                    isCritics=False,
+                review_jobs.append(
+                    (section_display, user_reviews_base_link + section_link, False)
                 )
 
-                critic_reviews[section_display] = criticsReviewHandler.getReviews()
-                user_reviews[section_display] = userReviewHandler.getReviews()
-
         else:
             # MOVIES
-            criticsReviewHandler = MetacriticReviewAPIHandler(
-                critics_reviews_base_link, user_agent=self.USER_AGENT, isCritics=True
-            )
-            userReviewHandler = MetacriticReviewAPIHandler(
-                user_reviews_base_link, user_agent=self.USER_AGENT, isCritics=False
-            )
-
-            critic_reviews["_default"] = criticsReviewHandler.getReviews()
-            user_reviews["_default"] = userReviewHandler.getReviews()
+            review_jobs.append(("_default", critics_reviews_base_link, True))
+            review_jobs.append(("_default", user_reviews_base_link, False))
 
-            main_soup = self._loadPageFromUrl(main_page_link)
             media_details = self._extractMovieDetails(main_soup)
             media_details["cast"] = self._extractCastFromCredits(
                 slug=current_element_title, browse_type=self.pagination_info["browse"]
             )
 
+        critic_reviews, user_reviews = self._fetchSectionReviews(review_jobs)
+
+        main_page_loader = None
+        if self.lean:
+            main_soup = None
+            main_page_loader = partial(
+                self._loadPageFromUrl, main_page_link, PageType.MEDIA
+            )
+
         return MediaInfoPages(
             element_pagination_title=current_element_title,
             main_page=main_soup,
             critic_reviews=critic_reviews,
             user_reviews=user_reviews,
             media_details=media_details,
+            main_page_loader=main_page_loader,
         )
 
         # We need to call api links for critics cause of lazy load :(  , either critic or user
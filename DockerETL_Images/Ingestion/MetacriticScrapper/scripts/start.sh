@@ -2,12 +2,23 @@
 set -e
 
 mkdir -p "$DATA_FILE_DIRECTORY"
+CHECKPOINT_DIRECTORY="${SCRAPPER_CHECKPOINT_DIRECTORY:-$DATA_FILE_DIRECTORY/.checkpoints}"
 
-if find "$DATA_FILE_DIRECTORY" -maxdepth 2 -type f -name "*.json" -print -quit | grep -q .; then
-  echo "At least one Media JSON file exists..."
+# A crawl journal not ending with "completed" belongs to a crashed run
+interrupted_crawl() {
+  for journal in "$CHECKPOINT_DIRECTORY"/*.checkpoint.jsonl; do
+    [ -f "$journal" ] || continue
+    tail -n 1 "$journal" | grep -q '"completed"' || return 0
+  done
+  return 1
+}
+
+if interrupted_crawl; then
+  echo "Interrupted crawl found, resuming..."
+  exec python ./scripts/main.py
+elif find "$DATA_FILE_DIRECTORY" -maxdepth 2 -type f \( -name "*.json" -o -name "*.ndjson.gz" \) -print -quit | grep -q .; then
+  echo "At least one Media JSON file or shard exists..."
 else
   echo "No Media JSON files found"
   exec python ./scripts/main.py
 fi
-
-
@@ -1,4 +1,30 @@
 from .execution import safe_execute, ExitCode, SUCCESS, FAILURE
 from .metacritic_category import MetacriticCategory
+from .host_limiter import HostLimiter
+from .rate_limiter import AdaptiveRateLimiter
+from .http_client import HttpClient
+from .response_cache import ResponseCache, CachedResponse
+from .page_parser import PageParser, PageType
+from .memory import peak_rss_mb
+from .checkpoint import CheckpointJournal
+from .shard_sink import ShardSink
+from . import serializer
 
-__all__ = ["safe_execute", "ExitCode", "SUCCESS", "FAILURE", "MetacriticCategory"]
+__all__ = [
+    "safe_execute",
+    "ExitCode",
+    "SUCCESS",
+    "FAILURE",
+    "MetacriticCategory",
+    "HostLimiter",
+    "AdaptiveRateLimiter",
+    "HttpClient",
+    "ResponseCache",
+    "CachedResponse",
+    "PageParser",
+    "PageType",
+    "peak_rss_mb",
+    "CheckpointJournal",
+    "ShardSink",
+    "serializer",
+]
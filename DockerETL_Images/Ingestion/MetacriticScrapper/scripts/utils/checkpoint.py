@@ -0,0 +1,90 @@
+from pathlib import Path
+import json
+import os
+import threading
+import time
+
+
+class CheckpointJournal:
+    """
+    Append-only JSONL journal of a category crawl, one event per line:
+    {"event": "started"}                                  new crawl from page 1
+    {"event": "saved", "slug", "page", "index", "at"}     media saved, browse cursor
+    {"event": "completed"}                                quota reached or all pages viewed
+    A crawl that stopped before "completed" is resumed from its last cursor.
+    """
+
+    def __init__(self, path: str | Path, max_age: float | None = None):
+        # max_age: seconds a saved slug is skipped by later runs (None: forever)
+        self.path = Path(path)
+        self.max_age = max_age
+        self.saved: dict[str, float] = {}
+        self.cursor: tuple[int, int] | None = None
+        self.run_saved = 0
+        self.completed = False
+        self._lock = threading.Lock()
+        self._replay()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def _replay(self) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # line torn by a crash
+                self._apply(record)
+
+    def _apply(self, record: dict) -> None:
+        if record["event"] == "started":
+            self.cursor = None
+            self.run_saved = 0
+            self.completed = False
+        elif record["event"] == "saved":
+            self.saved[record["slug"]] = record["at"]
+            self.cursor = (record["page"], record["index"])
+            self.run_saved += 1
+        elif record["event"] == "completed":
+            self.completed = True
+
+    def _append(self, record: dict) -> None:
+        with self._lock:
+            self._apply(record)
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+
+    @property
+    def resumable(self) -> bool:
+        return self.cursor is not None and not self.completed
+
+    def start(self) -> None:
+        # Keeps the crawl of a crashed run, otherwise starts a new one
+        if not self.resumable:
+            self._append({"event": "started"})
+
+    def is_fresh(self, slug: str) -> bool:
+        if slug not in self.saved:
+            return False
+        return self.max_age is None or time.time() - self.saved[slug] < self.max_age
+
+    def record_saved(self, slug: str, cursor: tuple[int, int]) -> None:
+        page, index = cursor
+        self._append(
+            {
+                "event": "saved",
+                "slug": slug,
+                "page": page,
+                "index": index,
+                "at": time.time(),
+            }
+        )
+
+    def mark_completed(self) -> None:
+        self._append({"event": "completed"})
+
+    def close(self) -> None:
+        self._file.close()
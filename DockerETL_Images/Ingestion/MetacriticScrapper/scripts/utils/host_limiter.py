@@ -0,0 +1,33 @@
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+import threading
+
+
+class HostLimiter:
+    """
+    Caps the number of requests in flight per host.
+    One bounded semaphore is lazily created for every host seen.
+    """
+
+    def __init__(self, max_requests_per_host: int = 4):
+        if max_requests_per_host <= 0:
+            raise ValueError(
+                f"max_requests_per_host must be > 0 (current: {max_requests_per_host})"
+            )
+        self.max_requests_per_host = max_requests_per_host
+        self._semaphores: dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _semaphore(self, host: str) -> threading.BoundedSemaphore:
+        with self._lock:
+            if host not in self._semaphores:
+                self._semaphores[host] = threading.BoundedSemaphore(
+                    self.max_requests_per_host
+                )
+            return self._semaphores[host]
+
+    @contextmanager
+    def slot(self, url: str):
+        # Blocks until the url's host has a free slot, released on exit
+        with self._semaphore(urlsplit(url).netloc):
+            yield
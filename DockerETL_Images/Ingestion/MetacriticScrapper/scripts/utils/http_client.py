@@ -0,0 +1,164 @@
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
+from .host_limiter import HostLimiter
+from .response_cache import ResponseCache, CachedResponse
+from .rate_limiter import AdaptiveRateLimiter
+import requests
+import threading
+import time
+
+
+class HttpClient:
+    """
+    Pooled HTTP client shared by every fetch path of the ingestion image.
+    Keep-alive connections are reused per host (www / backend.metacritic.com),
+    so each media stops paying a TCP + TLS handshake per request.
+    """
+
+    def __init__(
+        self,
+        pool_connections: int = 4,
+        pool_maxsize: int | None = None,
+        max_requests_per_host: int = 4,
+        timeout: float = 10,
+        cache: ResponseCache | None = None,
+        offline: bool = False,
+        rate_limiter: AdaptiveRateLimiter | None = None,
+        throttle_retries: int = 3,
+    ):
+        # pool_connections: number of hosts kept in the pool manager
+        # pool_maxsize: keep-alive connections kept per host, at least one per request in flight
+        self.host_limiter = HostLimiter(max_requests_per_host)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self._adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize or max_requests_per_host,
+        )
+        self.session.mount("https://", self._adapter)
+        self.session.mount("http://", self._adapter)
+
+        # Offline replay: only the cache is read, misses answer 504 (only-if-cached)
+        if offline and cache is None:
+            raise ValueError("Offline mode needs a response cache")
+        self.cache = cache
+        self.offline = offline
+        # Adaptive pace per host, 429 / 503 answers are retried once the host cools down
+        self.rate_limiter = rate_limiter
+        self.throttle_retries = throttle_retries
+
+        self._lock = threading.Lock()
+        self._host_stats: dict[str, dict] = {}
+
+    def get(
+        self, url: str, headers: dict | None = None, timeout: float | None = None
+    ) -> requests.Response | CachedResponse:
+        host = urlsplit(url).hostname
+        entry = None
+        if self.cache is not None:
+            entry = self.cache.lookup(url)
+            if entry and (self.offline or self.cache.is_fresh(entry)):
+                self._count(host, "cache_hits")
+                return self.cache.load(entry)
+            if self.offline:
+                self._count(host, "cache_misses")
+                return CachedResponse(url, 504, b"")
+            if entry:
+                headers = (headers or {}) | self.cache.conditional_headers(entry)
+
+        response = self._fetch(url, host, headers, timeout or self.timeout)
+
+        if self.cache is not None:
+            if response.status_code == 304 and entry:
+                self._count(host, "cache_revalidated")
+                self.cache.touch(entry)
+                return self.cache.load(entry)
+            if response.status_code == 200:
+                self.cache.store(url, response)
+        return response
+
+    def _fetch(
+        self, url: str, host: str, headers: dict | None, timeout: float
+    ) -> requests.Response:
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire(host)
+            start = time.perf_counter()
+            try:
+                with self.host_limiter.slot(url):
+                    response = self.session.get(url, headers=headers, timeout=timeout)
+            except Exception:
+                self._record(host, time.perf_counter() - start, 0, failed=True)
+                raise
+            elapsed = time.perf_counter() - start
+            self._record(host, elapsed, len(response.content))
+
+            if self.rate_limiter is None:
+                return response
+            self.rate_limiter.observe(
+                host, response.status_code, elapsed, response.headers.get("Retry-After")
+            )
+            if (
+                response.status_code not in AdaptiveRateLimiter.THROTTLE_STATUSES
+                or attempt >= self.throttle_retries
+            ):
+                return response
+            attempt += 1
+            self._count(host, "throttle_retries")
+
+    def retries(self, status_code: int) -> bool:
+        # Statuses already retried with backoff by _fetch, callers do not retry them again
+        return (
+            self.rate_limiter is not None
+            and status_code in AdaptiveRateLimiter.THROTTLE_STATUSES
+        )
+
+    def _host_entry(self, host: str) -> dict:
+        return self._host_stats.setdefault(
+            host, {"requests": 0, "errors": 0, "bytes": 0, "elapsed_s": 0.0}
+        )
+
+    def _record(self, host: str, elapsed: float, size: int, failed=False) -> None:
+        with self._lock:
+            stats = self._host_entry(host)
+            stats["requests"] += 1
+            stats["errors"] += int(failed)
+            stats["bytes"] += size
+            stats["elapsed_s"] += elapsed
+
+    def _count(self, host: str, counter: str) -> None:
+        with self._lock:
+            stats = self._host_entry(host)
+            stats[counter] = stats.get(counter, 0) + 1
+
+    def stats(self) -> dict[str, dict]:
+        # Per host: requests sent, connections opened (handshakes paid), bytes, time, cache use
+        # and current pace (rate, queue depth, throttle events)
+        with self._lock:
+            host_stats = {host: dict(s) for host, s in self._host_stats.items()}
+
+        pools = self._adapter.poolmanager.pools
+        for key in pools.keys():
+            pool = pools.get(key)
+            if pool is None:
+                continue
+            stats = host_stats.setdefault(
+                pool.host, {"requests": 0, "errors": 0, "bytes": 0, "elapsed_s": 0.0}
+            )
+            stats["connections_opened"] = (
+                stats.get("connections_opened", 0) + pool.num_connections
+            )
+
+        if self.rate_limiter is not None:
+            for host, limiter_stats in self.rate_limiter.stats().items():
+                host_stats.setdefault(
+                    host, {"requests": 0, "errors": 0, "bytes": 0, "elapsed_s": 0.0}
+                ).update(limiter_stats)
+
+        for stats in host_stats.values():
+            stats["elapsed_s"] = round(stats["elapsed_s"], 3)
+        return host_stats
+
+    def close(self) -> None:
+        self.session.close()
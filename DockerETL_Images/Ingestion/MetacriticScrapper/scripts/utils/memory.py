@@ -0,0 +1,10 @@
+import resource
+import sys
+
+
+def peak_rss_mb() -> float:
+    # Peak resident set size of the process (ru_maxrss is in KB on Linux, bytes on macOS)
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if sys.platform == "darwin":
+        peak /= 1024
+    return peak / 1024
@@ -0,0 +1,104 @@
+from enum import StrEnum
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:  # bs4 >= 4.13: parse_only accepts any ElementFilter
+    from bs4.filter import ElementFilter
+except ImportError:
+    ElementFilter = None
+
+try:
+    import lxml  # noqa: F401
+
+    LXML_AVAILABLE = True
+except ImportError:
+    LXML_AVAILABLE = False
+
+
+class PageType(StrEnum):
+    BROWSE = "browse"
+    MEDIA = "media"
+    CREDITS = "credits"
+
+
+# Top level containers read by MetacriticScrapper for each page type,
+# everything outside of them is skipped while parsing
+KEPT_CLASSES = {
+    PageType.BROWSE: {"c-productListings", "c-navigationPagination_item"},
+    PageType.MEDIA: {
+        "c-productDetails_staff_directors",
+        "c-productDetails_staff_writers",
+        "c-ProductionDetails",
+        "c-productionDetailsGame_esrb_title",
+        "c-gameDetails",
+        "c-gamePlatformTileLink",
+        "c-productionDetailsTv",
+    },
+    PageType.CREDITS: set(),
+}
+KEPT_TEST_IDS = {
+    PageType.MEDIA: {"details-award-summary", "seasons-modal-card"},
+}
+KEPT_TAGS = {
+    PageType.CREDITS: {"h3", "dl"},
+}
+
+
+def _keep_tag(page_type: PageType, name: str, attrs) -> bool:
+    if name in KEPT_TAGS.get(page_type, ()):
+        return True
+    attrs = attrs or {}
+    # Inline scripts carry the nuxt summary
+    if page_type == PageType.MEDIA and name == "script" and "src" not in attrs:
+        return True
+    if attrs.get("data-testid") in KEPT_TEST_IDS.get(page_type, ()):
+        return True
+    classes = attrs.get("class") or ()
+    if isinstance(classes, str):
+        classes = classes.split()
+    return not KEPT_CLASSES[page_type].isdisjoint(classes)
+
+
+if ElementFilter is not None:
+
+    class _ContainerFilter(ElementFilter):
+        def __init__(self, page_type: PageType):
+            super().__init__()
+            self.page_type = page_type
+
+        def allow_tag_creation(self, nsprefix, name, attrs) -> bool:
+            return _keep_tag(self.page_type, name, attrs)
+
+        def allow_string_creation(self, string: str) -> bool:
+            # Text outside of kept containers is never read
+            return False
+
+
+def build_strainer(page_type: PageType):
+    if ElementFilter is not None:
+        return _ContainerFilter(page_type)
+    # bs4 < 4.13 calls name functions with (name, attrs)
+    return SoupStrainer(lambda name, attrs=None: _keep_tag(page_type, name, attrs))
+
+
+class PageParser:
+    """
+    Pluggable HTML parsing for the scraper.
+    backend : "lxml" (C parser, falls back to "html.parser" when not installed) or "html.parser"
+    partial : only builds the containers read for each PageType (SoupStrainer-style)
+    """
+
+    def __init__(self, backend: str = "html.parser", partial: bool = False):
+        if backend == "lxml" and not LXML_AVAILABLE:
+            print("lxml not installed, falling back to html.parser")
+            backend = "html.parser"
+        self.backend = backend
+        self.partial = partial
+        self._strainers = {
+            page_type: build_strainer(page_type) for page_type in PageType
+        }
+
+    def parse(self, markup: str, page_type: PageType | None = None) -> BeautifulSoup:
+        parse_only = None
+        if self.partial and page_type is not None:
+            parse_only = self._strainers[page_type]
+        return BeautifulSoup(markup, self.backend, parse_only=parse_only)
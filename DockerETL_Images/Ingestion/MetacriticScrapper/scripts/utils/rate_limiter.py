@@ -0,0 +1,133 @@
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+import threading
+import time
+
+
+class _HostBucket:
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated_at = time.monotonic()
+        self.paused_until = 0.0
+        self.waiting = 0
+        self.throttle_events = 0
+        self.slowdowns = 0
+
+
+class AdaptiveRateLimiter:
+    """
+    Token bucket per host with an AIMD rate:
+    - every fast successful response adds `increase` requests/s (up to max_rate)
+    - 429 / 503 halve the rate and pause the host for Retry-After seconds
+    - responses slower than target_latency shrink the rate by 10%
+    """
+
+    THROTTLE_STATUSES = (429, 503)
+
+    def __init__(
+        self,
+        initial_rate: float = 5,
+        min_rate: float = 0.5,
+        max_rate: float = 20,
+        burst: float | None = None,
+        increase: float = 0.1,
+        target_latency: float = 2.0,
+    ):
+        if not 0 < min_rate <= initial_rate <= max_rate:
+            raise ValueError(
+                f"Expected 0 < min_rate <= initial_rate <= max_rate "
+                f"(current: {min_rate}, {initial_rate}, {max_rate})"
+            )
+        self.initial_rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.burst = burst or initial_rate
+        self.increase = increase
+        self.target_latency = target_latency
+        self._buckets: dict[str, _HostBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> _HostBucket:
+        # Called with the lock held
+        if host not in self._buckets:
+            self._buckets[host] = _HostBucket(self.initial_rate, self.burst)
+        return self._buckets[host]
+
+    def acquire(self, host: str) -> float:
+        # Blocks until the host has a token, returns the time waited
+        waited = 0.0
+        with self._lock:
+            bucket = self._bucket(host)
+            bucket.waiting += 1
+        try:
+            while True:
+                with self._lock:
+                    now = time.monotonic()
+                    bucket.tokens = min(
+                        bucket.burst,
+                        bucket.tokens + (now - bucket.updated_at) * bucket.rate,
+                    )
+                    bucket.updated_at = now
+                    if now >= bucket.paused_until and bucket.tokens >= 1:
+                        bucket.tokens -= 1
+                        return waited
+                    delay = max(
+                        bucket.paused_until - now, (1 - bucket.tokens) / bucket.rate
+                    )
+                time.sleep(delay)
+                waited += delay
+        finally:
+            with self._lock:
+                bucket.waiting -= 1
+
+    def observe(
+        self, host: str, status_code: int, latency: float, retry_after: str | None
+    ) -> None:
+        with self._lock:
+            bucket = self._bucket(host)
+            if status_code in self.THROTTLE_STATUSES:
+                bucket.throttle_events += 1
+                bucket.rate = max(self.min_rate, bucket.rate / 2)
+                bucket.tokens = min(bucket.tokens, 0)
+                pause = self.parse_retry_after(retry_after)
+                if pause:
+                    bucket.paused_until = max(
+                        bucket.paused_until, time.monotonic() + pause
+                    )
+            elif latency > self.target_latency:
+                bucket.slowdowns += 1
+                bucket.rate = max(self.min_rate, bucket.rate * 0.9)
+            elif status_code < 400:
+                bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+
+    @staticmethod
+    def parse_retry_after(retry_after: str | None) -> float:
+        # Retry-After is either delay-seconds or an HTTP date
+        if not retry_after:
+            return 0.0
+        try:
+            return max(0.0, float(retry_after))
+        except ValueError:
+            pass
+        try:
+            retry_at = parsedate_to_datetime(retry_after)
+        except (TypeError, ValueError):
+            return 0.0
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def stats(self) -> dict[str, dict]:
+        # Per host: current rate (requests/s), callers waiting for a token, 429/503 and latency slowdowns
+        with self._lock:
+            return {
+                host: {
+                    "rate": round(bucket.rate, 2),
+                    "queue_depth": bucket.waiting,
+                    "throttle_events": bucket.throttle_events,
+                    "slowdowns": bucket.slowdowns,
+                }
+                for host, bucket in self._buckets.items()
+            }
@@ -0,0 +1,165 @@
+from urllib.parse import urlsplit
+from pathlib import Path
+import hashlib
+import json
+import os
+import tempfile
+import time
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Seconds a cached response is served without asking the server again
+DEFAULT_TTLS = {
+    "browse": 6 * HOUR,  # listings move every day
+    "reviews": 1 * DAY,
+    "media": 7 * DAY,
+    "credits": 30 * DAY,  # cast almost never changes
+}
+
+
+class CachedResponse:
+    """
+    Minimal requests.Response stand-in served from the cache
+    (status_code, headers, content, text, json()).
+    """
+
+    def __init__(
+        self,
+        url: str,
+        status_code: int,
+        content: bytes,
+        headers: dict | None = None,
+        encoding: str | None = None,
+    ):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers or {}
+        self.encoding = encoding or "utf-8"
+        self.from_cache = True
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class ResponseCache:
+    """
+    Content-addressed on-disk HTTP cache.
+    index/<url hash>.meta   : url, validators (ETag / Last-Modified), fetch time, body hash
+    objects/<body hash>     : response body, stored once for identical payloads
+    """
+
+    VALIDATOR_HEADERS = ("ETag", "Last-Modified", "Content-Type")
+
+    def __init__(self, directory: str | Path, ttls: dict[str, float] | None = None):
+        self.directory = Path(directory)
+        self.ttls = DEFAULT_TTLS | (ttls or {})
+        (self.directory / "index").mkdir(parents=True, exist_ok=True)
+        (self.directory / "objects").mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def parse_ttls(ttls_str: str | None) -> dict[str, float]:
+        # "browse=3600,credits=2592000" -> {"browse": 3600.0, "credits": 2592000.0}
+        ttls = {}
+        for item in (ttls_str or "").split(","):
+            if "=" not in item:
+                continue
+            url_class, seconds = item.split("=", 1)
+            ttls[url_class.strip()] = float(seconds)
+        return ttls
+
+    @staticmethod
+    def classify(url: str) -> str:
+        parts = urlsplit(url)
+        if parts.netloc.startswith("backend."):
+            return "reviews"
+        if parts.path.startswith("/browse/"):
+            return "browse"
+        if parts.path.rstrip("/").endswith("/credits"):
+            return "credits"
+        return "media"
+
+    def _index_path(self, url: str) -> Path:
+        url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()
+        return self.directory / "index" / url_hash[:2] / f"{url_hash}.meta"
+
+    def _object_path(self, content_hash: str) -> Path:
+        return self.directory / "objects" / content_hash[:2] / content_hash
+
+    @staticmethod
+    def _atomic_write(path: Path, data: bytes) -> None:
+        # Concurrent fetchers may write the same entry, readers never see partial files
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=".tmp-")
+        with os.fdopen(fd, "wb") as tmp:
+            tmp.write(data)
+        os.replace(tmp_path, path)
+
+    def lookup(self, url: str) -> dict | None:
+        try:
+            with open(self._index_path(url), "r", encoding="utf-8") as f:
+                entry = json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+        if not self._object_path(entry["content_hash"]).exists():
+            return None
+        return entry
+
+    def is_fresh(self, entry: dict) -> bool:
+        ttl = self.ttls.get(entry["url_class"], 0)
+        return time.time() - entry["fetched_at"] < ttl
+
+    @staticmethod
+    def conditional_headers(entry: dict) -> dict:
+        headers = {}
+        if entry["headers"].get("ETag"):
+            headers["If-None-Match"] = entry["headers"]["ETag"]
+        if entry["headers"].get("Last-Modified"):
+            headers["If-Modified-Since"] = entry["headers"]["Last-Modified"]
+        return headers
+
+    def load(self, entry: dict) -> CachedResponse:
+        content = self._object_path(entry["content_hash"]).read_bytes()
+        return CachedResponse(
+            entry["url"],
+            entry["status_code"],
+            content,
+            headers=entry["headers"],
+            encoding=entry["encoding"],
+        )
+
+    def store(self, url: str, response) -> None:
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        object_path = self._object_path(content_hash)
+        if not object_path.exists():
+            self._atomic_write(object_path, response.content)
+
+        entry = {
+            "url": url,
+            "url_class": self.classify(url),
+            "status_code": response.status_code,
+            "headers": {
+                h: response.headers[h]
+                for h in self.VALIDATOR_HEADERS
+                if h in response.headers
+            },
+            "encoding": response.encoding,
+            "content_hash": content_hash,
+            "fetched_at": time.time(),
+        }
+        self._write_entry(url, entry)
+
+    def touch(self, entry: dict) -> None:
+        # 304 Not Modified: cached body still valid for a new TTL
+        entry["fetched_at"] = time.time()
+        self._write_entry(entry["url"], entry)
+
+    def _write_entry(self, url: str, entry: dict) -> None:
+        self._atomic_write(
+            self._index_path(url), json.dumps(entry, ensure_ascii=False).encode("utf-8")
+        )
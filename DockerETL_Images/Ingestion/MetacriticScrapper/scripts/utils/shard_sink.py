@@ -0,0 +1,91 @@
+from pathlib import Path
+from . import serializer
+import gzip
+import json
+import threading
+
+
+class ShardSink:
+    """
+    Rolling gzip NDJSON output of one category, instead of one JSON file per media:
+    part-00000.ndjson.gz ...  one compact record per line
+    shards.index.jsonl        {"slug", "shard", "line"}, appended once the record is written
+    Records missing from the index (crash while writing) are ignored by readers,
+    the last indexed record of a slug wins.
+    """
+
+    INDEX_NAME = "shards.index.jsonl"
+    SHARD_PATTERN = "part-*.ndjson.gz"
+
+    def __init__(
+        self,
+        directory: str | Path,
+        max_records_per_shard: int = 5000,
+        compresslevel: int = 6,
+    ):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.max_records_per_shard = max_records_per_shard
+        self.compresslevel = compresslevel
+        self.slugs: dict[str, tuple[str, int]] = self._read_index()
+        self._lock = threading.Lock()
+        # Shards are never appended to across runs: a crash may have truncated the last one
+        self._next_shard_num = 1 + max(
+            (int(p.name[5:10]) for p in self.directory.glob(self.SHARD_PATTERN)),
+            default=-1,
+        )
+        self._shard = None
+        self._shard_name = None
+        self._shard_lines = 0
+        self._index = open(self.directory / self.INDEX_NAME, "a", encoding="utf-8")
+
+    def _read_index(self) -> dict[str, tuple[str, int]]:
+        slugs = {}
+        index_path = self.directory / self.INDEX_NAME
+        if not index_path.exists():
+            return slugs
+        with open(index_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # line torn by a crash
+                slugs[entry["slug"]] = (entry["shard"], entry["line"])
+        return slugs
+
+    def __contains__(self, slug: str) -> bool:
+        return slug in self.slugs
+
+    def _roll(self) -> None:
+        if self._shard is not None:
+            self._shard.close()
+        self._shard_name = f"part-{self._next_shard_num:05d}.ndjson.gz"
+        self._next_shard_num += 1
+        self._shard = gzip.open(
+            self.directory / self._shard_name, "wb", compresslevel=self.compresslevel
+        )
+        self._shard_lines = 0
+
+    def write(self, slug: str, record: dict) -> None:
+        with self._lock:
+            if self._shard is None or self._shard_lines >= self.max_records_per_shard:
+                self._roll()
+            self._shard.write(serializer.dumps(record) + b"\n")
+            # Sync flush: every indexed record stays readable if the shard is cut later
+            self._shard.flush()
+            line = self._shard_lines
+            self._shard_lines += 1
+
+            self._index.write(
+                json.dumps({"slug": slug, "shard": self._shard_name, "line": line})
+                + "\n"
+            )
+            self._index.flush()
+            self.slugs[slug] = (self._shard_name, line)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._shard is not None:
+                self._shard.close()
+                self._shard = None
+            self._index.close()
@@ -3,6 +3,7 @@ from urllib.parse import quote_plus
 from pymongo import MongoClient
 from extractor_factory import ExtractorFactory
 from persistor import Persistor
+from utils import ParquetSource
 
 # ------------- < Constants > -------------
 # Read
@@ -12,6 +13,9 @@ R_USERNAME = os.environ.get("MONGO_USERNAME")
 R_PASSWORD = os.environ.get("MONGO_PASSWORD")
 MONGO_DB = os.environ.get("MONGO_DB")
 WITH_ID = False  # Whether to include _id field from MongoDB documents
+# Staging written by the wrangler: mongo (transient MongoDB) or parquet datasets
+STAGING_FORMAT = os.environ.get("STAGING_FORMAT", "mongo")
+STAGING_DIR = os.environ.get("STAGING_DATA_FILE_DIRECTORY", "./data/staging")
 
 credentials = ""
 if R_USERNAME and R_PASSWORD:
@@ -31,34 +35,41 @@ DW_NEO_LOAD_BATCH_SIZE = int(os.environ.get("DW_NEO_LOAD_BATCH_SIZE", 100))
 
 if __name__ == "__main__":
 
-    print(f"[ Connecting to (Mongo): <{MONGO_URL}>... ]")
-    client = MongoClient(host=MONGO_URL)  # or AsyncMongoClient for async operations
-    transient_db = client[MONGO_DB]
+    if STAGING_FORMAT == "parquet":
+        source_url = STAGING_DIR
+        staging = ParquetSource(STAGING_DIR)
+        find_rows = lambda collection_name: staging.find(
+            collection_name, batch_size=DW_NEO_LOAD_BATCH_SIZE
+        )
+    else:
+        source_url = MONGO_URL
+        print(f"[ Connecting to (Mongo): <{MONGO_URL}>... ]")
+        client = MongoClient(host=MONGO_URL)  # or AsyncMongoClient for async operations
+        transient_db = client[MONGO_DB]
+        find_rows = lambda collection_name: transient_db[collection_name].find(
+            {}, {"_id": int(WITH_ID)}, batch_size=DW_NEO_LOAD_BATCH_SIZE
+        )
 
-    print("<-- Connected to MongoDB -->\n")
+        print("<-- Connected to MongoDB -->\n")
 
     print(f"[ Connecting to (NEO4J): <{DW_NEO_DB_URL}>... ]")
 
     persistor = Persistor(uri=DW_NEO_DB_URL, auth=DW_NEO_AUTH, database=DW_NEO_DB)
 
     print(f"[ Loading to DataWarehouse ]")
-    print(f"src   : <{MONGO_URL}>")
+    print(f"src   : <{source_url}>")
     print(f"target: <{DW_NEO_DB_URL}>\n")
 
     # Extractors
     extractorFactory = ExtractorFactory()
 
     entity_extractor = extractorFactory.build_extractor(
-        iter=transient_db["GRAPH_ENTITIES"].find(
-            {}, {"_id": int(WITH_ID)}, batch_size=DW_NEO_LOAD_BATCH_SIZE
-        ),
+        iter=find_rows("GRAPH_ENTITIES"),
         batch_size=DW_NEO_LOAD_BATCH_SIZE,
     )
 
     link_extractor = extractorFactory.build_extractor(
-        iter=transient_db["GRAPH_LINKS"].find(
-            {}, {"_id": int(WITH_ID)}, batch_size=DW_NEO_LOAD_BATCH_SIZE
-        ),
+        iter=find_rows("GRAPH_LINKS"),
         batch_size=DW_NEO_LOAD_BATCH_SIZE,
     )
 
@@ -0,0 +1,25 @@
+from pathlib import Path
+from typing import Iterator
+
+import pyarrow.parquet as pq
+
+
+class ParquetSource:
+    """
+    Reads the collections staged by the wrangler as parquet datasets
+    (<directory>/<COLLECTION>/part-XXXXX.parquet), instead of the transient MongoDB.
+    Rows are streamed record batch by record batch, as the documents of a Mongo cursor.
+    """
+
+    def __init__(self, directory: str | Path):
+        self.directory = Path(directory)
+
+    def parts(self, collection_name: str) -> list[Path]:
+        return sorted((self.directory / collection_name).glob("part-*.parquet"))
+
+    def find(self, collection_name: str, batch_size: int = 1000) -> Iterator[dict]:
+        for part in self.parts(collection_name):
+            for record_batch in pq.ParquetFile(part).iter_batches(
+                batch_size=batch_size
+            ):
+                yield from record_batch.to_pylist()
@@ -3,6 +3,7 @@ from urllib.parse import quote_plus
 from pymongo import MongoClient
 from extractor_factory import ExtractorFactory
 from persistor import Persistor
+from utils import ParquetSource
 from models import *  # Importe TOUS les ORM, NECESSAIRE POUR 'create_tables'
 
 # ------------- < Constants > -------------
@@ -13,6 +14,9 @@ R_USERNAME = os.environ.get("MONGO_USERNAME")
 R_PASSWORD = os.environ.get("MONGO_PASSWORD")
 MONGO_DB = os.environ.get("MONGO_DB")
 WITH_ID = False  # Whether to include _id field from MongoDB documents
+# Staging written by the wrangler: mongo (transient MongoDB) or parquet datasets
+STAGING_FORMAT = os.environ.get("STAGING_FORMAT", "mongo")
+STAGING_DIR = os.environ.get("STAGING_DATA_FILE_DIRECTORY", "./data/staging")
 
 credentials = ""
 if R_USERNAME and R_PASSWORD:
@@ -48,11 +52,22 @@ COLLECTIONS = [  # ORDER MATTERS WITH RELATIONSHIPS !
 # ------------- < Pipeline Task > -------------
 if __name__ == "__main__":
 
-    print(f"[ Connecting to (Mongo): <{MONGO_URL}>... ]")
-    client = MongoClient(host=MONGO_URL)  # or AsyncMongoClient for async operations
-    transient_db = client[MONGO_DB]
+    if STAGING_FORMAT == "parquet":
+        source_url = STAGING_DIR
+        staging = ParquetSource(STAGING_DIR)
+        find_rows = lambda collection_name: staging.find(
+            collection_name, batch_size=DW_POSTGRES_LOAD_BATCH_SIZE
+        )
+    else:
+        source_url = MONGO_URL
+        print(f"[ Connecting to (Mongo): <{MONGO_URL}>... ]")
+        client = MongoClient(host=MONGO_URL)  # or AsyncMongoClient for async operations
+        transient_db = client[MONGO_DB]
+        find_rows = lambda collection_name: transient_db[collection_name].find(
+            {}, {"_id": int(WITH_ID)}, batch_size=DW_POSTGRES_LOAD_BATCH_SIZE
+        )
 
-    print("<-- Connected to MongoDB -->\n")
+        print("<-- Connected to MongoDB -->\n")
 
     print(f"[ Connecting to (Postgres): <{DW_POSTGRES_DB_URL}>... ]")
 
@@ -63,19 +78,17 @@ if __name__ == "__main__":
     print("<-- Tables created -->\n")
 
     print(f"[ Loading to DataWarehouse ]")
-    print(f"src   : <{MONGO_URL}>")
+    print(f"src   : <{source_url}>")
     print(f"target: <{DW_POSTGRES_DB_URL}>\n")
 
     with persistor.session_scope() as session:
         for collection_name, orm in COLLECTIONS:
+            # Upserted: rows already loaded by a previous run are updated
             for batch in ExtractorFactory().build_extractor(
-                iter=transient_db[collection_name].find(
-                    {}, {"_id": int(WITH_ID)}, batch_size=DW_POSTGRES_LOAD_BATCH_SIZE
-                ),
+                iter=find_rows(collection_name),
                 batch_size=DW_POSTGRES_LOAD_BATCH_SIZE,
-                wrapper=persistor.orm_wrapper(orm),
             ):
-                persistor.persist_all(batch, session=session)
+                persistor.upsert_all(orm, batch, session=session)
 
             if not persistor.last_execution_status:
                 print(f"<-- Loaded {collection_name} Data -->\n")
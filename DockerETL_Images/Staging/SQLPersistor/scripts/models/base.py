@@ -1,5 +1,24 @@
+from sqlalchemy import BigInteger, String
 from sqlalchemy.orm import declarative_base, DeclarativeMeta
 from typing import TypeVar
+import os
 
 ModelsBase = declarative_base()
 ModelType = TypeVar("ModelType", bound=DeclarativeMeta)
+
+# Surrogate key strategies of the wrangler: hash keys are BIGINT, uuid/uuid5 keys strings
+# SURROGATE_KEY_STRATEGY (default of every table), SURROGATE_KEYS ("TABLE=strategy,...")
+DEFAULT_KEY_STRATEGY = (os.environ.get("SURROGATE_KEY_STRATEGY") or "uuid").lower()
+KEY_STRATEGIES = {
+    table.strip().upper(): strategy.strip().lower()
+    for table, _, strategy in (
+        entry.partition("=")
+        for entry in filter(None, os.environ.get("SURROGATE_KEYS", "").split(","))
+    )
+}
+
+
+def key_type(table: str):
+    # Column type of the id of table, and of the foreign keys referencing it
+    strategy = KEY_STRATEGIES.get(table, DEFAULT_KEY_STRATEGY)
+    return BigInteger if strategy == "hash" else String
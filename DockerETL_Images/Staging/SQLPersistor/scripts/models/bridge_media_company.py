@@ -1,4 +1,5 @@
 from . import ModelsBase
+from .base import key_type
 from sqlalchemy import Column, Float, ForeignKey, String
 from sqlalchemy.orm import relationship
 
@@ -8,13 +9,16 @@ class MediaCompanyBridgeORM(ModelsBase):
 
     # Primary Keys
     media_id = Column(
-        String,
+        key_type("DIM_MEDIA_INFO"),
         ForeignKey("DIM_MEDIA_INFO.id"),
         primary_key=True,
         nullable=False,
     )
     company_id = Column(
-        String, ForeignKey("COMPANIES.id"), primary_key=True, nullable=False
+        key_type("COMPANIES"),
+        ForeignKey("COMPANIES.id"),
+        primary_key=True,
+        nullable=False,
     )
 
     # Fields
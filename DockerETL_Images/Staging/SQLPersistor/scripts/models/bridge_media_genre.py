@@ -1,4 +1,5 @@
 from . import ModelsBase
+from .base import key_type
 from sqlalchemy import Column, String, Float, ForeignKey
 from sqlalchemy.orm import relationship
 
@@ -8,12 +9,14 @@ class MediaGenreBridgeORM(ModelsBase):
 
     # Primary Keys
     media_id = Column(
-        String,
+        key_type("DIM_MEDIA_INFO"),
         ForeignKey("DIM_MEDIA_INFO.id"),
         primary_key=True,
         nullable=False,
     )
-    genre_id = Column(String, ForeignKey("GENRES.id"), primary_key=True, nullable=False)
+    genre_id = Column(
+        key_type("GENRES"), ForeignKey("GENRES.id"), primary_key=True, nullable=False
+    )
 
     # Fields
     weight = Column(Float, nullable=False)
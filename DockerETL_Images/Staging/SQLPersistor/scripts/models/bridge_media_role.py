@@ -1,4 +1,5 @@
 from . import ModelsBase
+from .base import key_type
 from sqlalchemy import Column, String, Float, ForeignKey
 from sqlalchemy.orm import relationship
 
@@ -8,12 +9,14 @@ class MediaRoleBridgeORM(ModelsBase):
 
     # Primary Keys
     media_id = Column(
-        String,
+        key_type("DIM_MEDIA_INFO"),
         ForeignKey("DIM_MEDIA_INFO.id"),
         primary_key=True,
         nullable=False,
     )
-    role_id = Column(String, ForeignKey("ROLES.id"), primary_key=True, nullable=False)
+    role_id = Column(
+        key_type("ROLES"), ForeignKey("ROLES.id"), primary_key=True, nullable=False
+    )
 
     # Fields
     weight = Column(Float, nullable=False)
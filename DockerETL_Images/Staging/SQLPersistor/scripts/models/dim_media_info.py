@@ -1,4 +1,5 @@
 from . import ModelsBase
+from .base import key_type
 from sqlalchemy import Column, String, Float
 
 
@@ -6,7 +7,9 @@ class MediaInfoDimORM(ModelsBase):
     __tablename__ = "DIM_MEDIA_INFO"
 
     # Primary Keys
-    id = Column(String, primary_key=True, nullable=False)
+    id = Column(
+        key_type(__tablename__), primary_key=True, autoincrement=False, nullable=False
+    )
 
     # Fields
     media_type = Column(String, nullable=False)
@@ -1,4 +1,5 @@
 from . import ModelsBase
+from .base import key_type
 from sqlalchemy import Column, Integer, ForeignKey, String
 from sqlalchemy.orm import relationship
 
@@ -8,22 +9,25 @@ class ReviewsFactORM(ModelsBase):
 
     # Primary Keys
     reviewer_id = Column(
-        String,
+        key_type("DIM_REVIEWER"),
         ForeignKey("DIM_REVIEWER.id"),
         primary_key=True,
         nullable=False,
     )
     time_id = Column(
-        String, ForeignKey("DIM_TIME.id"), primary_key=True, nullable=False
+        key_type("DIM_TIME"),
+        ForeignKey("DIM_TIME.id"),
+        primary_key=True,
+        nullable=False,
     )
     section_id = Column(
-        String,
+        key_type("DIM_SECTION"),
         ForeignKey("DIM_SECTION.id"),
         primary_key=True,
         nullable=False,
     )
     media_info_id = Column(
-        String,
+        key_type("DIM_MEDIA_INFO"),
         ForeignKey("DIM_MEDIA_INFO.id"),
         primary_key=True,
         nullable=False,
@@ -1,4 +1,5 @@
 from . import ModelsBase
+from .base import key_type
 from sqlalchemy import Column, String, String
 
 
@@ -6,7 +7,9 @@ class CompanyORM(ModelsBase):
     __tablename__ = "COMPANIES"
 
     # Primary Keys
-    id = Column(String, primary_key=True, nullable=False)
+    id = Column(
+        key_type(__tablename__), primary_key=True, autoincrement=False, nullable=False
+    )
 
     # Fields
     company_role = Column(String, nullable=False)
@@ -1,4 +1,5 @@
 from . import ModelsBase
+from .base import key_type
 from sqlalchemy import Column, String
 
 
@@ -6,7 +7,9 @@ class GenreORM(ModelsBase):
     __tablename__ = "GENRES"
 
     # Primary Keys
-    id = Column(String, primary_key=True, nullable=False)
+    id = Column(
+        key_type(__tablename__), primary_key=True, autoincrement=False, nullable=False
+    )
 
     # Fields
     genre_title = Column(String, nullable=False)
@@ -1,5 +1,6 @@
 from contextlib import contextmanager
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.orm import Session, DeclarativeBase
 from models.base import DeclarativeMeta, ModelType
 from utils.execution import *
@@ -7,6 +8,9 @@ from utils.batch_generator import *
 from typing import Iterable
 import time
 
+# INSERT ... ON CONFLICT of the DW dialect (sqlite for local runs)
+UPSERT_INSERTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
 
 class Persistor:
 
@@ -47,9 +51,41 @@ class Persistor:
 
     @safe_execute
     def create_tables(self, base: DeclarativeMeta) -> ExitCode:
+        self.migrate_key_columns(base)
         base.metadata.create_all(self.engine)
         return SUCCESS
 
+    def migrate_key_columns(self, base: DeclarativeMeta) -> list[str]:
+        """
+        create_all keeps existing tables as they are. When the surrogate key strategy
+        switched between strings (uuid, uuid5) and BIGINT (hash), the id and foreign key
+        columns already in the DW have the other type and their keys cannot be
+        converted: the DW tables are dropped and recreated by create_tables, the load
+        fills them again from the staging. Returns the tables whose keys changed.
+        """
+        inspector = inspect(self.engine)
+        changed = []
+        for table in base.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing = {
+                column["name"]: column["type"]
+                for column in inspector.get_columns(table.name)
+            }
+            for column in table.columns:
+                if not (column.primary_key or column.foreign_keys):
+                    continue
+                current = existing.get(column.name)
+                if current is not None and not isinstance(
+                    current, column.type._type_affinity
+                ):
+                    changed.append(table.name)
+                    break
+        if changed:
+            print(f"Key columns type changed in {changed}, rebuilding the DW tables...")
+            base.metadata.drop_all(self.engine)
+        return changed
+
     def persist(self, obj: ModelType, session: Session = None) -> ExitCode:
         self.last_execution_status = FAILURE
         if session is None:
@@ -72,6 +108,49 @@ class Persistor:
             self.last_execution_status = SUCCESS
         return self.last_execution_status
 
+    def upsert_all(
+        self,
+        orm_model_class: DeclarativeBase,
+        rows: list[dict],
+        session: Session = None,
+    ) -> ExitCode:
+        # Staged rows whose primary key is already in the DW update it instead of
+        # failing the load: re-runs with deterministic keys are idempotent
+        self.last_execution_status = FAILURE
+        if session is None:
+            with self.session_scope() as s:
+                self._upsert(s, orm_model_class, rows)
+        else:
+            self._upsert(session, orm_model_class, rows)
+            self.last_execution_status = SUCCESS
+        return self.last_execution_status
+
+    def _upsert(
+        self, session: Session, orm_model_class: DeclarativeBase, rows: list[dict]
+    ) -> None:
+        table = orm_model_class.__table__
+        pk = [column.name for column in table.primary_key]
+        # One row per key: a statement cannot update the same row twice (last one kept)
+        rows = {
+            tuple(row.get(name) for name in pk): {
+                column.name: row.get(column.name) for column in table.columns
+            }
+            for row in rows
+        }
+        if not rows:
+            return
+        statement = UPSERT_INSERTS[self.engine.dialect.name](table)
+        updated = {
+            column.name: statement.excluded[column.name]
+            for column in table.columns
+            if not column.primary_key
+        }
+        if updated:
+            statement = statement.on_conflict_do_update(index_elements=pk, set_=updated)
+        else:
+            statement = statement.on_conflict_do_nothing(index_elements=pk)
+        session.execute(statement, list(rows.values()))
+
     def orm_wrapper(
         self, orm_model_class: DeclarativeBase
     ) -> Callable[[dict], DeclarativeBase]:
@@ -1,5 +1,6 @@
 from .execution import ExitCode, safe_execute, safe_generate, SUCCESS, FAILURE
 from .batch_generator import BatchGenerator
+from .parquet_source import ParquetSource
 
 __all__ = [
     "ExitCode",
@@ -8,4 +9,5 @@ __all__ = [
     "SUCCESS",
     "FAILURE",
     "BatchGenerator",
+    "ParquetSource",
 ]
@@ -1,9 +1,16 @@
 import os
 from urllib.parse import quote_plus
 from pathlib import Path
-import json
 
-from utils import MongoLoader
+import pandas as pd
+
+from utils import (
+    MongoLoader,
+    ParquetLoader,
+    MediaSourceReader,
+    IMDBDataset,
+    FactSpill,
+)
 from utils.logger import LOG
 from utils.media_utils import *
 from media_builder import MediaBuilder
@@ -23,7 +30,22 @@ METACRITIC_SOURCE_DIR = Path(
     os.environ.get("METACRITIC_DATA_FILE_DIRECTORY", "./data/metacritic")
 )
 IMDB_SOURCE_DIR = Path(os.environ.get("IMDB_DATA_FILE_DIRECTORY", "./data/imdb"))
+# Typed parquet copies of the IMDb tsv.gz files, reused across runs (empty: parse tsv)
+IMDB_CACHE_DIR = os.environ.get("IMDB_CACHE_DIRECTORY")
 OUTPUT_DIR = Path(os.environ.get("OUT_DATA_FILE_DIRECTORY", "./data/output"))
+# Check scraped records against the scrapper layout while decoding them (msgspec)
+TYPED_DECODING = os.environ.get("WRANGLER_TYPED_DECODING", "0") == "1"
+# Worker processes building the Metacritic rows (1: in process, 0: one per core)
+PROCESSES = int(os.environ.get("WRANGLER_PROCESSES", "1")) or os.process_cpu_count()
+# Source files per worker task, smaller tasks balance better between workers
+TASKS_PER_PROCESS = 4
+# Streaming: review facts spilled to parquet chunks in this directory (empty: in RAM)
+SPILL_DIR = os.environ.get("WRANGLER_SPILL_DIRECTORY")
+# Size of the buffered review facts that triggers a spill
+MEMORY_BUDGET_MB = int(os.environ.get("WRANGLER_MEMORY_BUDGET_MB") or "256")
+# Staging of the collections for the persistors: mongo (transient MongoDB) or parquet
+STAGING_FORMAT = os.environ.get("STAGING_FORMAT", "mongo")
+STAGING_DIR = Path(os.environ.get("STAGING_DATA_FILE_DIRECTORY", "./data/staging"))
 
 COLLECTIONS = [  # ORDER MATTERS WITH RELATIONSHIPS !
     # Bridged Entities
@@ -44,21 +66,8 @@ COLLECTIONS = [  # ORDER MATTERS WITH RELATIONSHIPS !
 ]
 
 
-def setup_metacritic_data(loader: MongoLoader):
-    # Merging utilities
-    title_year_set = set()
-
-    # Sets of distinct value : [list of uuids that use this value as a dim]
-    genre_connection = {}
-    company_connection = {}
-    time_connection = {}
-    reviewer_connection = {}
-    section_connection = {}
-
-    # All by default distinct rows
-    media_rows = {}
-    review_rows = {}
-
+def setup_metacritic_data(loader: MongoLoader | ParquetLoader):
+    tasks = []
     for cat_dir in METACRITIC_SOURCE_DIR.iterdir():
         if not cat_dir.is_dir():
             continue
@@ -74,63 +83,48 @@ def setup_metacritic_data(loader: MongoLoader):
             section_type = "Season"
             media_type = "TV Series"
 
-        for jf in cat_dir.glob("*.json"):
-            # Openning source json
-            with open(jf, "r", encoding="utf-8") as f:
-                data = json.load(f)
-
-            to_add_media_info_row, to_add_genres, to_add_companies = (
-                MediaBuilder.build_mediainfo_rows(data, media_type, title_year_set)
-            )
-            media_info_id = list(to_add_media_info_row.keys())[0]
-            to_add_review_rows, to_add_timestamps, to_add_reviewers, to_add_sections = (
-                MediaBuilder.build_fact_rows(data, media_info_id, section_type)
+        # Media json files and/or ndjson shards, split in file shards for the workers
+        sources = MediaSourceReader.list_sources(cat_dir)
+        shard_size = max(1, -(-len(sources) // (PROCESSES * TASKS_PER_PROCESS)))
+        for i in range(0, len(sources), shard_size):
+            tasks.append(
+                (sources[i : i + shard_size], media_type, section_type, TYPED_DECODING)
             )
 
-            # Add new already known distinct rows
-            media_rows |= to_add_media_info_row
-            review_rows |= to_add_review_rows
-
-            # Map new distinct values or add to already defined new rows that reference them to replace uuid later
-            MediaMappingUtils.map_distinct_values(
-                to_add_genres, genre_connection, ["genre_title"]
-            )
-            MediaMappingUtils.map_distinct_values(
-                to_add_companies, company_connection, ["company_name", "company_role"]
-            )
-            MediaMappingUtils.map_distinct_values(
-                to_add_timestamps, time_connection, ["year", "month", "day"]
-            )
-            MediaMappingUtils.map_distinct_values(
-                to_add_reviewers,
-                reviewer_connection,
-                ["reviewer_username", "association"],
-            )
-            MediaMappingUtils.map_distinct_values(
-                to_add_sections, section_connection, ["section_name", "section_type"]
-            )
+    LOG.info(f"[ Building Metacritic rows: {len(tasks)} tasks, {PROCESSES} processes ]")
+    # Streaming: only the dimensions stay in RAM, review rows are empty
+    spill = None
+    if SPILL_DIR:
+        spill = FactSpill(SPILL_DIR, "media_info_id", MEMORY_BUDGET_MB << 20)
+    # Merging utilities, all by default distinct rows and
+    # sets of distinct value : [list of uuids that use this value as a dim]
+    media_rows, review_rows, title_year_set, connections = (
+        MediaBuilder.build_metacritic_data(tasks, PROCESSES, spill)
+    )
+    genre_connection = connections["genre"]
+    company_connection = connections["company"]
+    time_connection = connections["time"]
+    reviewer_connection = connections["reviewer"]
+    section_connection = connections["section"]
+    del connections
 
     # Remapping
     LOG.info(f"[ Remapping Metacritic Data ]")
 
-    # Genre
-    genre_rows = MediaMappingUtils.remap_foreign_keys_and_build_distinct_rows(
-        media_rows, genre_connection, "genre_id"
-    )
+    # Genre (media foreign keys: bridge columns from the connection, see setup_bridges)
+    genre_rows = MediaMappingUtils.build_distinct_rows(genre_connection)
     LOG.info(f"-> Loading collection: GENRES...")
     loader.load_from_dict(genre_rows, "GENRES", batch_size=10000)
     del genre_rows
 
     # Company
-    company_rows = MediaMappingUtils.remap_foreign_keys_and_build_distinct_rows(
-        media_rows, company_connection, "company_id"
-    )
+    company_rows = MediaMappingUtils.build_distinct_rows(company_connection)
     LOG.info(f"-> Loading collection: COMPANIES...")
     loader.load_from_dict(company_rows, "COMPANIES", batch_size=10000)
     del company_rows
 
     # Time
-    time_rows = MediaMappingUtils.remap_foreign_keys_and_build_distinct_rows(
+    time_rows = MediaMappingUtils.remap_foreign_key_column(
         review_rows, time_connection, "time_id"  # , null_check_collums=["year"]
     )
     LOG.info(f"-> Loading collection: DIM_TIME...")
@@ -139,7 +133,7 @@ def setup_metacritic_data(loader: MongoLoader):
     del time_connection
 
     # Reviewer
-    reviewer_rows = MediaMappingUtils.remap_foreign_keys_and_build_distinct_rows(
+    reviewer_rows = MediaMappingUtils.remap_foreign_key_column(
         review_rows, reviewer_connection, "reviewer_id"
     )
     LOG.info(f"-> Loading collection: DIM_REVIEWER...")
@@ -148,7 +142,7 @@ def setup_metacritic_data(loader: MongoLoader):
     del reviewer_connection
 
     # Section
-    section_rows = MediaMappingUtils.remap_foreign_keys_and_build_distinct_rows(
+    section_rows = MediaMappingUtils.remap_foreign_key_column(
         review_rows, section_connection, "section_id"
     )
     LOG.info("[ Extracting Franchise for Sections ... ]")
@@ -162,93 +156,87 @@ def setup_metacritic_data(loader: MongoLoader):
         type_attribute="section_type",
         blacklist_types=["Season", "Display"],
     )
-    section_df = section_df.where(section_df.notna(), None)
     LOG.info(f"-> Loading collection: DIM_SECTION...")
-    loader.load_from_dict(
-        section_df.to_dict(orient="index"),
-        "DIM_SECTION",
-        batch_size=10000,
-        id_col_name="id",
+    loader.load_from_dataframe(
+        section_df, "DIM_SECTION", batch_size=10000, id_col_name="id"
     )
     del section_df
 
-    # Reviews
-    reviews_df = MediaBuilder.build_and_save_dataframe_from_rows(
-        review_rows, is_dict=True
-    )
-    del review_rows
-    reviews_df = reviews_df.dropna(subset=["rating"])
-    reviews_df = reviews_df.drop_duplicates(
-        subset=["time_id", "section_id", "reviewer_id", "media_info_id"]
-    )
-    reviews_df = reviews_df.where(reviews_df.notna(), None)
+    # Reviews (streaming: cleaned bucket by bucket when loaded)
+    reviews_rows = spill
+    if spill is None:
+        reviews_df = MediaBuilder.build_and_save_dataframe_from_rows(
+            review_rows, is_dict=True
+        )
+        del review_rows
+        reviews_rows = MediaBuilder.clean_review_facts(reviews_df)
+        del reviews_df
 
     LOG.info("< Finished with Metacritic >")
 
     return (
         media_rows,
         title_year_set,
-        reviews_df.to_dict(orient="index"),
+        reviews_rows,
         genre_connection,
         company_connection,
     )
 
 
-def setup_and_join_imdb_data_for_roles(media_rows, title_year_set, loader: MongoLoader):
+def setup_and_join_imdb_data_for_roles(
+    media_rows, title_year_set, loader: MongoLoader | ParquetLoader
+):
     # IMDB Joining for roles extraction
+    imdb = IMDBDataset(IMDB_SOURCE_DIR, IMDB_CACHE_DIR)
     imdb_title_mapping = MediaBuilder.build_imdb_tconst_lookup_by_primary_title(
         media_rows=media_rows,
-        title_basics_path=IMDB_SOURCE_DIR / "title.basics.tsv.gz",
+        imdb=imdb,
         title_year_set=title_year_set,
     )
 
     role_connection = MediaBuilder.build_roles_for_media(
-        imdb_matches=imdb_title_mapping, imdb_dir=IMDB_SOURCE_DIR
+        imdb_matches=imdb_title_mapping, imdb=imdb
     )
     del imdb_title_mapping
 
-    role_rows = MediaMappingUtils.remap_foreign_keys_and_build_distinct_rows(
-        media_rows, role_connection, "role_id"
-    )
+    role_rows = MediaMappingUtils.build_distinct_rows(role_connection)
 
     role_df = MediaBuilder.build_and_save_dataframe_from_rows(role_rows)
     role_df = role_df.drop(columns=["nconst"])
     # role_df.to_csv(OUTPUT_DIR / "ROLES.csv", sep="|", encoding="utf-8")
-    loader.load_from_dict(
-        role_df.to_dict(orient="index"), "ROLES", batch_size=10000, id_col_name="id"
-    )
+    loader.load_from_dataframe(role_df, "ROLES", batch_size=10000, id_col_name="id")
     del role_rows
     del role_df
     return role_connection
 
 
-def setup_bridges(media_rows, loader: MongoLoader):
+def setup_bridges(
+    media_rows, bridged_connections: dict, loader: MongoLoader | ParquetLoader
+):
     LOG.info(f"[ Setting up Bridge Tables... ]")
-    # Build bridge tables for media_info
-    bridge_dfs_media_info = MediaBuilder.build_bridge_rows(
-        media_rows, ["genre_id", "company_id", "role_id"], "media_id"
-    )
-
-    loader.load_from_dict(
-        bridge_dfs_media_info["genre_id"], "BRIDGE_MEDIA_GENRE", batch_size=10000
-    )
-    del bridge_dfs_media_info["genre_id"]
-
-    loader.load_from_dict(
-        bridge_dfs_media_info["company_id"], "BRIDGE_MEDIA_COMPANY", batch_size=10000
-    )
-    del bridge_dfs_media_info["company_id"]
-
-    loader.load_from_dict(
-        bridge_dfs_media_info["role_id"], "BRIDGE_MEDIA_ROLE", batch_size=10000
-    )
-    del bridge_dfs_media_info
+    # Build bridge tables for media_info, one column batch per bridged connection
+    media_ids = pd.Index(list(media_rows))
+    for (collection, foreign_key_title), connection in bridged_connections.items():
+        bridge_columns = MediaBuilder.build_bridge_columns(
+            media_ids, connection, "media_id", foreign_key_title
+        )
+        loader.load_from_columns(bridge_columns, collection, batch_size=10000)
+        del bridge_columns
 
 
 if __name__ == "__main__":
-    # Load to transient database (MongoDB)
-    LOG.info(f"[ Loading transformed data to transient MongoDB at: <{mongo_url}>... ]")
-    loader = MongoLoader(mongo_conn_url=mongo_url, database=MONGO_DB)
+    if STAGING_FORMAT == "parquet":
+        # Load to columnar datasets read by the persistors
+        LOG.info(
+            f"[ Loading transformed data to parquet datasets at: <{STAGING_DIR}>... ]"
+        )
+        loader = ParquetLoader(STAGING_DIR)
+    else:
+        # Load to transient database (MongoDB)
+        LOG.info(
+            f"[ Loading transformed data to transient MongoDB at: <{mongo_url}>... ]"
+        )
+        loader = MongoLoader(mongo_conn_url=mongo_url, database=MONGO_DB)
 
     media_rows, title_year_set, reviews_rows, genre_conn, company_conn = (
         setup_metacritic_data(loader)
@@ -257,7 +245,15 @@ if __name__ == "__main__":
     role_conn = setup_and_join_imdb_data_for_roles(media_rows, title_year_set, loader)
     del title_year_set
 
-    setup_bridges(media_rows, loader)
+    setup_bridges(
+        media_rows,
+        {
+            ("BRIDGE_MEDIA_GENRE", "genre_id"): genre_conn,
+            ("BRIDGE_MEDIA_COMPANY", "company_id"): company_conn,
+            ("BRIDGE_MEDIA_ROLE", "role_id"): role_conn,
+        },
+        loader,
+    )
 
     #########
     # Neo4J #
@@ -330,18 +326,21 @@ if __name__ == "__main__":
         media_df, "primary_title", "franchise", type_attribute="media_type"
     )
     LOG.info(f"[Loading collection: DIM_MEDIA_INFO...]")
-    media_df = media_df.where(media_df.notna(), None)
-    loader.load_from_dict(
-        media_df.to_dict(orient="index"),
-        "DIM_MEDIA_INFO",
-        batch_size=10000,
-        id_col_name="id",
+    loader.load_from_dataframe(
+        media_df, "DIM_MEDIA_INFO", batch_size=10000, id_col_name="id"
     )
     del media_df
 
     # Reviews
     LOG.info(f"[Loading collection: FACT_REVIEWS...]")
-    loader.load_from_dict(reviews_rows, "FACT_REVIEWS", batch_size=10000)
+    if isinstance(reviews_rows, FactSpill):
+        # Duplicates share a media, so a bucket: cleaned one bucket at a time
+        for reviews_df in reviews_rows.read_buckets():
+            reviews_df = MediaBuilder.clean_review_facts(reviews_df)
+            loader.load_from_dataframe(reviews_df, "FACT_REVIEWS", batch_size=10000)
+        reviews_rows.cleanup()
+    else:
+        loader.load_from_dataframe(reviews_rows, "FACT_REVIEWS", batch_size=10000)
     del reviews_rows
 
     LOG.info("All collections loaded successfully!")
@@ -1,10 +1,53 @@
-from pathlib import Path
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import repeat
+from multiprocessing import get_context
+import numpy as np
 import pandas as pd
-import uuid
 
+from utils.fact_spill import FactSpill
+from utils.imdb_dataset import IMDBDataset
+from utils.key_generator import key_generator
 from utils.logger import LOG
+from utils.media_source_reader import MediaSource, MediaSourceReader
 from utils.media_utils import *
 
+# Distinct value connections of the Metacritic rows:
+# name -> (table, attributes of the rows, differenciating attributes)
+METACRITIC_CONNECTIONS = {
+    "genre": ("GENRES", ["genre_title"], ["genre_title"]),
+    "company": (
+        "COMPANIES",
+        ["company_role", "company_name"],
+        ["company_name", "company_role"],
+    ),
+    "time": ("DIM_TIME", ["year", "month", "day"], ["year", "month", "day"]),
+    "reviewer": (
+        "DIM_REVIEWER",
+        ["association", "reviewer_username", "is_critic"],
+        ["reviewer_username", "association"],
+    ),
+    "section": (
+        "DIM_SECTION",
+        ["section_type", "section_name"],
+        ["section_name", "section_type"],
+    ),
+}
+# Columns of the review facts (FACT_REVIEWS) and their connections
+REVIEW_FACT_COLUMNS = [
+    "time_id",
+    "section_id",
+    "reviewer_id",
+    "media_info_id",
+    "rating",
+]
+REVIEW_FOREIGN_KEYS = {
+    "time_id": "time",
+    "section_id": "section",
+    "reviewer_id": "reviewer",
+}
+
 
 class MediaBuilder:
 
@@ -14,11 +57,13 @@ class MediaBuilder:
 
     def build_mediainfo_rows(data, media_type, year_to_titles):
         md = data.get("media_details", {})
-        media_info_id = str(uuid.uuid4())
-        genre_rows = [
-            {"ref_id": media_info_id, "genre_title": g.strip()}
-            for g in md.get("genres", [])
-        ]
+        primary_title = MediaExtractUtils.extract_title(data)
+        release_date_str = md.get("initial_release_date") or md.get("release_date")
+        media_info_id = key_generator("DIM_MEDIA_INFO").key(
+            media_type, primary_title, release_date_str
+        )
+        # Connection rows: (ref_id, *attributes of METACRITIC_CONNECTIONS)
+        genre_rows = [(media_info_id, g.strip()) for g in md.get("genres", [])]
         companies = (
             [("developer", d) for d in md.get("developers", [])]
             + [("publisher", p) for p in md.get("publishers", [])]
@@ -27,12 +72,8 @@ class MediaBuilder:
                 for pc in md.get("production_companies", [])
             ]
         )
-        company_rows = [
-            {"ref_id": media_info_id, "company_role": cr, "company_name": cn}
-            for cr, cn in companies
-        ]
+        company_rows = [(media_info_id, cr, cn) for cr, cn in companies]
 
-        release_date_str = md.get("initial_release_date") or md.get("release_date")
         if release_date_str:
             release_year = MediaExtractUtils.extract_year_from_release_date(
                 release_date_str
@@ -43,7 +84,7 @@ class MediaBuilder:
         return (
             {
                 media_info_id: {
-                    "primary_title": MediaExtractUtils.extract_title(data),
+                    "primary_title": primary_title,
                     "media_type": media_type,
                     "duration": MediaExtractUtils.extract_runtime_minutes(
                         md.get("duration")
@@ -51,9 +92,6 @@ class MediaBuilder:
                     "description": md.get("summary"),
                     "release_date": release_date_str,
                     "pegi_mpa_rating": md.get("rating"),
-                    "genre_id": [],
-                    "company_id": [],
-                    "role_id": [],
                 }
             },
             genre_rows,
@@ -65,12 +103,25 @@ class MediaBuilder:
         time_rows = []
         reviewer_rows = []
         section_rows = []
+        review_keys = key_generator("FACT_REVIEWS")
 
         # ["section1", [review1, review2], "section2", [review3, review4], ...]
 
         for section, reviews in MediaExtractUtils.extract_all_reviews(data):
             for r in reviews:
-                review_id = str(uuid.uuid4())
+                # Natural key: the review content, stable when a re-scrape inserts or
+                # reorders reviews. Identical reviews share it, their facts are deduped
+                review_id = review_keys.key(
+                    mediainfo_id,
+                    section,
+                    r.get("isCritic"),
+                    r.get("author"),
+                    r.get("company"),
+                    r.get("post_date"),
+                    r.get("rating"),
+                    r.get("full_review_src_url"),
+                    r.get("quote"),
+                )
                 # Append review
                 review_rows |= {
                     review_id: {
@@ -87,28 +138,159 @@ class MediaBuilder:
                     year, month, day = post_date.split("-")
                 else:
                     year, month, day = (None, None, None)
-                time_rows.append(
-                    {"year": year, "month": month, "day": day, "ref_id": review_id}
-                )
+                time_rows.append((review_id, year, month, day))
                 # Append reviewer
                 reviewer_rows.append(
-                    {
-                        "association": r.get("company"),
-                        "reviewer_username": r.get("author"),
-                        "is_critic": r.get("isCritic"),
-                        "ref_id": review_id,
-                    }
+                    (review_id, r.get("company"), r.get("author"), r.get("isCritic"))
                 )
                 # Append platform
-                section_rows.append(
-                    {
-                        "section_type": section_type,
-                        "section_name": section,
-                        "ref_id": review_id,
-                    }
-                )
+                section_rows.append((review_id, section_type, section))
         return review_rows, time_rows, reviewer_rows, section_rows
 
+    def build_metacritic_encoders() -> dict[str, DistinctValueEncoder]:
+        return {
+            name: DistinctValueEncoder(attributes, pk_attributes, key_generator(table))
+            for name, (
+                table,
+                attributes,
+                pk_attributes,
+            ) in METACRITIC_CONNECTIONS.items()
+        }
+
+    def build_metacritic_rows(
+        sources: list[MediaSource],
+        media_type,
+        section_type,
+        typed=False,
+        streaming=False,
+    ):
+        """
+        Media rows, review rows, title years and distinct value connections of a
+        shard of Metacritic source files. Runs in a worker process.
+        streaming: reviews are returned as fact columns (REVIEW_FACT_COLUMNS), their
+        time / reviewer / section foreign keys as codes of the shard connections,
+        these connections keep no refs.
+        """
+        title_year_set = set()
+        connections = MediaBuilder.build_metacritic_encoders()
+        media_rows = {}
+        review_rows = {}
+        if streaming:
+            review_rows = {column: [] for column in REVIEW_FACT_COLUMNS}
+            for column in REVIEW_FOREIGN_KEYS:
+                review_rows[column] = array("q")
+
+        for path, lines in sources:
+            for data in MediaSourceReader.read_source(path, lines, typed):
+                to_add_media_info_row, to_add_genres, to_add_companies = (
+                    MediaBuilder.build_mediainfo_rows(data, media_type, title_year_set)
+                )
+                media_info_id = next(iter(to_add_media_info_row))
+                (
+                    to_add_review_rows,
+                    to_add_timestamps,
+                    to_add_reviewers,
+                    to_add_sections,
+                ) = MediaBuilder.build_fact_rows(data, media_info_id, section_type)
+
+                # Add new already known distinct rows
+                media_rows |= to_add_media_info_row
+                to_add_rows = {
+                    "genre": to_add_genres,
+                    "company": to_add_companies,
+                    "time": to_add_timestamps,
+                    "reviewer": to_add_reviewers,
+                    "section": to_add_sections,
+                }
+                if streaming:
+                    # One fact per review row, duplicates are dropped when loaded
+                    for column, name in REVIEW_FOREIGN_KEYS.items():
+                        review_rows[column].extend(
+                            connections[name].encode_codes(to_add_rows.pop(name))
+                        )
+                    review_rows["media_info_id"].extend(
+                        repeat(media_info_id, len(to_add_timestamps))
+                    )
+                    review_rows["rating"].extend(
+                        to_add_review_rows[row[0]]["rating"]
+                        for row in to_add_timestamps
+                    )
+                else:
+                    review_rows |= to_add_review_rows
+
+                # Map new distinct values or add to already defined new rows that reference them to replace uuid later
+                for name, to_add in to_add_rows.items():
+                    connections[name].encode(to_add)
+
+        return media_rows, review_rows, title_year_set, connections
+
+    def build_metacritic_data(
+        tasks: list[tuple], processes: int = 1, spill: FactSpill | None = None
+    ):
+        """
+        Runs build_metacritic_rows on every (sources, media_type, section_type, typed)
+        task, in worker processes when processes > 1, and merges the shards in task
+        order: rows and connections are the same as a single pass over the files.
+        With a spill (streaming), the review facts of every shard are appended to it
+        with their foreign keys instead of being kept: review rows are empty and the
+        time / reviewer / section connections have no refs.
+        """
+        title_year_set = set()
+        connections = MediaBuilder.build_metacritic_encoders()
+        media_rows = {}
+        review_rows = {}
+        build_rows = partial(
+            MediaBuilder.build_metacritic_rows, streaming=spill is not None
+        )
+
+        if processes > 1 and len(tasks) > 1:
+            pool = ProcessPoolExecutor(processes, mp_context=get_context("spawn"))
+            shards = pool.map(build_rows, *zip(*tasks))
+        else:
+            pool = None
+            shards = (build_rows(*task) for task in tasks)
+
+        try:
+            for shard_media, shard_reviews, shard_years, shard_connections in shards:
+                media_rows |= shard_media
+                title_year_set |= shard_years
+                translations = {
+                    name: connections[name].merge(local_connection)
+                    for name, local_connection in shard_connections.items()
+                }
+                if spill is None:
+                    review_rows |= shard_reviews
+                else:
+                    spill.append(
+                        MediaBuilder.translate_review_facts(
+                            shard_reviews, connections, translations
+                        )
+                    )
+        finally:
+            if pool is not None:
+                pool.shutdown(cancel_futures=True)
+
+        # Deterministic keys: a media scraped twice is one row referenced twice
+        for connection in connections.values():
+            connection.dedupe_refs()
+
+        return media_rows, review_rows, title_year_set, connections
+
+    def translate_review_facts(review_facts, connections, translations):
+        # Shard codes of the review foreign keys -> ids of the merged connections
+        review_facts = dict(review_facts)
+        for column, name in REVIEW_FOREIGN_KEYS.items():
+            ids = connections[name].ids
+            codes = translations[name][np.frombuffer(review_facts[column], np.int64)]
+            review_facts[column] = [ids[code] for code in codes.tolist()]
+        return review_facts
+
+    def clean_review_facts(reviews_df: pd.DataFrame) -> pd.DataFrame:
+        reviews_df = reviews_df.dropna(subset=["rating"])
+        return reviews_df.drop_duplicates(
+            subset=["time_id", "section_id", "reviewer_id", "media_info_id"]
+        )
+
     ##################################################################
     # ---------< IMDB >--------------------------------------------- #
     ##################################################################
@@ -123,12 +305,15 @@ class MediaBuilder:
             if year is None:
                 continue  # On ne peut pas matcher sans année
 
+            # Normalized once per media, shared by its join year rows
+            target_tokens = MediaTokenUtils.title_tokens(row["primary_title"])
             # Pour tenir en compte de l'intervalle des années on ajoute une ligne par possible année de jointure, filtrée après.
             for y in range(int(year) - year_interval, int(year) + year_interval + 1):
                 targets_data.append(
                     {
                         "target_id": id,
                         "target_title": row["primary_title"],
+                        "target_tokens": target_tokens,
                         "target_year": year,
                         "join_year": y,
                         "target_runtime": row["duration"],
@@ -141,7 +326,7 @@ class MediaBuilder:
 
     def build_imdb_tconst_lookup_by_primary_title(
         media_rows: dict,
-        title_basics_path: Path,
+        imdb: IMDBDataset,
         title_year_set: set,
         chunksize: int = 1_000_000,
     ) -> dict:
@@ -154,21 +339,25 @@ class MediaBuilder:
 
         if targets_df is None:
             return {}
+        # Titles are tokenized once per media / IMDb title, not once per candidate pair
+        targets_df["target_pos"] = np.arange(len(targets_df))
+        target_tokens = targets_df["target_tokens"]
+        # Blocking: candidates of the same year sharing a token only
+        targets_index = MediaTokenUtils.build_token_index(
+            target_tokens, targets_df["join_year"], "target_pos"
+        )
 
         for chunk_idx, chunk_df in enumerate(
-            pd.read_csv(
-                title_basics_path,
-                sep="\t",
-                compression="gzip",
-                chunksize=chunksize,
-                usecols=[
+            imdb.read(
+                "title.basics",
+                columns=[
                     "tconst",
                     "primaryTitle",
                     "startYear",
                     "titleType",
                     "runtimeMinutes",
                 ],
-                dtype=str,
+                chunksize=chunksize,
             ),
             start=1,
         ):
@@ -178,10 +367,17 @@ class MediaBuilder:
                 chunk_df, year_to_title=title_year_set
             )
             LOG.info(f"CLEANED : {chunksize - chunk_df.shape[0]}")
-
-            # --> Filter by year
-            candidates = MediaCleaningUtils.filter_year_equivalent_candidates(
-                chunk_df, targets_df
+            chunk_df["imdb_pos"] = np.arange(len(chunk_df))
+            chunk_tokens = MediaTokenUtils.normalize_title(chunk_df, "primaryTitle")
+
+            # --> Filter by year and common title token
+            candidates = MediaCleaningUtils.filter_token_equivalent_candidates(
+                chunk_df,
+                MediaTokenUtils.build_token_index(
+                    chunk_tokens, chunk_df["startYear"], "imdb_pos"
+                ),
+                targets_df,
+                targets_index,
             )
             if candidates.empty:
                 LOG.info(f"None found in same year")
@@ -196,17 +392,11 @@ class MediaBuilder:
                 continue
 
             # Matching Titles
-            candidates["normTIMDB"] = MediaTokenUtils.normalize_title(
-                candidates, "primaryTitle"
-            )
-            candidates["normTTARGET"] = MediaTokenUtils.normalize_title(
-                candidates, "target_title"
-            )
-            candidates["similarity"] = candidates.apply(
-                lambda row: MediaTokenUtils.jaccard_title_similarity(
-                    row["normTIMDB"], row["normTTARGET"]
-                ),
-                axis=1,
+            candidates["similarity"] = MediaTokenUtils.jaccard_similarity_pairs(
+                chunk_tokens,
+                target_tokens,
+                candidates["imdb_pos"],
+                candidates["target_pos"],
             )
             candidates = candidates[candidates["similarity"] >= 0.6]
 
@@ -217,96 +407,73 @@ class MediaBuilder:
             LOG.info(f"MATCHES : {matches} - total : {total_matched}/{len(media_rows)}")
             LOG.info(f"Scanned {chunk_idx * chunksize:,} IMDb rows...")
 
+        cache_info = MediaTokenUtils.title_cache_info()
+        LOG.info(
+            f"[IMDb] Title normalization memo: {cache_info.hits:,} hits, "
+            f"{cache_info.misses:,} misses ({cache_info.currsize:,} titles kept)"
+        )
         return result
 
     def build_roles_for_media(
         imdb_matches: dict,
-        imdb_dir: Path,
+        imdb: IMDBDataset,
         chunksize: int = 5_000_000,
     ) -> pd.DataFrame:
         LOG.info("\n[ IMDb: Extracting roles for media ]")
 
-        role_connection = {}
-        required_nconsts = set()
-
-        principals_path = imdb_dir / "title.principals.tsv.gz"
-
-        LOG.info("[IMDb] Scanning title.principals.tsv.gz")
-
-        for chunk_idx, chunk in enumerate(
-            pd.read_csv(
-                principals_path,
-                sep="\t",
-                compression="gzip",
-                dtype=str,
-                usecols=["tconst", "nconst", "category", "job", "characters"],
-                chunksize=chunksize,
-            ),
-            start=1,
-        ):
-            chunk = chunk[chunk["tconst"].isin(imdb_matches)].copy()
-            if chunk.empty:
-                continue
-
-            # Obtain cleaned roles, erasing None
-            chunk["characters"] = MediaCleaningUtils.clean_characters(chunk)
-            chunk["job"] = MediaCleaningUtils.clean_job(chunk)
-            chunk["role"] = chunk["characters"].combine_first(chunk["job"])
-            chunk = chunk.dropna(subset=["role"])
-            # Obtain playmethod
-            chunk["play_method"] = MediaCleaningUtils.clean_category(chunk)
-            chunk = chunk.drop_duplicates(subset=["nconst", "play_method", "role"])
-            # Map to metacritic media
-            chunk["ref_id"] = chunk["tconst"].replace(imdb_matches, regex=False)
-
-            # Map distinct people
-            for row in chunk.itertuples(index=False):
-                media_id = imdb_matches[row.tconst]
-                MediaMappingUtils.map_distinct_value(
-                    {
-                        "ref_id": media_id,
-                        "nconst": row.nconst,
-                        "play_method": row.play_method,
-                        "role": row.role,
-                    },
-                    role_connection,
-                    pk_attributes=["nconst", "play_method", "role"],
-                )
-                required_nconsts.add(row.nconst)
-
-            LOG.info(f"Scanned {chunk_idx * chunksize:,} IMDb CHARACTERS rows...")
-
-        nconst_to_name = {}
-        names_path = imdb_dir / "name.basics.tsv.gz"
-
-        LOG.info("[IMDb] Scanning name.basics.tsv.gz")
-
-        for chunk_idx, chunk in enumerate(
-            pd.read_csv(
-                names_path,
-                sep="\t",
-                compression="gzip",
-                dtype=str,
-                usecols=["nconst", "primaryName"],
-                chunksize=chunksize,
-            ),
-            start=1,
-        ):
-            chunk = chunk[chunk["nconst"].isin(required_nconsts)]
-            if chunk.empty:
-                continue
-
-            # merge chunk and roles
-            for row in chunk.itertuples(index=False):
-                nconst_to_name[row.nconst] = row.primaryName
-
-            LOG.info(f"Scanned {chunk_idx * chunksize:,} IMDb NAMES rows...")
+        # Principals of the matched titles only (tconst pushed down to the reader)
+        LOG.info("[IMDb] Scanning title.principals")
+        principals = imdb.scan(
+            "title.principals",
+            columns=["tconst", "nconst", "category", "job", "characters"],
+            keys=imdb_matches,
+            chunksize=chunksize,
+        )
+        LOG.info(f"[IMDb] {len(principals):,} principals of the matched titles")
+
+        # Obtain cleaned roles, erasing None
+        principals["characters"] = MediaCleaningUtils.clean_characters(principals)
+        principals["job"] = MediaCleaningUtils.clean_job(principals)
+        principals["role"] = principals["characters"].combine_first(principals["job"])
+        principals = principals.dropna(subset=["role"])
+        # Obtain playmethod
+        principals["play_method"] = MediaCleaningUtils.clean_category(principals)
+        principals = principals.drop_duplicates(
+            subset=["tconst", "nconst", "play_method", "role"]
+        )
+        # Map to metacritic media
+        principals["ref_id"] = principals["tconst"].map(imdb_matches)
+
+        # Hash join of the names of the credited people (nconst pushed down)
+        LOG.info("[IMDb] Scanning name.basics")
+        names = imdb.scan(
+            "name.basics",
+            columns=["nconst", "primaryName"],
+            keys=set(principals["nconst"]),
+            chunksize=chunksize,
+        )
+        principals = principals.merge(
+            names.drop_duplicates(subset=["nconst"]), on="nconst", how="left"
+        )
 
-            for role_attributes in role_connection.values():
-                primary_name = nconst_to_name.get(role_attributes["nconst"])
-                if not primary_name:
-                    continue
-                role_attributes["person_name"] = primary_name
+        # Map distinct people
+        role_connection = {}
+        keys = key_generator("ROLES")
+        for row in principals.itertuples(index=False):
+            role_row = {
+                "ref_id": row.ref_id,
+                "nconst": row.nconst,
+                "play_method": row.play_method,
+                "role": row.role,
+            }
+            if isinstance(row.primaryName, str) and row.primaryName:
+                role_row["person_name"] = row.primaryName
+            MediaMappingUtils.map_distinct_value(
+                role_row,
+                role_connection,
+                pk_attributes=["nconst", "play_method", "role"],
+                keys=keys,
+            )
 
         LOG.info("< [IMDb] Finished joinning roles >")
         return role_connection
@@ -315,20 +482,19 @@ class MediaBuilder:
     # ---------< Generic >------------------------------------------ #
     ##################################################################
 
-    def build_bridge_rows(main_rows, foreign_key_titles, main_title):
-        bridge_dfs = {fkt: [] for fkt in foreign_key_titles}
-        for main_id, row in main_rows.items():
-            for fk_title in foreign_key_titles:
-                if len(row[fk_title]) == 0:
-                    del row[fk_title]
-                    continue
-                fk_weight = 1 / len(row[fk_title])
-                for fk in row[fk_title]:
-                    bridge_dfs[fk_title].append(
-                        {main_title: main_id, f"{fk_title}": fk, "weight": fk_weight}
-                    )
-                del row[fk_title]
-        return bridge_dfs
+    def build_bridge_columns(
+        main_ids: pd.Index, distinct_value_set, main_title, foreign_key_title
+    ) -> dict[str, np.ndarray]:
+        # Bridge rows as columns, weight: 1 / number of foreign keys of the main row
+        row_codes, dim_codes, dim_ids = MediaMappingUtils.foreign_key_codes(
+            main_ids, distinct_value_set
+        )
+        counts = np.bincount(row_codes, minlength=len(main_ids))
+        return {
+            main_title: main_ids.to_numpy()[row_codes],
+            foreign_key_title: dim_ids[dim_codes],
+            "weight": 1 / counts[row_codes],
+        }
 
     def build_and_save_dataframe_from_rows(
         rows,
@@ -1,7 +1,13 @@
 from .execution import safe_execute, ExitCode, SUCCESS, FAILURE
 from .batch_generator import BatchGenerator
 from .mongo_loader import MongoLoader
+from .parquet_loader import ParquetLoader
+from .media_source_reader import MediaSourceReader
+from .imdb_dataset import IMDBDataset
+from .fact_spill import FactSpill
+from .key_generator import KeyGenerator, key_generator
 from . import media_utils
+from . import serializer
 from . import logger
 
 __all__ = [
@@ -11,6 +17,13 @@ __all__ = [
     "FAILURE",
     "BatchGenerator",
     "MongoLoader",
+    "ParquetLoader",
+    "MediaSourceReader",
+    "IMDBDataset",
+    "FactSpill",
+    "KeyGenerator",
+    "key_generator",
     "media_utils",
+    "serializer",
     "logger",
 ]
@@ -1,5 +1,8 @@
 from typing import TypeVar, Generator, Iterator, Callable, Optional, Union
 
+import pandas as pd
+import pyarrow as pa
+
 T = TypeVar("T")  # generic type for items
 R = TypeVar("R")  # return type of the optional function
 
@@ -49,3 +52,25 @@ class BatchGenerator:
 
         self.completed = True
         raise StopIteration
+
+
+def dataframe_batches(
+    df: pd.DataFrame, batch_size: int, id_col_name: str | None = None
+) -> Iterator[pa.RecordBatch]:
+    """
+    Record batches of a DataFrame, converted one slice at a time with the schema of the
+    whole frame. NaN / NaT / None are nulls (None once read as python rows).
+    id_col_name: the index is added as the last column, as load_from_dict does with
+    index oriented rows.
+    """
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for start in range(0, len(df), batch_size):
+        df_slice = df.iloc[start : start + batch_size]
+        batch = pa.RecordBatch.from_pandas(
+            df_slice, schema=schema, preserve_index=False
+        )
+        if id_col_name:
+            batch = batch.append_column(
+                id_col_name, pa.array(df_slice.index, from_pandas=True)
+            )
+        yield batch
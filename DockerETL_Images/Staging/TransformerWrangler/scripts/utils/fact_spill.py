@@ -0,0 +1,98 @@
+from pathlib import Path
+from typing import Iterator
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .logger import LOG
+
+SPILL_BUCKETS = 16
+SPILL_PREFIX = "fact-spill-"
+
+
+class FactSpill:
+    """
+    Fact rows spilled to parquet chunks while they are built, instead of kept in RAM:
+    <directory>/fact-spill-XXXX/bucket-XX/part-XXXXX.parquet
+    Only the private fact-spill-* directories are created and removed, the configured
+    directory and its other content are left as is.
+    Column batches are buffered as Arrow tables and written once their size exceeds
+    the memory budget (bytes). Rows are split in buckets by a hash of bucket_column,
+    rows sharing its value are in the same bucket and are read back together.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        bucket_column: str,
+        memory_budget: int,
+        buckets: int = SPILL_BUCKETS,
+    ):
+        self.bucket_column = bucket_column
+        self.memory_budget = memory_budget
+        self.buckets = buckets
+        self._pending: list[pa.Table] = []
+        self._pending_bytes = 0
+        self._parts = 0
+        self.num_rows = 0
+        # Chunks left by a previous run that did not finish are replaced
+        parent = Path(directory)
+        parent.mkdir(parents=True, exist_ok=True)
+        for stale_dir in parent.glob(f"{SPILL_PREFIX}*"):
+            shutil.rmtree(stale_dir, ignore_errors=True)
+        self.directory = Path(tempfile.mkdtemp(prefix=SPILL_PREFIX, dir=parent))
+
+    def append(self, columns: dict) -> None:
+        # columns: {column name: array or list of values}, the same length each
+        table = pa.table(
+            {
+                name: pa.array(values, from_pandas=True)
+                for name, values in columns.items()
+            }
+        )
+        self._pending.append(table)
+        self._pending_bytes += table.nbytes
+        self.num_rows += table.num_rows
+        if self._pending_bytes > self.memory_budget:
+            self.spill()
+
+    def spill(self) -> None:
+        if not self._pending:
+            return
+        # Batches may differ in inferred types (all null ratings...)
+        table = pa.concat_tables(self._pending, promote_options="permissive")
+        LOG.info(
+            f"[Spill] {table.num_rows} rows ({self._pending_bytes >> 20} MB) to {self.directory}"
+        )
+        self._pending, self._pending_bytes = [], 0
+
+        keys = table[self.bucket_column].to_numpy(zero_copy_only=False)
+        buckets = pd.util.hash_array(keys) % self.buckets
+        for bucket in np.unique(buckets):
+            bucket_dir = self.directory / f"bucket-{bucket:02d}"
+            bucket_dir.mkdir(exist_ok=True)
+            pq.write_table(
+                table.take(np.flatnonzero(buckets == bucket)),
+                bucket_dir / f"part-{self._parts:05d}.parquet",
+            )
+        self._parts += 1
+
+    def read_buckets(self) -> Iterator[pd.DataFrame]:
+        # One bucket at a time, its rows in the order they were appended
+        self.spill()
+        for bucket_dir in sorted(self.directory.glob("bucket-*")):
+            yield pd.concat(
+                [
+                    pq.read_table(part).to_pandas()
+                    for part in sorted(bucket_dir.iterdir())
+                ],
+                ignore_index=True,
+            )
+
+    def cleanup(self) -> None:
+        self._pending, self._pending_bytes = [], 0
+        shutil.rmtree(self.directory, ignore_errors=True)
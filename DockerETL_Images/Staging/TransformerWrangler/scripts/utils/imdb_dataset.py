@@ -0,0 +1,187 @@
+from bisect import bisect_left
+from pathlib import Path
+from typing import Iterable, Iterator
+import gzip
+import json
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+
+from .logger import LOG
+
+# Sort key of every IMDb file (the dumps are ordered by it), used for row group pruning
+IMDB_KEYS = {
+    "title.basics": "tconst",
+    "title.principals": "tconst",
+    "name.basics": "nconst",
+}
+# Numeric columns, "\N" becomes null. Other columns are kept as raw strings
+IMDB_TYPES = {
+    "title.basics": {
+        "isAdult": pa.int8(),
+        "startYear": pa.int32(),
+        "endYear": pa.int32(),
+        "runtimeMinutes": pa.int32(),
+    },
+    "title.principals": {"ordering": pa.int32()},
+    "name.basics": {"birthYear": pa.int32(), "deathYear": pa.int32()},
+}
+ROW_GROUP_SIZE = 256_000
+CSV_BLOCK_SIZE = 64 << 20
+
+
+class IMDBDataset:
+    """
+    Reads the IMDb <name>.tsv.gz files of a directory through a local Parquet copy:
+    <cache_dir>/<name>.parquet        typed columns, row groups in the key order
+    <cache_dir>/<name>.source.json    size / mtime of the converted tsv.gz
+    A file is converted on its first read and reused until the tsv.gz changes.
+    Without cache_dir (or if the conversion fails) the tsv.gz is parsed as before.
+    """
+
+    def __init__(self, source_dir: str | Path, cache_dir: str | Path | None = None):
+        self.source_dir = Path(source_dir)
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+
+    def source_path(self, name: str) -> Path:
+        return self.source_dir / f"{name}.tsv.gz"
+
+    def read(
+        self,
+        name: str,
+        columns: list[str],
+        chunksize: int,
+        keys: Iterable[str] | None = None,
+    ) -> Iterator[pd.DataFrame]:
+        """
+        Chunks of the needed columns of an IMDb file. With keys, only the rows of these
+        tconst/nconst are kept (the key column must be read), and only the row groups
+        which may hold one of them are read from the parquet copy.
+        """
+        key_column = IMDB_KEYS[name]
+        parquet_path = self.prepare(name) if self.cache_dir else None
+        if parquet_path is None:
+            for chunk in pd.read_csv(
+                self.source_path(name),
+                sep="\t",
+                compression="gzip",
+                usecols=columns,
+                dtype=str,
+                chunksize=chunksize,
+            ):
+                if keys is not None:
+                    chunk = chunk[chunk[key_column].isin(keys)]
+                if not chunk.empty:
+                    yield chunk
+            return
+
+        parquet_file = pq.ParquetFile(parquet_path)
+        row_groups = None
+        if keys is not None:
+            keys = pa.array(sorted(keys), pa.string())
+            row_groups = self._row_groups_with_keys(parquet_file, key_column, keys)
+            LOG.info(
+                f"[IMDb] {name}: {len(row_groups)}/{parquet_file.num_row_groups} row groups to read"
+            )
+        for batch in parquet_file.iter_batches(
+            batch_size=chunksize, columns=columns, row_groups=row_groups
+        ):
+            if keys is not None:
+                batch = batch.filter(pc.is_in(batch[key_column], value_set=keys))
+            if batch.num_rows:
+                yield batch.to_pandas()
+
+    def scan(
+        self,
+        name: str,
+        columns: list[str],
+        keys: Iterable[str],
+        chunksize: int,
+    ) -> pd.DataFrame:
+        # Every row of the keys at once (filtered chunks are small)
+        chunks = list(self.read(name, columns, chunksize, keys))
+        if not chunks:
+            return pd.DataFrame(columns=columns, dtype=str)
+        return pd.concat(chunks, ignore_index=True)
+
+    def prepare(self, name: str) -> Path | None:
+        # Parquet copy of the tsv.gz, converted if missing or outdated
+        source = self.source_path(name)
+        parquet_path = self.cache_dir / f"{name}.parquet"
+        manifest_path = self.cache_dir / f"{name}.source.json"
+        stat = source.stat()
+        signature = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+        if parquet_path.exists() and manifest_path.exists():
+            try:
+                if json.loads(manifest_path.read_text()) == signature:
+                    return parquet_path
+            except json.JSONDecodeError:
+                pass
+
+        LOG.info(f"[IMDb] Converting {source.name} to {parquet_path}")
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        manifest_path.unlink(missing_ok=True)
+        tmp_path = parquet_path.with_suffix(".parquet.tmp")
+        try:
+            self._convert(source, tmp_path, IMDB_TYPES.get(name, {}))
+        except (pa.ArrowInvalid, OSError) as e:
+            LOG.warning(f"[IMDb] {source.name} conversion failed, reading tsv: {e}")
+            tmp_path.unlink(missing_ok=True)
+            return None
+        tmp_path.replace(parquet_path)
+        manifest_path.write_text(json.dumps(signature))
+        return parquet_path
+
+    @staticmethod
+    def _convert(source: Path, parquet_path: Path, column_types: dict) -> None:
+        # Every other column is a string, whatever the values of its first rows
+        with gzip.open(source, "rt", encoding="utf-8") as f:
+            header = f.readline().rstrip("\n").split("\t")
+        column_types = {c: column_types.get(c, pa.string()) for c in header}
+        reader = pcsv.open_csv(
+            source,
+            read_options=pcsv.ReadOptions(block_size=CSV_BLOCK_SIZE),
+            parse_options=pcsv.ParseOptions(delimiter="\t", quote_char=False),
+            convert_options=pcsv.ConvertOptions(
+                column_types=column_types,
+                null_values=["\\N"],
+                strings_can_be_null=False,  # "\N" strings are kept as in the tsv
+            ),
+        )
+        with pq.ParquetWriter(
+            parquet_path, reader.schema, compression="zstd"
+        ) as writer:
+            # Full row groups only, the rest waits for the next csv blocks
+            pending = pa.Table.from_batches([], schema=reader.schema)
+            for batch in reader:
+                pending = pa.concat_tables([pending, pa.Table.from_batches([batch])])
+                full_rows = pending.num_rows - pending.num_rows % ROW_GROUP_SIZE
+                if full_rows:
+                    writer.write_table(
+                        pending.slice(0, full_rows), row_group_size=ROW_GROUP_SIZE
+                    )
+                    pending = pending.slice(full_rows)
+            if pending.num_rows:
+                writer.write_table(pending, row_group_size=ROW_GROUP_SIZE)
+
+    @staticmethod
+    def _row_groups_with_keys(
+        parquet_file: pq.ParquetFile, key_column: str, keys: pa.Array
+    ) -> list[int]:
+        # Row groups whose [min, max] key statistics contain at least one (sorted) key
+        keys = keys.to_pylist()
+        key_idx = parquet_file.schema_arrow.get_field_index(key_column)
+        row_groups = []
+        for i in range(parquet_file.num_row_groups):
+            stats = parquet_file.metadata.row_group(i).column(key_idx).statistics
+            if stats is None or not stats.has_min_max:
+                row_groups.append(i)
+                continue
+            first = bisect_left(keys, stats.min)
+            if first < len(keys) and keys[first] <= stats.max:
+                row_groups.append(i)
+        return row_groups
@@ -0,0 +1,68 @@
+from functools import cache
+import hashlib
+import os
+import uuid
+
+# uuid  : random uuid4 strings (not idempotent across runs)
+# uuid5 : uuid5 strings of the natural key, same String columns as uuid
+# hash  : 63 bits blake2b integer of the natural key (BIGINT columns)
+KEY_STRATEGIES = ("uuid", "uuid5", "hash")
+DEFAULT_KEY_STRATEGY = "uuid"
+
+KEY_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_DNS, "insarama")
+NATURAL_KEY_SEPARATOR = "\x1f"
+
+
+def parse_key_strategies(spec: str | None) -> dict[str, str]:
+    # "FACT_REVIEWS=hash,DIM_TIME=uuid5" -> {"FACT_REVIEWS": "hash", "DIM_TIME": "uuid5"}
+    strategies = {}
+    for entry in filter(None, (spec or "").split(",")):
+        table, _, strategy = entry.partition("=")
+        strategy = strategy.strip().lower()
+        if strategy not in KEY_STRATEGIES:
+            raise ValueError(f"Unknown key strategy '{strategy}' for {table.strip()}")
+        strategies[table.strip().upper()] = strategy
+    return strategies
+
+
+class KeyGenerator:
+    """
+    Surrogate keys of one table, derived from the natural key of its rows.
+    Deterministic strategies (uuid5, hash) give the same key to the same row on
+    every run and in every worker process, re-runs are idempotent.
+    """
+
+    def __init__(self, table: str, strategy: str = DEFAULT_KEY_STRATEGY):
+        if strategy not in KEY_STRATEGIES:
+            raise ValueError(f"Unknown key strategy '{strategy}' for {table}")
+        self.table = table
+        self.strategy = strategy
+        self.namespace = uuid.uuid5(KEY_NAMESPACE, table)
+
+    @property
+    def deterministic(self) -> bool:
+        return self.strategy != "uuid"
+
+    def key(self, *natural_key) -> str | int:
+        if self.strategy == "uuid":
+            return str(uuid.uuid4())
+        name = NATURAL_KEY_SEPARATOR.join(map(str, natural_key))
+        if self.strategy == "uuid5":
+            return str(uuid.uuid5(self.namespace, name))
+        digest = hashlib.blake2b(name.encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big") >> 1  # positive signed BIGINT
+
+    def __repr__(self):
+        return f"<KeyGenerator({self.table}, {self.strategy})>"
+
+
+@cache
+def key_generator(table: str) -> KeyGenerator:
+    """
+    Key generator of a table, configured by the environment (shared with SQLPersistor):
+    SURROGATE_KEY_STRATEGY   default strategy of every table
+    SURROGATE_KEYS           per table strategies, "TABLE=strategy,..."
+    """
+    default = os.environ.get("SURROGATE_KEY_STRATEGY") or DEFAULT_KEY_STRATEGY
+    strategies = parse_key_strategies(os.environ.get("SURROGATE_KEYS"))
+    return KeyGenerator(table, strategies.get(table, default.lower()))
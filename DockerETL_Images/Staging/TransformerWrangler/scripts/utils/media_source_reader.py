@@ -0,0 +1,81 @@
+from pathlib import Path
+from typing import Iterator
+from . import serializer
+from .logger import LOG
+import gzip
+import json
+import zlib
+
+SHARD_INDEX_NAME = "shards.index.jsonl"
+SHARD_PATTERN = "part-*.ndjson.gz"
+
+# (file, indexed lines of a shard | None for a json file)
+MediaSource = tuple[Path, frozenset[int] | None]
+
+
+class MediaSourceReader:
+    """
+    Reads the scraped media of a category directory, whatever the scrapper output format:
+    - <slug>.json files (one pretty-printed media per file)
+    - part-XXXXX.ndjson.gz shards + shards.index.jsonl (one compact media per line)
+    typed : records are checked against the scrapper layout (serializer.MediaRecord)
+    """
+
+    @staticmethod
+    def _decode(data: bytes, typed: bool) -> dict:
+        if typed:
+            try:
+                return serializer.decode_media(data, typed=True)
+            except serializer.SchemaError as e:
+                LOG.warning(f"Media record outside of the expected layout: {e}")
+        return serializer.decode_media(data)
+
+    @staticmethod
+    def iter_records(cat_dir: Path, typed: bool = False) -> Iterator[dict]:
+        for path, lines in MediaSourceReader.list_sources(cat_dir):
+            yield from MediaSourceReader.read_source(path, lines, typed)
+
+    @staticmethod
+    def list_sources(cat_dir: Path) -> list[MediaSource]:
+        # Files of the category with the lines to read (None: whole json file)
+        sources = [(jf, None) for jf in cat_dir.glob("*.json")]
+        if (cat_dir / SHARD_INDEX_NAME).exists():
+            indexed = MediaSourceReader._indexed_lines(cat_dir)
+            for shard in sorted(cat_dir.glob(SHARD_PATTERN)):
+                lines = indexed.get(shard.name)
+                if lines:
+                    sources.append((shard, frozenset(lines)))
+        return sources
+
+    @staticmethod
+    def read_source(
+        path: Path, lines: frozenset[int] | None = None, typed: bool = False
+    ) -> Iterator[dict]:
+        if lines is None:
+            yield MediaSourceReader._decode(path.read_bytes(), typed)
+            return
+        with gzip.open(path, "rb") as f:
+            try:
+                for line_num, line in enumerate(f):
+                    if line_num in lines:
+                        yield MediaSourceReader._decode(line, typed)
+            except (EOFError, zlib.error, gzip.BadGzipFile):
+                # Shard cut by a crash: every indexed line before the cut was read
+                return
+
+    @staticmethod
+    def _indexed_lines(cat_dir: Path) -> dict[str, set[int]]:
+        # Last indexed (shard, line) of every slug, unindexed lines are partial writes
+        latest = {}
+        with open(cat_dir / SHARD_INDEX_NAME, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # line torn by a crash
+                latest[entry["slug"]] = (entry["shard"], entry["line"])
+
+        indexed = {}
+        for shard, line in latest.values():
+            indexed.setdefault(shard, set()).add(line)
+        return indexed
@@ -2,10 +2,12 @@ from .media_extract_utils import MediaExtractUtils
 from .media_cleaning_utils import MediaCleaningUtils
 from .media_mapping_utils import MediaMappingUtils
 from .media_token_utils import MediaTokenUtils
+from .distinct_value_encoder import DistinctValueEncoder
 
 __all__ = [
     "MediaExtractUtils",
     "MediaCleaningUtils",
     "MediaMappingUtils",
     "MediaTokenUtils",
+    "DistinctValueEncoder",
 ]
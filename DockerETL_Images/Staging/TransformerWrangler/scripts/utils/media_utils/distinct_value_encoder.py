@@ -0,0 +1,137 @@
+from array import array
+from collections.abc import Mapping
+from itertools import chain
+from operator import itemgetter
+import sys
+import uuid
+
+import numpy as np
+
+from utils.key_generator import KeyGenerator
+
+
+class DistinctValueEncoder(Mapping):
+    """
+    Dictionary encoding of the distinct values of a dimension (bulk map_distinct_values):
+    connection key (createConnectionKey) -> integer code -> surrogate id, attribute
+    values (tuple) and refs, the ids of the rows using the value. Refs are kept in one
+    buffer per code: array('q') for BIGINT ids (hash keys), a list otherwise.
+    Reads as the {connection key: {"id", "refs", **attributes}} dict of map_distinct_value.
+    """
+
+    def __init__(self, attributes, pk_attributes, keys: KeyGenerator = None):
+        self.attributes = tuple(attributes)
+        self.pk_attributes = tuple(pk_attributes)
+        self.keys = keys
+        self.codes: dict[str, int] = {}  # interned connection key -> code
+        self.ids = []
+        self.values_of = []  # attribute values of every code
+        self.refs = []  # refs buffer of every code
+        self.raw_codes = {}  # raw differenciating values -> code, skips the key string
+
+    def _add(self, key, id, values, refs) -> int:
+        code = self.codes[sys.intern(key)] = len(self.ids)
+        self.ids.append(id)
+        self.values_of.append(values)
+        self.refs.append(refs)
+        return code
+
+    def _codes(self, rows):
+        # Code of every (ref_id, *attribute values) row, new values are added
+        # Differenciating values of a row (after ref_id)
+        pk_values = itemgetter(
+            *(self.attributes.index(att) + 1 for att in self.pk_attributes)
+        )
+        single = len(self.pk_attributes) == 1
+        codes, raw_codes = self.codes, self.raw_codes
+        for row in rows:
+            raw = pk_values(row)
+            code = raw_codes.get(raw)
+            if code is None:
+                key = "".join(
+                    [str(value).lower() for value in ((raw,) if single else raw)]
+                )
+                code = codes.get(key)
+                if code is None:
+                    code = self._add(
+                        key,
+                        self.keys.key(key) if self.keys else str(uuid.uuid4()),
+                        row[1:],
+                        array("q") if type(row[0]) is int else [],
+                    )
+                raw_codes[raw] = code
+            yield code
+
+    def encode(self, rows):
+        """
+        rows: (ref_id, *attribute values) tuples, values in the order of attributes.
+        """
+        refs = self.refs
+        for row, code in zip(rows, self._codes(rows)):
+            refs[code].append(row[0])
+
+    def encode_codes(self, rows) -> list[int]:
+        # Codes of the rows without keeping their refs (foreign keys set by the caller)
+        return list(self._codes(rows))
+
+    def merge(self, other: "DistinctValueEncoder") -> np.ndarray:
+        """
+        Reduce of encoders built separately: the first known row of a key is kept.
+        Returns the code of every value of other in this encoder.
+        """
+        translation = np.empty(len(other.codes), dtype=np.int64)
+        for key, other_code in other.codes.items():
+            code = self.codes.get(key)
+            if code is None:
+                code = self._add(
+                    key,
+                    other.ids[other_code],
+                    other.values_of[other_code],
+                    other.refs[other_code],
+                )
+            else:
+                self.refs[code].extend(other.refs[other_code])
+            translation[other_code] = code
+        return translation
+
+    def __getstate__(self):
+        # The raw values cache is only useful while encoding
+        return self.__dict__ | {"raw_codes": {}}
+
+    def dedupe_refs(self):
+        # First reference of every ref id, in reference order
+        self.raw_codes = {}
+        for code, refs in enumerate(self.refs):
+            if isinstance(refs, array):
+                buffer = np.frombuffer(refs, dtype=np.int64)
+                _, first = np.unique(buffer, return_index=True)
+                self.refs[code] = array("q", buffer[np.sort(first)].tobytes())
+            else:
+                self.refs[code] = list(dict.fromkeys(refs))
+
+    def ref_codes(self) -> tuple[np.ndarray, np.ndarray]:
+        # Columnar refs: every ref id, and the code of the value it uses
+        lengths = np.fromiter(map(len, self.refs), dtype=np.int64, count=len(self.refs))
+        dim_codes = np.repeat(np.arange(len(self.refs), dtype=np.int64), lengths)
+        if self.refs and all(isinstance(refs, array) for refs in self.refs):
+            refs = np.frombuffer(b"".join(map(bytes, self.refs)), dtype=np.int64)
+        else:
+            refs = np.fromiter(chain.from_iterable(self.refs), dtype=object)
+        return refs, dim_codes
+
+    def __getitem__(self, key) -> dict:
+        code = self.codes[key]
+        return {"id": self.ids[code], "refs": list(self.refs[code])} | dict(
+            zip(self.attributes, self.values_of[code])
+        )
+
+    def __iter__(self):
+        return iter(self.codes)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __repr__(self):
+        return (
+            f"<DistinctValueEncoder({', '.join(self.attributes)}): {len(self)} values>"
+        )
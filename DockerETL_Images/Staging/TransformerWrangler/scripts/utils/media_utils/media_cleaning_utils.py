@@ -9,7 +9,10 @@ class MediaCleaningUtils:
 
         df = df.copy()
 
-        df["startYear"] = pd.to_numeric(df["startYear"].str.strip(), errors="coerce")
+        # Raw tsv strings or typed columns of the IMDb parquet copy
+        df["startYear"] = pd.to_numeric(df["startYear"], errors="coerce")
+        # Once per title rather than per candidate pair after the year join
+        df["runtimeMinutes"] = pd.to_numeric(df["runtimeMinutes"], errors="coerce")
 
         valid_title_test = (
             df["primaryTitle"].astype("string").str.strip().replace("\\N", pd.NA).ne("")
@@ -61,6 +64,27 @@ class MediaCleaningUtils:
 
         return year_equivalent_targets
 
+    def filter_token_equivalent_candidates(
+        chunk_df, chunk_index, targets_df, targets_index
+    ):
+        """
+        Blocked filter_year_equivalent_candidates: only the IMDb/target pairs of the
+        same year sharing a title token (MediaTokenUtils.build_token_index of both
+        sides, positions imdb_pos / target_pos), in the order of the year join.
+        Pairs without a common token have a null title similarity.
+        """
+        pairs = pd.merge(chunk_index, targets_index, on=["block", "token"])
+        pairs = pairs[["imdb_pos", "target_pos"]].drop_duplicates()
+        pairs = pairs.sort_values(["imdb_pos", "target_pos"])
+
+        return pd.concat(
+            [
+                chunk_df.iloc[pairs["imdb_pos"].to_numpy()].reset_index(drop=True),
+                targets_df.iloc[pairs["target_pos"].to_numpy()].reset_index(drop=True),
+            ],
+            axis=1,
+        )
+
     def filter_runtime_equivalent_targets(targets_df, runtime_minutes_interval=2):
         # Turn to num minutes, even nulls
         targets_df["runtimeMinutes"] = pd.to_numeric(
@@ -1,4 +1,9 @@
 import uuid
+
+import numpy as np
+import pandas as pd
+
+from utils.key_generator import KeyGenerator
 from utils.logger import LOG
 
 
@@ -7,7 +12,9 @@ class MediaMappingUtils:
     def createConnectionKey(row, pk_attributes):
         return "".join(str(row[pk_att]).lower() for pk_att in pk_attributes)
 
-    def map_distinct_value(new_row_to_add, distinct_value_set, pk_attributes):
+    def map_distinct_value(
+        new_row_to_add, distinct_value_set, pk_attributes, keys: KeyGenerator = None
+    ):
         # new_row[pk_attributes] is the string_key that mixes all differenciating primary key values
         ref_id = new_row_to_add["ref_id"]
         del new_row_to_add["ref_id"]
@@ -19,16 +26,32 @@ class MediaMappingUtils:
             distinct_value_set[distinct_pk_key]["refs"].append(ref_id)
         else:
             distinct_value_set[distinct_pk_key] = {
-                "id": str(uuid.uuid4()),
+                "id": keys.key(distinct_pk_key) if keys else str(uuid.uuid4()),
                 "refs": [ref_id],
             } | new_row_to_add
 
-    def map_distinct_values(new_rows_to_add, distinct_value_set, pk_attributes):
+    def map_distinct_values(
+        new_rows_to_add, distinct_value_set, pk_attributes, keys: KeyGenerator = None
+    ):
         for new_row in new_rows_to_add:
             MediaMappingUtils.map_distinct_value(
-                new_row, distinct_value_set, pk_attributes
+                new_row, distinct_value_set, pk_attributes, keys
             )
 
+    def merge_distinct_values(distinct_value_set, other_value_set):
+        # Reduce of connections built separately: the first known row of a key is kept
+        for distinct_pk_key, connection_row in other_value_set.items():
+            if distinct_pk_key in distinct_value_set:
+                distinct_value_set[distinct_pk_key]["refs"].extend(
+                    connection_row["refs"]
+                )
+            else:
+                distinct_value_set[distinct_pk_key] = connection_row
+
+    def dedupe_refs(distinct_value_set):
+        for connection_row in distinct_value_set.values():
+            connection_row["refs"] = list(dict.fromkeys(connection_row["refs"]))
+
     def remap_foreign_keys_and_build_distinct_rows(
         main_rows, distinct_value_set, foreign_key_attribute
     ):
@@ -45,17 +68,68 @@ class MediaMappingUtils:
             distinct_rows.append(distinct_row)
         return distinct_rows
 
+    def build_distinct_rows(distinct_value_set):
+        # Rows of the distinct values, without their refs
+        return [
+            {k: v for k, v in connection_row.items() if k != "refs"}
+            for connection_row in distinct_value_set.values()
+        ]
+
+    def foreign_key_codes(
+        main_ids: pd.Index, distinct_value_set
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Columnar refs of a connection, ordered by main row (stable: the distinct values
+        of a row keep their order): row codes (positions in main_ids), distinct value
+        codes, and the ids of the distinct values by code.
+        """
+        if hasattr(distinct_value_set, "ref_codes"):
+            refs, dim_codes = distinct_value_set.ref_codes()
+            dim_ids = np.array(distinct_value_set.ids, dtype=object)
+        else:
+            dim_ids, refs, lengths = [], [], []
+            for connection_row in distinct_value_set.values():
+                dim_ids.append(connection_row["id"])
+                refs.extend(connection_row["refs"])
+                lengths.append(len(connection_row["refs"]))
+            dim_ids = np.array(dim_ids, dtype=object)
+            refs = np.array(refs, dtype=object)
+            dim_codes = np.repeat(np.arange(len(lengths), dtype=np.int64), lengths)
+
+        row_codes = main_ids.get_indexer(refs)
+        if (row_codes < 0).any():
+            raise KeyError(f"Unknown refs: {refs[row_codes < 0][:5].tolist()}")
+        order = np.argsort(row_codes, kind="stable")
+        return row_codes[order], dim_codes[order], dim_ids
+
+    def remap_foreign_key_column(main_rows, distinct_value_set, foreign_key_attribute):
+        # Single valued foreign keys (one ref per main row at most) set from the codes
+        main_ids = pd.Index(list(main_rows))
+        row_codes, dim_codes, dim_ids = MediaMappingUtils.foreign_key_codes(
+            main_ids, distinct_value_set
+        )
+        foreign_keys = np.full(len(main_ids), None, dtype=object)
+        foreign_keys[row_codes] = dim_ids[dim_codes]
+        for main_row, foreign_key in zip(main_rows.values(), foreign_keys.tolist()):
+            main_row[foreign_key_attribute] = foreign_key
+        return MediaMappingUtils.build_distinct_rows(distinct_value_set)
+
     def map_best_candidate_to_target_title(candidates, result, best_found):
 
         # candidate: row of imdb merged with possible metacritic_title and similarity
         # result: tconst -> metacritic_title
         # best_similarity_found: metacritic_title_id -> [max_similarity_found_for_him, tconst]
 
+        # Rows in candidate order: replacements depend on the order, plain columns
+        # are iterated instead of row tuples
         matches_c = 0
-        for row in candidates.itertuples():
-            tconst = row.tconst
-            target_id = row.target_id
-            similarity = row.similarity
+        for tconst, target_id, similarity, target_title, imdb_title in zip(
+            candidates["tconst"].to_numpy(),
+            candidates["target_id"].to_numpy(),
+            candidates["similarity"].to_numpy(),
+            candidates["target_title"].to_numpy(),
+            candidates["primaryTitle"].to_numpy(),
+        ):
 
             # Check if target_id already has a better match
             if (
@@ -66,8 +140,8 @@ class MediaMappingUtils:
                 # If already assigned and indeed a better match
                 if target_id in best_found:
                     old_tconst = best_found[target_id]["associated"]
-                    LOG.info(
-                        f"Deleting previous assignment: {row.target_title} -> {best_found[target_id]["titleIMDB"]} ({best_found[target_id]["similarity"]})"
+                    LOG.debug(
+                        f"Deleting previous assignment: {target_title} -> {best_found[target_id]["titleIMDB"]} ({best_found[target_id]["similarity"]})"
                     )
                     matches_c -= 1
                     del result[old_tconst]
@@ -80,8 +154,8 @@ class MediaMappingUtils:
                         continue  # skip, this match is worse than existing
                     else:
                         # remove old worse assignment
-                        LOG.info(
-                            f"Deleting previous assignment: {row.primaryTitle} was assigned to "
+                        LOG.debug(
+                            f"Deleting previous assignment: {imdb_title} was assigned to "
                             f"{old_target}  with similarity {old_similarity}"
                         )
                         matches_c -= 1
@@ -91,11 +165,11 @@ class MediaMappingUtils:
                 best_found[target_id] = {
                     "similarity": similarity,
                     "associated": tconst,
-                    "titleIMDB": row.primaryTitle,
+                    "titleIMDB": imdb_title,
                 }
                 result[tconst] = target_id
                 matches_c += 1
-                LOG.info(
-                    f"New King of the Hill: {row.target_title} -> {row.primaryTitle} ({similarity})"
+                LOG.debug(
+                    f"New King of the Hill: {target_title} -> {imdb_title} ({similarity})"
                 )
         return matches_c
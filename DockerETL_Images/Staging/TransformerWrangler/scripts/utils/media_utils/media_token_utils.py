@@ -1,5 +1,5 @@
-from itertools import combinations
-import networkx as nx
+from functools import lru_cache
+import numpy as np
 import pandas as pd
 import re
 
@@ -39,18 +39,38 @@ STOPWORDS_FRANCHISE = {
 }
 
 IMDB_TITLE_STOPWORDS = {"the", "a", "and", "as"}
+# Token of titles normalized to no token (never produced by normalize_title)
+EMPTY_TITLE_TOKEN = ""
+
+# Title normalization: release years, then punctuation are removed before splitting
+YEAR_PATTERN = re.compile(r"\b(19|20)\d{2}\b")
+PUNCTUATION_PATTERN = re.compile(r"[^\w^\s]")
+WORD_PATTERN = re.compile(r"\w+")
+# Distinct IMDb titles kept by the normalization memo
+TITLE_CACHE_SIZE = 1 << 18
 
 
 class MediaTokenUtils:
 
-    def normalize_title(dataframe, input_col):
-        return (
-            dataframe[input_col]
-            .str.lower()
-            .str.replace(r"\b(19|20)\d{2}\b", "", regex=True)
-            .str.replace(r"[^\w^\s]", "", regex=True)
-            .str.findall(r"\w+")
+    def title_tokens(title: str) -> tuple[str, ...]:
+        title = PUNCTUATION_PATTERN.sub("", YEAR_PATTERN.sub("", title.lower()))
+        return tuple(WORD_PATTERN.findall(title))
+
+    # LRU memo of title_tokens, repeated IMDb titles (remakes, homonyms) are split once
+    cached_title_tokens = lru_cache(maxsize=TITLE_CACHE_SIZE)(title_tokens)
+
+    def normalize_title(dataframe, input_col, cached: bool = True):
+        # Token tuples of a title column, missing titles are kept as is
+        tokenize = (
+            MediaTokenUtils.cached_title_tokens
+            if cached
+            else MediaTokenUtils.title_tokens
         )
+        return dataframe[input_col].map(tokenize, na_action="ignore")
+
+    def title_cache_info():
+        # hits / misses / currsize of the title normalization memo
+        return MediaTokenUtils.cached_title_tokens.cache_info()
 
     def jaccard_title_similarity(a: str, b: str) -> float:
         set_a = set(a) if a else None
@@ -63,6 +83,128 @@ class MediaTokenUtils:
 
         return len(set_a & set_b) / len(set_a | set_b)
 
+    def build_token_index(token_lists: pd.Series, blocks, pos_col: str):
+        """
+        Inverted token index of titles for candidate blocking: one row per distinct
+        (position, block, token). Titles without token share the EMPTY_TITLE_TOKEN.
+        token_lists : Series of token lists (normalize_title)
+        blocks      : block key of every title (year)
+        """
+        tokens = token_lists.reset_index(drop=True)
+        tokens = tokens.where(tokens.str.len() > 0, [[EMPTY_TITLE_TOKEN]] * len(tokens))
+        index = pd.DataFrame(
+            {
+                pos_col: np.arange(len(tokens)),
+                "block": np.asarray(blocks),
+                "token": tokens,
+            }
+        ).explode("token")
+        return index.drop_duplicates(ignore_index=True)
+
+    def similar_token_set_pairs(token_lists: pd.Series, blocks, threshold: float):
+        """
+        Pairs of positions (left < right) of token lists of the same block whose sets have
+        a jaccard similarity >= threshold (> 0). Candidates are the rows sharing a token
+        (inverted index), rows without token or with a null block are never paired.
+        """
+        if threshold <= 0:
+            raise ValueError(f"Jaccard threshold must be > 0, got {threshold}")
+        index = MediaTokenUtils.build_token_index(token_lists, blocks, "pos")
+        index = index[index["token"].ne(EMPTY_TITLE_TOKEN) & index["block"].notna()]
+        sizes = np.bincount(index["pos"], minlength=len(token_lists))
+
+        pairs = pd.merge(index, index, on=["block", "token"], suffixes=("_l", "_r"))
+        pairs = pairs[pairs["pos_l"] < pairs["pos_r"]]
+        shared = pairs.groupby(["pos_l", "pos_r"]).size()
+        left = shared.index.get_level_values("pos_l").to_numpy(dtype=np.int64)
+        right = shared.index.get_level_values("pos_r").to_numpy(dtype=np.int64)
+        intersection = shared.to_numpy()
+
+        similar = (
+            intersection / (sizes[left] + sizes[right] - intersection) >= threshold
+        )
+        return left[similar], right[similar]
+
+    def union_find_components(size: int, left, right) -> np.ndarray:
+        """
+        Connected component of every position 0..size-1 linked by the (left, right)
+        pairs, as the position of its root (array-backed union-find).
+        """
+        parent = list(range(size))
+
+        def find(node):
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]  # path halving
+                node = parent[node]
+            return node
+
+        for l, r in zip(left.tolist(), right.tolist()):
+            root_l, root_r = find(l), find(r)
+            if root_l != root_r:
+                parent[max(root_l, root_r)] = min(root_l, root_r)
+        return np.array([find(node) for node in range(size)], dtype=np.int64)
+
+    def encode_token_sets(*token_lists: pd.Series):
+        """
+        Distinct tokens of every row of each token list Series, as integer ids shared by
+        all the Series: [(row positions, token ids, set sizes), ...]
+        rows are sorted by position, empty or missing lists have a set size of 0.
+        """
+        exploded = [
+            tokens.reset_index(drop=True).explode().dropna() for tokens in token_lists
+        ]
+        token_ids, _ = pd.factorize(pd.concat(exploded, ignore_index=True))
+
+        encoded = []
+        start = 0
+        for tokens, exploded_tokens in zip(token_lists, exploded):
+            pairs = pd.DataFrame(
+                {
+                    "row": exploded_tokens.index.to_numpy(dtype=np.int64),
+                    "token": token_ids[start : start + len(exploded_tokens)],
+                }
+            ).drop_duplicates()
+            start += len(exploded_tokens)
+            rows = pairs["row"].to_numpy()
+            sizes = np.bincount(rows, minlength=len(tokens))
+            encoded.append((rows, pairs["token"].to_numpy(dtype=np.int64), sizes))
+        return encoded
+
+    def jaccard_similarity_pairs(left_tokens, right_tokens, left_pos, right_pos):
+        """
+        Vectorized jaccard_title_similarity of many pairs of token lists (same values).
+        left_tokens, right_tokens : Series of token lists (normalize_title)
+        left_pos, right_pos       : positions in left/right_tokens of the rows of every pair
+        Each side is tokenized once, pairs only handle integer token ids.
+        """
+        left_pos = np.asarray(left_pos, dtype=np.int64)
+        right_pos = np.asarray(right_pos, dtype=np.int64)
+        (l_rows, l_tokens, l_sizes), (r_rows, r_tokens, r_sizes) = (
+            MediaTokenUtils.encode_token_sets(left_tokens, right_tokens)
+        )
+        vocabulary_size = max(l_tokens.max(initial=0), r_tokens.max(initial=0)) + 1
+
+        # Left tokens of every pair: CSR gather of the left rows, rows are sorted
+        order = np.argsort(l_rows, kind="stable")
+        l_tokens = l_tokens[order]
+        l_starts = np.concatenate(([0], np.cumsum(l_sizes)[:-1]))
+        counts = l_sizes[left_pos]
+        pair_idx = np.repeat(np.arange(len(left_pos)), counts)
+        offsets = np.arange(counts.sum()) - np.repeat(
+            np.cumsum(counts) - counts, counts
+        )
+        pair_tokens = l_tokens[l_starts[left_pos][pair_idx] + offsets]
+
+        # Intersection: (right row, token) codes of the pairs found in the right sets
+        right_codes = r_rows * vocabulary_size + r_tokens
+        hits = np.isin(right_pos[pair_idx] * vocabulary_size + pair_tokens, right_codes)
+        intersection = np.bincount(pair_idx[hits], minlength=len(left_pos))
+        union = counts + r_sizes[right_pos] - intersection
+
+        similarity = np.ones(len(left_pos))  # two empty titles are the same
+        np.divide(intersection, union, out=similarity, where=union > 0)
+        return similarity
+
     def cluster_attribute_jaccard(
         dataframe,
         attribute,
@@ -87,39 +229,16 @@ class MediaTokenUtils:
                 if token not in STOPWORDS_FRANCHISE
             ]
 
-        def jaccard_similarity(set1, set2):
-            s1 = set(set1)
-            s2 = set(set2)
-            return len(s1 & s2) / len(s1 | s2)
-
-        def create_jaccard_similarity_graph(df, token_col, type_col, threshold):
-            # Collect all pairs above threshold
-            G = nx.Graph()
-
-            if blacklist_types:
-                df_search = df[~df[type_col].isin(blacklist_types)]
-            else:
-                df_search = df
-            # instead of titles we use sets of tokens (ex: {"super", "mario", "galaxy"}) and compare each other by combinations of 2
-            for (i, t1), (j, t2) in combinations(df_search[token_col].items(), 2):
-                # Skip if different media types
-                if type_col and df[type_col].iloc[i] != df[type_col].iloc[j]:
-                    continue
-                if jaccard_similarity(t1, t2) >= threshold:
-                    G.add_edge(i, j)
-            return G
-
-        def find_group_label(df, attribute, cluster):
+        def find_group_label(titles, cluster):
             """
-            df: DataFrame
-            token_col: column containing sets of tokens
+            titles: attribute values of the rows
             cluster: list of row indices in this cluster
 
             returns: string of sequential common
             """
             # Split title in words
             # ["The", Legend", "of", "Zelda"], ["The", "Legend", "of", "Zelda", "II", "The", "Adventure", "of", "Link"]
-            split_titles = [extensive_split(df[attribute].iloc[idx]) for idx in cluster]
+            split_titles = [extensive_split(titles[idx]) for idx in cluster]
             # Get largest continuous common words pattern
             label_elements = []
             for words in zip(*split_titles):
@@ -132,19 +251,25 @@ class MediaTokenUtils:
         # use positional index for efficiency
         df = dataframe.reset_index(drop=False)
         df[output_label] = default_value
-        df["_tokens"] = df[attribute].apply(tokenize)
-        # clusters = sets of nodes connected by edges [{node1, node2, ...}, {...}, ...], here nodes are indexes
-        clusters_graph = create_jaccard_similarity_graph(
-            df, "_tokens", type_attribute, threshold
-        )
-        clusters = [c for c in nx.connected_components(clusters_graph) if len(c) > 1]
+        tokens = df[attribute].apply(tokenize)
+        # Titles are only compared within their type, blacklisted types are left out
+        if type_attribute:
+            blocks = df[type_attribute].where(~df[type_attribute].isin(blacklist_types))
+        else:
+            blocks = np.zeros(len(df), dtype=np.int64)
+        # instead of titles we use sets of tokens (ex: {"super", "mario", "galaxy"})
+        left, right = MediaTokenUtils.similar_token_set_pairs(tokens, blocks, threshold)
+        # clusters = positions linked by similar pairs, grouped by component root
+        components = MediaTokenUtils.union_find_components(len(df), left, right)
+        linked = np.unique(np.concatenate([left, right]))
+        clusters = pd.Series(linked).groupby(components[linked]).agg(list)
 
+        titles = df[attribute].tolist()
         for cluster in clusters:
-            group_label = find_group_label(df, attribute, cluster)
+            group_label = find_group_label(titles, cluster)
             if group_label:
                 # map for each element of cluster their group label
-                df.loc[list(cluster), output_label] = group_label
+                df.loc[cluster, output_label] = group_label
 
-        df = df.drop(columns=["_tokens"])
         df = df.set_index(og_indexes)  # restore indexes
         return df
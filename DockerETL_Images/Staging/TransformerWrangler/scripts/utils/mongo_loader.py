@@ -4,7 +4,7 @@ from typing import Callable, Any
 import pandas as pd
 
 from .execution import *
-from .batch_generator import BatchGenerator
+from .batch_generator import BatchGenerator, dataframe_batches
 
 
 import ijson.backends.python as ijson
@@ -95,6 +95,51 @@ class MongoLoader:
 
         return SUCCESS
 
+    @safe_execute
+    def load_from_columns(
+        self,
+        columns: dict,
+        collection_name: str,
+        session: ClientSession = None,
+        batch_size: int = 1000,
+        ordered=False,
+    ):
+        # columns: {column name: array or list of values}, the same length each
+        names = list(columns)
+        num_rows = len(next(iter(columns.values()), []))
+        collection = self.db[collection_name]
+        for offset in range(0, num_rows, batch_size):
+            # tolist: numpy scalars are not encodable by bson
+            values = [
+                (
+                    list(column[offset : offset + batch_size])
+                    if isinstance(column, list)
+                    else column[offset : offset + batch_size].tolist()
+                )
+                for column in columns.values()
+            ]
+            batch = [dict(zip(names, row)) for row in zip(*values)]
+            collection.insert_many(batch, session=session, ordered=ordered)
+
+        return SUCCESS
+
+    @safe_execute
+    def load_from_dataframe(
+        self,
+        df: pd.DataFrame,
+        collection_name: str,
+        id_col_name=None,
+        session: ClientSession = None,
+        batch_size: int = 1000,
+        ordered=False,
+    ):
+        # Record batches read as python rows (nulls -> None), no index oriented dict copy
+        collection = self.db[collection_name]
+        for batch in dataframe_batches(df, batch_size, id_col_name):
+            collection.insert_many(batch.to_pylist(), session=session, ordered=ordered)
+
+        return SUCCESS
+
     @safe_execute
     def load_from_csv(
         self,
@@ -0,0 +1,126 @@
+from pathlib import Path
+import shutil
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .execution import *
+from .batch_generator import BatchGenerator, dataframe_batches
+
+
+class ParquetLoader:
+    """
+    Columnar staging alternative to MongoLoader (same load methods), read back by the
+    persistors instead of the transient MongoDB:
+    <directory>/<COLLECTION>/part-XXXXX.parquet   one file per loaded batch
+    Each batch gets its own schema, collections with heterogeneous rows
+    (GRAPH_ENTITIES...) are kept as is. The collections staged by a previous run are
+    removed when the loader is created: a collection without rows this run is empty,
+    as with the recreated transient MongoDB.
+    """
+
+    def __init__(self, directory: str | Path, compression: str = "zstd"):
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.compression = compression
+        self._parts: dict[str, int] = {}
+        # Only the collection directories (with parts), not other data of the volume
+        for collection_dir in self.directory.iterdir():
+            if collection_dir.is_dir() and any(collection_dir.glob("part-*.parquet")):
+                shutil.rmtree(collection_dir)
+
+    @staticmethod
+    def _batch_to_table(batch: list[dict]) -> pa.Table:
+        columns = {}  # union of the row keys, in order of appearance
+        for row in batch:
+            for column in row:
+                columns.setdefault(column, None)
+        data = {}
+        for column in columns:
+            values = [row.get(column) for row in batch]
+            # Parquet has no empty struct: rows are read back without the key
+            non_null = [v for v in values if v is not None]
+            if non_null and all(v == {} for v in non_null):
+                continue
+            data[column] = values
+        return pa.Table.from_pydict(data)
+
+    def _write_batch(self, batch: list[dict], collection_name: str) -> None:
+        self._write_table(self._batch_to_table(batch), collection_name)
+
+    def _write_table(self, table: pa.Table, collection_name: str) -> None:
+        collection_dir = self.directory / collection_name
+        if collection_name not in self._parts:
+            collection_dir.mkdir(parents=True, exist_ok=True)
+            self._parts[collection_name] = 0
+        part = self._parts[collection_name]
+        pq.write_table(
+            table,
+            collection_dir / f"part-{part:05d}.parquet",
+            compression=self.compression,
+        )
+        self._parts[collection_name] = part + 1
+
+    @safe_execute
+    def load_from_dict(
+        self,
+        rows,
+        collection_name: str,
+        id_col_name=None,
+        batch_size: int = 1000,
+    ):
+        # Generator
+        def index_oriented_gen(dict_rows):
+            for id, columns in dict_rows.items():
+                if id_col_name:
+                    columns[id_col_name] = id
+                yield columns
+
+        row_gen = rows
+        if isinstance(rows, dict):
+            row_gen = index_oriented_gen(rows)
+
+        for batch in BatchGenerator(generator=row_gen, batch_size=batch_size):
+            self._write_batch(batch, collection_name)
+        return SUCCESS
+
+    @safe_execute
+    def load_from_columns(
+        self,
+        columns: dict,
+        collection_name: str,
+        batch_size: int = 1000,
+    ):
+        # columns: {column name: array or list of values}, the same length each
+        table = pa.table({name: pa.array(values) for name, values in columns.items()})
+        for offset in range(0, table.num_rows, batch_size):
+            self._write_table(table.slice(offset, batch_size), collection_name)
+        return SUCCESS
+
+    @safe_execute
+    def load_from_dataframe(
+        self,
+        df: pd.DataFrame,
+        collection_name: str,
+        id_col_name=None,
+        batch_size: int = 1000,
+    ):
+        # Record batches written as is, without index oriented dict rows
+        for batch in dataframe_batches(df, batch_size, id_col_name):
+            self._write_table(pa.Table.from_batches([batch]), collection_name)
+        return SUCCESS
+
+    @safe_execute
+    def batch_load_multiple(
+        self,
+        data: list[dict],
+        collection_name: str,
+        batch_size: int = 1000,
+    ):
+        if not data:
+            raise Exception(f"Data to load not provided.")
+
+        for batch in BatchGenerator(generator=data, batch_size=batch_size):
+            self._write_batch(batch, collection_name)
+        return SUCCESS
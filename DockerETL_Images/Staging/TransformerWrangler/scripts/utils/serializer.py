@@ -0,0 +1,77 @@
+from typing import Any
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+BACKEND = "orjson" if orjson else "msgspec" if msgspec else "json"
+
+# Raised by typed decoding when a record does not follow the media layout
+SchemaError = msgspec.ValidationError if msgspec else ValueError
+
+if msgspec is not None:
+    UNSET = msgspec.UNSET
+    Unset = msgspec.UnsetType
+
+    class ReviewRecord(msgspec.Struct, forbid_unknown_fields=True):
+        author: str | None
+        company: str | None
+        quote: str | None
+        rating: int | float | None
+        post_date: str | None
+        full_review_src_url: str | None
+        spoiler: bool | None
+        isCritic: bool
+
+    class MediaRecord(msgspec.Struct, forbid_unknown_fields=True, omit_defaults=True):
+        # One of title (movies), game_title, tv_title
+        title: str | Unset = UNSET
+        game_title: str | Unset = UNSET
+        tv_title: str | Unset = UNSET
+        media_details: dict[str, Any] | None | Unset = UNSET
+        # section (platform / season / _default): reviews
+        critic_reviews: dict[str, list[ReviewRecord]] | Unset = UNSET
+        user_reviews: dict[str, list[ReviewRecord]] | Unset = UNSET
+
+    _media_decoder = msgspec.json.Decoder(MediaRecord)
+    _msgspec_encoder = msgspec.json.Encoder()
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    # UTF-8 bytes, non ascii characters kept as is
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 if pretty else 0)
+    if msgspec is not None and not pretty:
+        return _msgspec_encoder.encode(obj)
+    return json.dumps(
+        obj,
+        indent=4 if pretty else None,
+        separators=None if pretty else (",", ":"),
+        ensure_ascii=False,
+    ).encode("utf-8")
+
+
+def loads(data: bytes | str) -> Any:
+    if orjson is not None:
+        return orjson.loads(data)
+    if msgspec is not None:
+        return msgspec.json.decode(data)
+    return json.loads(data)
+
+
+def decode_media(data: bytes | str, typed: bool = False) -> dict:
+    """
+    Decodes a scraped media record.
+    typed : checks the record against MediaRecord (msgspec), raising SchemaError on
+            unknown keys or wrong types. Untyped decoding when msgspec is missing.
+    """
+    if typed and msgspec is not None:
+        return msgspec.to_builtins(_media_decoder.decode(data))
+    return loads(data)
@@ -0,0 +1,66 @@
+"""
+Records/sec of the media JSON serializer (stdlib json vs utils.serializer) on a saved corpus:
+a scrapper output directory (<CATEGORY>/*.json and/or ndjson shards).
+
+    python tests/reading_data/bench_serializer.py <scrapper output directory> [repeat]
+"""
+
+from pathlib import Path
+import json
+import sys
+import time
+
+ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Staging" / "TransformerWrangler" / "scripts")
+)
+
+from utils import serializer, MediaSourceReader
+
+
+def load_corpus(directory: Path) -> list[dict]:
+    records = []
+    for cat_dir in sorted(p for p in directory.iterdir() if p.is_dir()):
+        records.extend(MediaSourceReader.iter_records(cat_dir))
+    return records
+
+
+def records_per_sec(operation, items, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for item in items:
+            operation(item)
+    return repeat * len(items) / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    records = load_corpus(Path(sys.argv[1]))
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    if not records:
+        sys.exit(f"No media record found in {sys.argv[1]}")
+    print(
+        f"{len(records)} records x {repeat}, serializer backend: {serializer.BACKEND}"
+    )
+
+    pretty_blobs = [json.dumps(r, indent=4, ensure_ascii=False) for r in records]
+    compact_blobs = [serializer.dumps(r) for r in records]
+    results = {
+        "encode json indent=4 (before)": records_per_sec(
+            lambda r: json.dumps(r, indent=4, ensure_ascii=False), records, repeat
+        ),
+        "encode serializer pretty": records_per_sec(
+            lambda r: serializer.dumps(r, pretty=True), records, repeat
+        ),
+        "encode serializer compact": records_per_sec(serializer.dumps, records, repeat),
+        "decode json (before)": records_per_sec(json.loads, pretty_blobs, repeat),
+        "decode serializer": records_per_sec(
+            serializer.decode_media, compact_blobs, repeat
+        ),
+    }
+    if serializer.msgspec is not None:
+        results["decode serializer typed"] = records_per_sec(
+            lambda b: serializer.decode_media(b, typed=True), compact_blobs, repeat
+        )
+
+    for name, rate in results.items():
+        print(f"{name:<32} {rate:12.0f} records/s")
@@ -0,0 +1,77 @@
+"""
+Micro-benchmark of the scrapper HTML parsing backends.
+Pages are read from a response cache directory (SCRAPPER_CACHE_DIRECTORY) or from
+a folder of saved pages named <browse|media|credits>_*.html, by default the
+committed sample pages of tests/scrapping_tests/pages.
+
+Run with MetacriticScrapper/scripts as import root:
+    PYTHONPATH=. python ../../../../tests/scrapping_tests/bench_page_parsers.py [pages directory] [repeat]
+"""
+
+from pathlib import Path
+from statistics import median
+from utils import PageParser, PageType, ResponseCache
+from utils.page_parser import LXML_AVAILABLE
+import json
+import sys
+import time
+import tracemalloc
+
+SAMPLE_PAGES = Path(__file__).resolve().parent / "pages"
+
+
+def load_pages(directory: Path) -> list[tuple[PageType, str]]:
+    pages = []
+    if (directory / "index").is_dir():
+        cache = ResponseCache(directory)
+        for meta in sorted((directory / "index").rglob("*.meta")):
+            entry = json.loads(meta.read_text(encoding="utf-8"))
+            if entry["url_class"] not in PageType.__members__.values():
+                continue  # review API json
+            pages.append((PageType(entry["url_class"]), cache.load(entry).text))
+    else:
+        for html_file in sorted(directory.glob("*.html")):
+            page_type = PageType(html_file.name.split("_", 1)[0])
+            pages.append((page_type, html_file.read_text(encoding="utf-8")))
+    return pages
+
+
+def bench(parser: PageParser, pages, repeat: int) -> dict:
+    timings = []
+    peaks = []
+    for page_type, markup in pages:
+        page_timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            parser.parse(markup, page_type)
+            page_timings.append(time.perf_counter() - start)
+        timings.append(median(page_timings))
+
+        tracemalloc.start()
+        soup = parser.parse(markup, page_type)
+        peaks.append(tracemalloc.get_traced_memory()[1])
+        tracemalloc.stop()
+        del soup
+    return {
+        "ms_per_page": 1000 * sum(timings) / len(timings),
+        "peak_kb_per_page": sum(peaks) / len(peaks) / 1024,
+    }
+
+
+if __name__ == "__main__":
+    directory = Path(sys.argv[1]) if len(sys.argv) > 1 else SAMPLE_PAGES
+    repeat = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    pages = load_pages(directory)
+    if not pages:
+        sys.exit(f"No html page found in {directory}")
+    print(f"{len(pages)} pages, median of {repeat} parses")
+
+    backends = ["html.parser"] + (["lxml"] if LXML_AVAILABLE else [])
+    for backend in backends:
+        for partial in (False, True):
+            result = bench(PageParser(backend, partial), pages, repeat)
+            print(
+                f"{backend:<12} partial={partial!s:<5} "
+                f"{result['ms_per_page']:8.2f} ms/page "
+                f"{result['peak_kb_per_page']:10.1f} KB peak/page"
+            )
@@ -0,0 +1,92 @@
+import unittest
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from DockerETL_Images.Ingestion.MetacriticScrapper.scripts.utils.checkpoint import (
+    CheckpointJournal,
+)
+
+
+class TestCheckpointJournal(unittest.TestCase):
+    """Test cases for the scraper's resumable crawl journal"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = Path(self.tmp_dir.name) / "MOVIES.checkpoint.jsonl"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _crashed_run(self):
+        journal = CheckpointJournal(self.path)
+        journal.start()
+        journal.record_saved("heat", (1, 1))
+        journal.record_saved("alien", (1, 2))
+        journal.close()
+
+    def test_new_journal_not_resumable(self):
+        """Test that a first run starts from scratch"""
+        journal = CheckpointJournal(self.path)
+        self.assertFalse(journal.resumable)
+        self.assertIsNone(journal.cursor)
+        journal.close()
+
+    def test_resume_after_crash(self):
+        """Test that an interrupted crawl is resumed at its last cursor"""
+        self._crashed_run()
+
+        journal = CheckpointJournal(self.path)
+        self.assertTrue(journal.resumable)
+        self.assertEqual(journal.cursor, (1, 2))
+        self.assertEqual(journal.run_saved, 2)
+        self.assertTrue(journal.is_fresh("heat"))
+        self.assertFalse(journal.is_fresh("jaws"))
+        journal.close()
+
+    def test_completed_crawl_starts_new_run(self):
+        """Test that a completed crawl is not resumed but keeps saved slugs"""
+        self._crashed_run()
+        journal = CheckpointJournal(self.path)
+        journal.mark_completed()
+        journal.close()
+
+        journal = CheckpointJournal(self.path)
+        self.assertFalse(journal.resumable)
+        journal.start()
+        self.assertEqual(journal.run_saved, 0)
+        self.assertTrue(journal.is_fresh("alien"))
+        journal.close()
+
+    def test_torn_last_line_ignored(self):
+        """Test that a line cut by a crash does not break the replay"""
+        self._crashed_run()
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write('{"event": "saved", "slug": "ja')
+
+        journal = CheckpointJournal(self.path)
+        self.assertEqual(journal.cursor, (1, 2))
+        journal.close()
+
+    def test_max_age(self):
+        """Test that old saves are scraped again"""
+        self._crashed_run()
+        journal = CheckpointJournal(self.path, max_age=60)
+        journal.saved["heat"] = time.time() - 120
+        self.assertFalse(journal.is_fresh("heat"))
+        self.assertTrue(journal.is_fresh("alien"))
+        journal.close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,75 @@
+import unittest
+import sys
+import threading
+from pathlib import Path
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Scrapper modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Ingestion" / "MetacriticScrapper" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from DockerETL_Images.Ingestion.MetacriticScrapper.scripts.crawl_orchestrator import (
+    CrawlOrchestrator,
+)
+
+
+class TestCrawlOrchestrator(unittest.TestCase):
+    """Test cases for the parallel category crawl orchestrator"""
+
+    def test_writes_run_on_single_writer_in_order(self):
+        """Test that every write job runs on the writer thread, in submit order per crawl"""
+        orchestrator = CrawlOrchestrator(write_queue_size=2)
+        written = []
+        writer_threads = set()
+
+        def crawl(name):
+            def run(submit):
+                for i in range(5):
+                    submit(
+                        lambda i=i: (
+                            written.append((name, i)),
+                            writer_threads.add(threading.current_thread().name),
+                        )
+                    )
+
+            return run
+
+        for name in ("GAMES", "MOVIES", "TV_SHOWS"):
+            orchestrator.add(name, crawl(name))
+        errors = orchestrator.run()
+
+        self.assertEqual(errors, {})
+        self.assertEqual(writer_threads, {"writer"})
+        self.assertEqual(len(written), 15)
+        for name in ("GAMES", "MOVIES", "TV_SHOWS"):
+            self.assertEqual([i for n, i in written if n == name], list(range(5)))
+
+    def test_failing_crawl_does_not_stop_others(self):
+        """Test that a crawl error is reported while other categories finish"""
+        orchestrator = CrawlOrchestrator()
+        written = []
+
+        def failing(submit):
+            submit(lambda: written.append("GAMES"))
+            raise RuntimeError("browse page missing")
+
+        orchestrator.add("GAMES", failing)
+        orchestrator.add(
+            "MOVIES", lambda submit: submit(lambda: written.append("MOVIES"))
+        )
+        errors = orchestrator.run()
+
+        self.assertEqual(list(errors), ["GAMES"])
+        self.assertCountEqual(written, ["GAMES", "MOVIES"])
+
+
+if __name__ == "__main__":
+    unittest.main()
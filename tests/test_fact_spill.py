@@ -0,0 +1,90 @@
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Wrangler modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Staging" / "TransformerWrangler" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from utils.fact_spill import FactSpill
+
+
+class TestFactSpill(unittest.TestCase):
+    """Test cases for the disk spill of the fact rows"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.directory = Path(self.tmp_dir.name) / "spill"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_budget_triggers_spills(self):
+        """Test that batches are written once the budget is exceeded only"""
+        spill = FactSpill(self.directory, "media_info_id", memory_budget=100)
+        spill.append({"media_info_id": [1, 2], "rating": [10, 20]})
+        self.assertEqual(list(self.directory.rglob("*.parquet")), [])
+
+        spill.append({"media_info_id": list(range(20)), "rating": [None] * 20})
+        self.assertTrue(list(self.directory.rglob("*.parquet")))
+        self.assertEqual(spill.num_rows, 22)
+
+    def test_buckets_keep_keys_together(self):
+        """Test that every row of a key is read back in one bucket, in order"""
+        spill = FactSpill(self.directory, "media_info_id", 1 << 20, buckets=4)
+        media_ids = ["m%d" % (i % 7) for i in range(50)]
+        for i in range(0, 50, 10):
+            spill.append(
+                {
+                    "media_info_id": media_ids[i : i + 10],
+                    "rating": list(range(i, i + 10)),
+                }
+            )
+            spill.spill()
+
+        buckets = list(spill.read_buckets())
+        ratings = {}
+        for bucket_df in buckets:
+            for media_id, rows in bucket_df.groupby("media_info_id", sort=False):
+                self.assertNotIn(media_id, ratings)
+                ratings[media_id] = rows["rating"].tolist()
+        self.assertLessEqual(len(buckets), 4)
+        self.assertEqual(
+            ratings,
+            {"m%d" % m: list(range(m, 50, 7)) for m in range(7)},
+        )
+
+        spill.cleanup()
+        self.assertFalse(spill.directory.exists())
+        self.assertTrue(self.directory.is_dir())
+
+    def test_configured_directory_kept(self):
+        """Test that only the private spill directories are removed"""
+        self.directory.mkdir()
+        (self.directory / "imdb.tsv.gz").write_bytes(b"data")
+        stale = FactSpill(self.directory, "media_info_id", 1 << 20)
+        stale.append({"media_info_id": [1], "rating": [10]})
+        stale.spill()
+
+        spill = FactSpill(self.directory, "media_info_id", 1 << 20)
+        self.assertFalse(stale.directory.exists())
+        self.assertEqual(
+            sorted(p.name for p in self.directory.iterdir()),
+            sorted(["imdb.tsv.gz", spill.directory.name]),
+        )
+        spill.cleanup()
+        self.assertEqual([p.name for p in self.directory.iterdir()], ["imdb.tsv.gz"])
+
+
+if __name__ == "__main__":
+    unittest.main()
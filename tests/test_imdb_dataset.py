@@ -0,0 +1,151 @@
+import unittest
+import sys
+import gzip
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+import pandas as pd
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Wrangler modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Staging" / "TransformerWrangler" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from media_builder import MediaBuilder
+from utils import imdb_dataset
+from utils.imdb_dataset import IMDBDataset
+
+
+def write_tsv(path: Path, rows: list[list[str]]):
+    with gzip.open(path, "wt", encoding="utf-8") as f:
+        for row in rows:
+            f.write("\t".join(row) + "\n")
+
+
+class TestIMDBDataset(unittest.TestCase):
+    """Test cases for the parquet copy of the IMDb files"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source_dir = Path(self.tmp_dir.name)
+        self.cache_dir = self.source_dir / "cache"
+        write_tsv(
+            self.source_dir / "title.principals.tsv.gz",
+            [["tconst", "ordering", "nconst", "category", "job", "characters"]]
+            + [
+                ["tt%07d" % i, "1", "nm%07d" % i, "actor", "\\N", '["Hero %d"]' % i]
+                for i in range(1, 41)
+            ]
+            + [["tt0000041", "2", "nm0000001", "actress", "stunts", '["Self"]']],
+        )
+        write_tsv(
+            self.source_dir / "name.basics.tsv.gz",
+            [["nconst", "primaryName", "birthYear", "deathYear"]]
+            + [["nm%07d" % i, "Name %d" % i, "1970", "\\N"] for i in range(1, 41)],
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_same_chunks_as_tsv(self):
+        """Test that the parquet copy gives the strings of the tsv"""
+        columns = ["tconst", "nconst", "job", "characters"]
+        tsv_df = pd.concat(
+            IMDBDataset(self.source_dir).read("title.principals", columns, 7)
+        )
+        parquet_df = pd.concat(
+            IMDBDataset(self.source_dir, self.cache_dir).read(
+                "title.principals", columns, 7
+            )
+        )
+        pd.testing.assert_frame_equal(
+            parquet_df.reset_index(drop=True),
+            tsv_df.reset_index(drop=True),
+            check_dtype=False,
+        )
+
+    def test_reuse_until_source_changes(self):
+        """Test that the copy is converted once, then again on a new source"""
+        imdb = IMDBDataset(self.source_dir, self.cache_dir)
+        with mock.patch.object(
+            IMDBDataset, "_convert", wraps=IMDBDataset._convert
+        ) as convert:
+            imdb.prepare("name.basics")
+            imdb.prepare("name.basics")
+            self.assertEqual(convert.call_count, 1)
+
+            source = imdb.source_path("name.basics")
+            stat = source.stat()
+            os.utime(source, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+            imdb.prepare("name.basics")
+            self.assertEqual(convert.call_count, 2)
+
+    def test_key_pushdown(self):
+        """Test that only the rows of the keys are read, from their row groups only"""
+        keys = {"nm0000012", "nm0000035", "nm9999999"}
+        imdb = IMDBDataset(self.source_dir, self.cache_dir)
+        with mock.patch.object(imdb_dataset, "ROW_GROUP_SIZE", 10):
+            rows = imdb.scan("name.basics", ["nconst"], keys, 100)
+        row_groups = IMDBDataset._row_groups_with_keys(
+            imdb_dataset.pq.ParquetFile(imdb.prepare("name.basics")),
+            "nconst",
+            imdb_dataset.pa.array(sorted(keys)),
+        )
+        tsv_rows = IMDBDataset(self.source_dir).scan("name.basics", ["nconst"], keys, 7)
+
+        self.assertEqual(row_groups, [1, 3])
+        self.assertEqual(list(rows["nconst"]), ["nm0000012", "nm0000035"])
+        self.assertEqual(list(tsv_rows["nconst"]), ["nm0000012", "nm0000035"])
+        self.assertTrue(imdb.scan("name.basics", ["nconst"], set(), 100).empty)
+
+    def test_roles_keep_every_media(self):
+        """Test that a role played in several media references all of them"""
+        write_tsv(
+            self.source_dir / "title.principals.tsv.gz",
+            [["tconst", "ordering", "nconst", "category", "job", "characters"]]
+            + [
+                ["tt000000%d" % i, "1", "nm0000001", "actor", "\\N", '["Hero"]']
+                for i in (1, 2, 3)
+            ],
+        )
+        roles = MediaBuilder.build_roles_for_media(
+            {"tt0000001": "m1", "tt0000003": "m3"},
+            IMDBDataset(self.source_dir, self.cache_dir),
+            chunksize=8,
+        )
+        (role,) = roles.values()
+        self.assertEqual(role["refs"], ["m1", "m3"])
+        self.assertEqual(role["person_name"], "Name 1")
+
+    def test_roles_from_cache(self):
+        """Test that the roles are the same with and without the parquet copy"""
+        imdb_matches = {"tt0000001": "m1", "tt0000041": "m2"}
+        with mock.patch.object(imdb_dataset, "ROW_GROUP_SIZE", 10):
+            from_tsv = MediaBuilder.build_roles_for_media(
+                imdb_matches, IMDBDataset(self.source_dir), chunksize=8
+            )
+            from_cache = MediaBuilder.build_roles_for_media(
+                imdb_matches,
+                IMDBDataset(self.source_dir, self.cache_dir),
+                chunksize=8,
+            )
+        strip_ids = lambda rows: sorted(
+            sorted((k, str(v)) for k, v in r.items() if k != "id")
+            for r in rows.values()
+        )
+        self.assertEqual(strip_ids(from_cache), strip_ids(from_tsv))
+        self.assertEqual(len(from_cache), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Wrangler modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Staging" / "TransformerWrangler" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from media_builder import MediaBuilder
+from utils import MediaSourceReader
+from utils.key_generator import KeyGenerator, key_generator, parse_key_strategies
+
+
+class TestKeyGenerator(unittest.TestCase):
+    """Test cases for the surrogate key strategies"""
+
+    def tearDown(self):
+        key_generator.cache_clear()
+
+    def test_deterministic_strategies(self):
+        """Test that uuid5 and hash keys only depend on the table and natural key"""
+        for strategy in ("uuid5", "hash"):
+            keys = KeyGenerator("GENRES", strategy)
+            self.assertEqual(keys.key("drama"), keys.key("drama"))
+            self.assertNotEqual(keys.key("drama"), keys.key("action"))
+        self.assertNotEqual(
+            KeyGenerator("GENRES", "uuid5").key("x"),
+            KeyGenerator("COMPANIES", "uuid5").key("x"),
+        )
+
+    def test_hash_keys_fit_bigint(self):
+        """Test that hash keys are positive signed 64 bits integers"""
+        keys = KeyGenerator("FACT_REVIEWS", "hash")
+        for i in range(1000):
+            key = keys.key("media", i)
+            self.assertIsInstance(key, int)
+            self.assertTrue(0 <= key < 2**63)
+
+    def test_uuid_strategy_is_random(self):
+        """Test that the default strategy keeps random uuid4 strings"""
+        keys = KeyGenerator("GENRES")
+        self.assertFalse(keys.deterministic)
+        self.assertNotEqual(keys.key("drama"), keys.key("drama"))
+
+    def test_per_table_configuration(self):
+        """Test that per table strategies override the default one"""
+        self.assertEqual(
+            parse_key_strategies("dim_time = uuid5,FACT_REVIEWS=HASH"),
+            {"DIM_TIME": "uuid5", "FACT_REVIEWS": "hash"},
+        )
+        with self.assertRaises(ValueError):
+            parse_key_strategies("GENRES=serial")
+
+        env = {"SURROGATE_KEY_STRATEGY": "hash", "SURROGATE_KEYS": "GENRES=uuid5"}
+        with mock.patch.dict(os.environ, env):
+            self.assertEqual(key_generator("GENRES").strategy, "uuid5")
+            self.assertEqual(key_generator("DIM_TIME").strategy, "hash")
+
+    def test_rebuild_is_idempotent(self):
+        """Test that hash keys give the same rows on re-runs, duplicated media once"""
+        media = {
+            "title": "Heat",
+            "media_details": {"release_date": "Dec 15, 1995", "genres": ["Crime"]},
+            "critic_reviews": {
+                "_default": [{"author": "Ebert", "rating": 100, "isCritic": True}]
+            },
+        }
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cat_dir = Path(tmp_dir)
+            for slug in ("heat", "heat-copy"):
+                with open(cat_dir / f"{slug}.json", "w", encoding="utf-8") as f:
+                    json.dump(media, f)
+            tasks = [(MediaSourceReader.list_sources(cat_dir), "Movie", "Display")]
+
+            with mock.patch.dict(os.environ, {"SURROGATE_KEY_STRATEGY": "hash"}):
+                first = MediaBuilder.build_metacritic_data(tasks)
+                second = MediaBuilder.build_metacritic_data(tasks)
+
+        self.assertEqual(first, second)
+        media_rows, review_rows, _, connections = first
+        self.assertEqual(len(media_rows), 1)
+        self.assertEqual(len(review_rows), 1)
+        self.assertEqual(connections["genre"]["crime"]["refs"], list(media_rows))
+
+    def test_review_keys_ignore_review_order(self):
+        """Test that review keys survive inserted or reordered reviews, duplicates once"""
+        ebert = {"author": "Ebert", "rating": 100, "quote": "Great", "isCritic": True}
+        kael = {"author": "Kael", "rating": 80, "quote": "Tense", "isCritic": True}
+        new = {"author": "Sarris", "rating": 70, "quote": "Long", "isCritic": True}
+
+        def review_ids(reviews):
+            data = {"critic_reviews": {"_default": reviews}}
+            review_rows, time_rows, _, _ = MediaBuilder.build_fact_rows(
+                data, 42, "Display"
+            )
+            return review_rows, [row[0] for row in time_rows]
+
+        with mock.patch.dict(os.environ, {"SURROGATE_KEY_STRATEGY": "hash"}):
+            first, _ = review_ids([ebert, kael])
+            rescraped, _ = review_ids([new, kael, ebert])
+            duplicated, refs = review_ids([ebert, dict(ebert)])
+
+        self.assertLessEqual(set(first), set(rescraped))
+        self.assertEqual(len(rescraped), 3)
+        # Same content, same fact: one review row, its connection rows deduped later
+        self.assertEqual(len(duplicated), 1)
+        self.assertEqual(set(refs), set(duplicated))
+
+
+if __name__ == "__main__":
+    unittest.main()
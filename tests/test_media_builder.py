@@ -0,0 +1,249 @@
+import unittest
+import sys
+import json
+import os
+import tempfile
+from unittest import mock
+from pathlib import Path
+
+import pandas as pd
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Wrangler modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Staging" / "TransformerWrangler" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from media_builder import MediaBuilder, REVIEW_FOREIGN_KEYS
+from utils import MediaSourceReader, FactSpill
+from utils.key_generator import KeyGenerator, key_generator
+from utils.media_utils import DistinctValueEncoder, MediaMappingUtils
+
+
+def make_media(i: int) -> dict:
+    review = {
+        "author": f"Critic {i % 3}",
+        "company": "Variety" if i % 2 else None,
+        "rating": 50 + i,
+        "post_date": f"202{i % 4}-01-0{1 + i % 5}",
+        "isCritic": True,
+    }
+    return {
+        "title": f"Movie {i}",
+        "media_details": {
+            "release_date": f"Jan 1, {1990 + i}",
+            # Same genre with another casing: the first row seen is kept
+            "genres": ["Drama", "drama" if i == 5 else "Action"],
+            "production_companies": [f"Studio {i % 2}"],
+        },
+        "critic_reviews": {"_default": [review, {**review, "rating": 10}]},
+        "user_reviews": {},
+    }
+
+
+class TestMediaBuilder(unittest.TestCase):
+    """Test cases for the sharded Metacritic rows building"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        cls.cat_dir = Path(cls.tmp_dir.name) / "MOVIES"
+        cls.cat_dir.mkdir()
+        for i in range(8):
+            with open(cls.cat_dir / f"movie-{i}.json", "w", encoding="utf-8") as f:
+                json.dump(make_media(i), f)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def _build(self, shard_size: int, processes: int):
+        sources = MediaSourceReader.list_sources(self.cat_dir)
+        tasks = [
+            (sources[i : i + shard_size], "Movie", "Display", False)
+            for i in range(0, len(sources), shard_size)
+        ]
+        return MediaBuilder.build_metacritic_data(tasks, processes)
+
+    @staticmethod
+    def _normalize(result):
+        # uuids differ between runs: refs are replaced by what they point to
+        media_rows, review_rows, title_year_set, connections = result
+        titles = {k: row["primary_title"] for k, row in media_rows.items()}
+        reviews = {
+            k: (titles[row["media_info_id"]], row["rating"])
+            for k, row in review_rows.items()
+        }
+        normalized = {}
+        for name, connection in connections.items():
+            normalized[name] = {
+                key: (
+                    {k: v for k, v in row.items() if k not in ("id", "refs")},
+                    [titles.get(ref) or reviews[ref] for ref in row["refs"]],
+                )
+                for key, row in connection.items()
+            }
+        return (
+            sorted(titles.values()),
+            sorted(reviews.values()),
+            title_year_set,
+            normalized,
+        )
+
+    def test_sharded_build_matches_single_pass(self):
+        """Test that worker processes merge to the same rows as one in process pass"""
+        single = self._normalize(self._build(shard_size=100, processes=1))
+        self.assertEqual(
+            self._normalize(self._build(shard_size=3, processes=1)), single
+        )
+        self.assertEqual(
+            self._normalize(self._build(shard_size=2, processes=2)), single
+        )
+
+    def test_streaming_same_facts(self):
+        """Test that spilled review facts are the in memory reviews, cleaned"""
+        key_generator.cache_clear()
+        self.addCleanup(key_generator.cache_clear)
+        with mock.patch.dict(os.environ, {"SURROGATE_KEY_STRATEGY": "hash"}):
+            media_rows, review_rows, _, connections = self._build(3, 1)
+            spill = FactSpill(Path(self.tmp_dir.name) / "spill", "media_info_id", 64)
+            streamed_media, streamed_reviews, _, streamed_connections = (
+                MediaBuilder.build_metacritic_data(
+                    [
+                        (
+                            MediaSourceReader.list_sources(self.cat_dir),
+                            "Movie",
+                            "Display",
+                        )
+                    ],
+                    spill=spill,
+                )
+            )
+        for column, name in REVIEW_FOREIGN_KEYS.items():
+            MediaMappingUtils.remap_foreign_key_column(
+                review_rows, connections[name], column
+            )
+        expected = MediaBuilder.clean_review_facts(
+            MediaBuilder.build_and_save_dataframe_from_rows(review_rows, is_dict=True)
+        )
+        facts = pd.concat(
+            MediaBuilder.clean_review_facts(df) for df in spill.read_buckets()
+        )
+        sort_rows = lambda df: sorted(df.astype(object).values.tolist())
+
+        self.assertEqual(streamed_reviews, {})
+        self.assertEqual(streamed_media, media_rows)
+        self.assertEqual(sort_rows(facts), sort_rows(expected))
+        self.assertEqual(
+            {k: row["id"] for k, row in streamed_connections["reviewer"].items()},
+            {k: row["id"] for k, row in connections["reviewer"].items()},
+        )
+        self.assertEqual(
+            streamed_connections["reviewer"]["critic 0variety"]["refs"], []
+        )
+
+    def test_first_distinct_row_kept(self):
+        """Test that a distinct value keeps the row of its first reference"""
+        _, _, _, connections = self._normalize(self._build(shard_size=1, processes=2))
+        genre_row, genre_refs = connections["genre"]["drama"]
+        self.assertEqual(genre_row["genre_title"], "Drama")
+        self.assertEqual(len(genre_refs), 8)  # movie 5 referenced once
+        self.assertEqual(len(connections["company"]), 2)
+
+
+class TestDistinctValueEncoder(unittest.TestCase):
+    """Test cases for the dictionary encoding of the distinct values"""
+
+    rows = [
+        (1, "Variety", "Critic A", True),
+        (2, "variety", "critic a", False),
+        (3, None, "Critic A", True),
+        (1, "Variety", "Critic A", True),
+        (4, None, "Critic A", True),
+    ]
+
+    def test_same_rows_as_map_distinct_value(self):
+        """Test that keys, hash ids, first rows and refs are the same as the dicts"""
+        keys = KeyGenerator("DIM_REVIEWER", "hash")
+        attributes = ["association", "reviewer_username", "is_critic"]
+        pk_attributes = ["reviewer_username", "association"]
+        expected = {}
+        for row in self.rows:
+            MediaMappingUtils.map_distinct_value(
+                {"ref_id": row[0]} | dict(zip(attributes, row[1:])),
+                expected,
+                pk_attributes,
+                keys,
+            )
+        encoder = DistinctValueEncoder(attributes, pk_attributes, keys)
+        encoder.encode(self.rows)
+
+        self.assertEqual(dict(encoder.items()), expected)
+
+    def test_merge_and_dedupe(self):
+        """Test that merged encoders keep the first row and refs in order"""
+        encoder = DistinctValueEncoder(["genre_title"], ["genre_title"])
+        encoder.encode([(3, "Drama"), (1, "Action")])
+        other = DistinctValueEncoder(["genre_title"], ["genre_title"])
+        other.encode([(2, "drama"), (3, "Drama"), (5, "Crime")])
+        encoder.merge(other)
+        encoder.dedupe_refs()
+
+        self.assertEqual(list(encoder), ["drama", "action", "crime"])
+        self.assertEqual(encoder["drama"]["genre_title"], "Drama")
+        self.assertEqual(encoder["drama"]["refs"], [3, 2])
+        self.assertEqual(encoder["crime"]["refs"], [5])
+
+
+class TestForeignKeyColumns(unittest.TestCase):
+    """Test cases for the columnar foreign keys and bridges"""
+
+    def test_bridge_columns(self):
+        """Test that bridges are ordered by media with 1 / count weights"""
+        genres = DistinctValueEncoder(["genre_title"], ["genre_title"])
+        genres.encode([(20, "Drama"), (10, "Action"), (20, "Crime"), (10, "Drama")])
+        media_ids = pd.Index([10, 20, 30])
+        columns = MediaBuilder.build_bridge_columns(
+            media_ids, genres, "media_id", "genre_id"
+        )
+        genre_id = {key: row["id"] for key, row in genres.items()}
+
+        self.assertEqual(columns["media_id"].tolist(), [10, 10, 20, 20])
+        self.assertEqual(
+            columns["genre_id"].tolist(),
+            [
+                genre_id["drama"],
+                genre_id["action"],
+                genre_id["drama"],
+                genre_id["crime"],
+            ],
+        )
+        self.assertEqual(columns["weight"].tolist(), [0.5, 0.5, 0.5, 0.5])
+
+    def test_foreign_key_column(self):
+        """Test that single valued foreign keys are set, None without a ref"""
+        review_rows = {"r1": {"time_id": None}, "r2": {"time_id": None}}
+        times = {"2020": {"id": "t1", "year": "2020", "refs": ["r2"]}}
+        time_rows = MediaMappingUtils.remap_foreign_key_column(
+            review_rows, times, "time_id"
+        )
+
+        self.assertEqual(time_rows, [{"id": "t1", "year": "2020"}])
+        self.assertEqual(
+            review_rows, {"r1": {"time_id": None}, "r2": {"time_id": "t1"}}
+        )
+        with self.assertRaises(KeyError):
+            MediaMappingUtils.foreign_key_codes(
+                pd.Index(["r1"]), {"x": {"id": "t2", "refs": ["r3"]}}
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,236 @@
+import unittest
+import sys
+import random
+from itertools import combinations
+from pathlib import Path
+
+import pandas as pd
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Wrangler modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Staging" / "TransformerWrangler" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from utils.media_utils import MediaCleaningUtils, MediaTokenUtils
+from utils.media_utils.media_token_utils import STOPWORDS_FRANCHISE
+
+
+class TestNormalizeTitle(unittest.TestCase):
+    """Test cases for the title normalization"""
+
+    def test_tokens(self):
+        """Test that years and punctuation are removed, accented letters kept"""
+        titles = pd.DataFrame(
+            {"title": ["Amélie (2001)", "Spider-Man: No Way Home", "1917", None]}
+        )
+        self.assertEqual(
+            MediaTokenUtils.normalize_title(titles, "title", cached=False).tolist()[:3],
+            [("amélie",), ("spiderman", "no", "way", "home"), ()],
+        )
+        self.assertTrue(pd.isna(MediaTokenUtils.normalize_title(titles, "title")[3]))
+
+    def test_memo_counters(self):
+        """Test that repeated titles are counted as memo hits"""
+        MediaTokenUtils.cached_title_tokens.cache_clear()
+        titles = pd.DataFrame({"title": ["Heat", "Alien", "Heat", "Heat"]})
+        tokens = MediaTokenUtils.normalize_title(titles, "title")
+
+        self.assertEqual(tokens.tolist(), [("heat",), ("alien",), ("heat",), ("heat",)])
+        cache_info = MediaTokenUtils.title_cache_info()
+        self.assertEqual((cache_info.hits, cache_info.misses), (2, 2))
+
+
+class TestJaccardSimilarityPairs(unittest.TestCase):
+    """Test cases for the vectorized title jaccard similarity"""
+
+    def test_same_values_as_row_wise(self):
+        """Test that every pair gets the row-wise jaccard_title_similarity value"""
+        rng = random.Random(3)
+        words = ["star", "wars", "the", "night", "2", "love", "dark"]
+        titles = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(0, 4)))
+            for _ in range(60)
+        ] + ["1999", "Star  Wars: Episode II", "star wars star"]
+        left = pd.DataFrame({"title": titles[::2]})
+        right = pd.DataFrame({"title": titles[1::2]})
+        left_tokens = MediaTokenUtils.normalize_title(left, "title")
+        right_tokens = MediaTokenUtils.normalize_title(right, "title")
+
+        left_pos = [rng.randrange(len(left)) for _ in range(500)]
+        right_pos = [rng.randrange(len(right)) for _ in range(500)]
+        similarities = MediaTokenUtils.jaccard_similarity_pairs(
+            left_tokens, right_tokens, left_pos, right_pos
+        )
+
+        for l, r, similarity in zip(left_pos, right_pos, similarities):
+            self.assertEqual(
+                similarity,
+                MediaTokenUtils.jaccard_title_similarity(
+                    left_tokens[l], right_tokens[r]
+                ),
+            )
+
+    def test_empty_titles(self):
+        """Test that empty titles match each other only"""
+        left_tokens = pd.Series([[], ["heat"]])
+        right_tokens = pd.Series([[], ["heat", "heat"]])
+        similarities = MediaTokenUtils.jaccard_similarity_pairs(
+            left_tokens, right_tokens, [0, 0, 1, 1], [0, 1, 0, 1]
+        )
+        self.assertEqual(list(similarities), [1.0, 0.0, 0.0, 1.0])
+
+    def test_no_pairs(self):
+        """Test that an empty candidate set gives no similarity"""
+        tokens = pd.Series([["heat"]])
+        self.assertEqual(
+            len(MediaTokenUtils.jaccard_similarity_pairs(tokens, tokens, [], [])), 0
+        )
+
+
+class TestTokenBlocking(unittest.TestCase):
+    """Test cases for the token blocking of the IMDb title candidates"""
+
+    def test_keeps_every_similar_pair(self):
+        """Test that blocking only drops the year pairs with a null similarity"""
+        chunk_df = pd.DataFrame(
+            {
+                "tconst": ["tt1", "tt2", "tt3", "tt4"],
+                "primaryTitle": ["Heat", "The Heat", "Alien", "!!"],
+                "startYear": [1995, 1995, 1995, 2001],
+            }
+        )
+        targets_df = pd.DataFrame(
+            {
+                "target_id": ["m1", "m2", "m3"],
+                "target_title": ["Heat", "Aliens", ""],
+                "join_year": [1995, 1995, 2001],
+            }
+        )
+        chunk_df["imdb_pos"] = range(len(chunk_df))
+        targets_df["target_pos"] = range(len(targets_df))
+        chunk_tokens = MediaTokenUtils.normalize_title(chunk_df, "primaryTitle")
+        target_tokens = MediaTokenUtils.normalize_title(targets_df, "target_title")
+
+        candidates = MediaCleaningUtils.filter_token_equivalent_candidates(
+            chunk_df,
+            MediaTokenUtils.build_token_index(
+                chunk_tokens, chunk_df["startYear"], "imdb_pos"
+            ),
+            targets_df,
+            MediaTokenUtils.build_token_index(
+                target_tokens, targets_df["join_year"], "target_pos"
+            ),
+        )
+        year_candidates = MediaCleaningUtils.filter_year_equivalent_candidates(
+            chunk_df, targets_df
+        )
+        year_candidates = year_candidates[
+            MediaTokenUtils.jaccard_similarity_pairs(
+                chunk_tokens,
+                target_tokens,
+                year_candidates["imdb_pos"],
+                year_candidates["target_pos"],
+            )
+            > 0
+        ].reset_index(drop=True)
+
+        self.assertEqual(
+            list(zip(candidates["tconst"], candidates["target_id"])),
+            [("tt1", "m1"), ("tt2", "m1"), ("tt4", "m3")],
+        )
+        pd.testing.assert_frame_equal(candidates, year_candidates)
+
+
+def pairwise_clusters(titles, types, threshold, blacklist_types=()):
+    # Reference clustering: every pair of titles of the same type, then components
+    tokens = [
+        {t for t in title.lower().split() if t not in STOPWORDS_FRANCHISE}
+        for title in titles
+    ]
+    component = list(range(len(titles)))
+    for i, j in combinations(range(len(titles)), 2):
+        if types[i] != types[j] or types[i] in blacklist_types:
+            continue
+        if not tokens[i] or not tokens[j]:
+            continue
+        if len(tokens[i] & tokens[j]) / len(tokens[i] | tokens[j]) >= threshold:
+            old, new = component[j], component[i]
+            component = [new if c == old else c for c in component]
+    groups = {}
+    for i, c in enumerate(component):
+        groups.setdefault(c, set()).add(i)
+    return {frozenset(g) for g in groups.values() if len(g) > 1}
+
+
+class TestClusterAttributeJaccard(unittest.TestCase):
+    """Test cases for the franchise clustering of titles"""
+
+    def test_same_clusters_as_pairwise(self):
+        """Test that the inverted index finds the components of all the pairs"""
+        rng = random.Random(5)
+        words = ["mario", "zelda", "kart", "party", "legend", "of", "2", "the"]
+        titles = [
+            " ".join(rng.choice(words) for _ in range(rng.randint(1, 4)))
+            for _ in range(150)
+        ]
+        types = [rng.choice(["Game", "Movie", "Season"]) for _ in titles]
+        tokens = pd.Series(titles).apply(
+            lambda t: [w for w in t.lower().split() if w not in STOPWORDS_FRANCHISE]
+        )
+        blocks = pd.Series(types).where(pd.Series(types).ne("Season"))
+
+        for threshold in (0.2, 0.5, 1.0):
+            left, right = MediaTokenUtils.similar_token_set_pairs(
+                tokens, blocks, threshold
+            )
+            components = MediaTokenUtils.union_find_components(len(titles), left, right)
+            clusters = {}
+            for pos, root in enumerate(components):
+                clusters.setdefault(root, set()).add(pos)
+            self.assertEqual(
+                {frozenset(c) for c in clusters.values() if len(c) > 1},
+                pairwise_clusters(titles, types, threshold, ("Season",)),
+            )
+
+    def test_franchise_labels(self):
+        """Test that clusters get the common leading words of their titles"""
+        media_df = pd.DataFrame(
+            {
+                "id": ["a", "b", "c", "d", "e", "f"],
+                "primary_title": [
+                    "The Legend of Zelda",
+                    "The Legend of Zelda: Breath of the Wild",
+                    "Zelda",
+                    "Super Mario Galaxy",
+                    "Super Mario Galaxy 2",
+                    "Heat",
+                ],
+                "media_type": ["Game", "Game", "Movie", "Game", "Game", "Movie"],
+            }
+        )
+        media_df = MediaTokenUtils.cluster_attribute_jaccard(
+            media_df, "primary_title", "franchise", type_attribute="media_type"
+        )
+        self.assertEqual(
+            media_df["franchise"].to_dict(),
+            {
+                "a": "the legend of",
+                "b": "the legend of",
+                "c": None,
+                "d": "super mario galaxy",
+                "e": "super mario galaxy",
+                "f": None,
+            },
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
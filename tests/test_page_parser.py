@@ -0,0 +1,91 @@
+import unittest
+import sys
+from pathlib import Path
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from DockerETL_Images.Ingestion.MetacriticScrapper.scripts.utils.page_parser import (
+    PageParser,
+    PageType,
+)
+
+MEDIA_PAGE = """
+<html><head><script src="/app.js"></script></head>
+<body>
+<header><nav><a href="/">Home</a></nav></header>
+<div class="c-productHero"><h1>Heat</h1></div>
+<div class="c-productDetails_staff_directors g-outer-spacing-bottom-medium">
+  <a href="/person/michael-mann/">Michael Mann</a>
+</div>
+<div class="c-ProductionDetails">
+  <span>Release Date</span>
+  <div data-testid="details-award-summary"><span>2 Wins</span></div>
+</div>
+<footer>Legal</footer>
+<script>window.__NUXT__=(function(a){return {summary:a}}("A heist"));</script>
+</body></html>
+"""
+
+CREDITS_PAGE = """
+<html><body>
+<div class="c-header"><h1>Credits</h1></div>
+<h3>Cast</h3>
+<dl><div class="u-grid-3column"><dd><a href="/person/al-pacino/">Al Pacino</a></dd></div></dl>
+<p>Unused</p>
+</body></html>
+"""
+
+
+class TestPageParser(unittest.TestCase):
+    """Test cases for the scrapper's partial HTML parsing"""
+
+    def test_full_parse_by_default(self):
+        """Test that every node is kept without partial parsing"""
+        soup = PageParser().parse(MEDIA_PAGE, PageType.MEDIA)
+        self.assertIsNotNone(soup.find("footer"))
+
+    def test_media_containers_kept(self):
+        """Test that the containers read by the scrapper survive partial parsing"""
+        soup = PageParser(partial=True).parse(MEDIA_PAGE, PageType.MEDIA)
+
+        directors = soup.find("div", class_="c-productDetails_staff_directors")
+        self.assertEqual(directors.a.get_text(strip=True), "Michael Mann")
+        award = soup.find("div", attrs={"data-testid": "details-award-summary"})
+        self.assertEqual(award.get_text(strip=True), "2 Wins")
+        self.assertIn("__NUXT__", soup.find("script").string)
+
+    def test_media_layout_skipped(self):
+        """Test that unread page layout is not built"""
+        soup = PageParser(partial=True).parse(MEDIA_PAGE, PageType.MEDIA)
+        self.assertIsNone(soup.find("footer"))
+        self.assertIsNone(soup.find("h1"))
+        self.assertIsNone(soup.find("script", src=True))
+
+    def test_credits_keep_headers_and_lists(self):
+        """Test that the cast header still reaches its list"""
+        soup = PageParser(partial=True).parse(CREDITS_PAGE, PageType.CREDITS)
+        cast_header = soup.find("h3", string=lambda s: s and "cast" in s.lower())
+        self.assertEqual(
+            cast_header.find_next("dl").find("a").get_text(strip=True), "Al Pacino"
+        )
+        self.assertIsNone(soup.find("p"))
+
+    def test_backends_agree(self):
+        """Test that lxml (or its html.parser fallback) reads the same containers"""
+        for backend in ("html.parser", "lxml"):
+            soup = PageParser(backend, partial=True).parse(MEDIA_PAGE, PageType.MEDIA)
+            self.assertEqual(
+                soup.find("div", class_="c-ProductionDetails").span.get_text(),
+                "Release Date",
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,169 @@
+import unittest
+import sys
+import tempfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Wrangler modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Staging" / "TransformerWrangler" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from DockerETL_Images.Staging.TransformerWrangler.scripts.utils.parquet_loader import (
+    ParquetLoader,
+)
+from DockerETL_Images.Staging.TransformerWrangler.scripts.utils.batch_generator import (
+    dataframe_batches,
+)
+from DockerETL_Images.Staging.SQLPersistor.scripts.utils.parquet_source import (
+    ParquetSource,
+)
+
+
+class TestParquetStaging(unittest.TestCase):
+    """Test cases for the wrangler parquet staging read by the persistors"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.loader = ParquetLoader(self.tmp_dir.name)
+        self.source = ParquetSource(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_dict_rows_roundtrip(self):
+        """Test that index oriented rows are read back with their id column"""
+        rows = {
+            1 << 62: {"genre_title": "Drama"},
+            42: {"genre_title": "Crime"},
+            7: {"genre_title": "Comédie"},
+        }
+        expected = [{"genre_title": r["genre_title"], "id": k} for k, r in rows.items()]
+        self.loader.load_from_dict(rows, "GENRES", batch_size=2, id_col_name="id")
+
+        self.assertEqual(len(self.source.parts("GENRES")), 2)
+        self.assertEqual(list(self.source.find("GENRES", batch_size=1)), expected)
+
+    def test_heterogeneous_graph_rows(self):
+        """Test that calls with other columns and empty link attributes are kept"""
+        self.loader.batch_load_multiple(
+            [{"_GRAPH_NODE_ID": "Heat", "media_type": "Movie", "duration": 170}],
+            "GRAPH_ENTITIES",
+        )
+        self.loader.batch_load_multiple(
+            [{"_GRAPH_NODE_ID": "Crime", "_GRAPH_NODE_LABEL": "Genre"}],
+            "GRAPH_ENTITIES",
+        )
+        links = [
+            {"_GRAPH_SRC_NODE_ID": "Heat", "_GRAPH_LINK_ATTRIBUTES": {}},
+            {"_GRAPH_SRC_NODE_ID": "Alien", "_GRAPH_LINK_ATTRIBUTES": {}},
+        ]
+        self.loader.batch_load_multiple(links, "GRAPH_LINKS")
+
+        self.assertEqual(
+            list(self.source.find("GRAPH_ENTITIES")),
+            [
+                {"_GRAPH_NODE_ID": "Heat", "media_type": "Movie", "duration": 170},
+                {"_GRAPH_NODE_ID": "Crime", "_GRAPH_NODE_LABEL": "Genre"},
+            ],
+        )
+        read_links = list(self.source.find("GRAPH_LINKS"))
+        self.assertEqual(
+            [l["_GRAPH_SRC_NODE_ID"] for l in read_links], ["Heat", "Alien"]
+        )
+        self.assertEqual(read_links[0].get("_GRAPH_LINK_ATTRIBUTES", {}), {})
+
+    def test_column_batches(self):
+        """Test that column batches are written in batch_size parts"""
+        columns = {
+            "media_id": np.array([1 << 62, 42, 42]),
+            "genre_id": np.array(["a", "b", "c"], dtype=object),
+            "weight": 1 / np.array([1, 2, 2]),
+        }
+        self.loader.load_from_columns(columns, "BRIDGE_MEDIA_GENRE", batch_size=2)
+
+        self.assertEqual(len(self.source.parts("BRIDGE_MEDIA_GENRE")), 2)
+        self.assertEqual(
+            list(self.source.find("BRIDGE_MEDIA_GENRE")),
+            [
+                {"media_id": 1 << 62, "genre_id": "a", "weight": 1.0},
+                {"media_id": 42, "genre_id": "b", "weight": 0.5},
+                {"media_id": 42, "genre_id": "c", "weight": 0.5},
+            ],
+        )
+
+    def test_dataframe_batches(self):
+        """Test that a DataFrame is loaded with nulls as None and its index as id"""
+        df = pd.DataFrame(
+            {
+                "primary_title": ["Heat", "Alien", None],
+                "duration": [170.0, np.nan, 90.0],
+                "franchise": [None, "alien", None],
+            },
+            index=pd.Index([1 << 62, 42, 7]),
+        )
+        self.loader.load_from_dataframe(
+            df, "DIM_MEDIA_INFO", id_col_name="id", batch_size=2
+        )
+
+        self.assertEqual(len(self.source.parts("DIM_MEDIA_INFO")), 2)
+        self.assertEqual(
+            list(self.source.find("DIM_MEDIA_INFO")),
+            [
+                {
+                    "primary_title": "Heat",
+                    "duration": 170.0,
+                    "franchise": None,
+                    "id": 1 << 62,
+                },
+                {
+                    "primary_title": "Alien",
+                    "duration": None,
+                    "franchise": "alien",
+                    "id": 42,
+                },
+                {"primary_title": None, "duration": 90.0, "franchise": None, "id": 7},
+            ],
+        )
+        rows = [
+            row
+            for batch in dataframe_batches(df.iloc[2:], batch_size=2)
+            for row in batch.to_pylist()
+        ]
+        self.assertEqual(
+            rows, [{"primary_title": None, "duration": 90.0, "franchise": None}]
+        )
+
+    def test_new_run_replaces_collection(self):
+        """Test that a new loader empties the collections it writes to"""
+        self.loader.load_from_dict([{"year": 2020}, {"year": None}], "DIM_TIME")
+        ParquetLoader(self.tmp_dir.name).load_from_dict([{"year": 1995}], "DIM_TIME")
+
+        self.assertEqual(list(self.source.find("DIM_TIME")), [{"year": 1995}])
+        self.assertEqual(list(self.source.find("MISSING")), [])
+
+    def test_new_run_without_rows(self):
+        """Test that a collection without rows in a new run is not read from an old run"""
+        self.loader.load_from_dict([{"role": "Neo"}], "ROLES")
+        (Path(self.tmp_dir.name) / "imdb").mkdir()
+        loader = ParquetLoader(self.tmp_dir.name)
+        loader.load_from_dataframe(pd.DataFrame(columns=["role"]), "ROLES")
+        loader.load_from_columns({"media_id": [], "role_id": []}, "BRIDGE_MEDIA_ROLE")
+
+        self.assertEqual(list(self.source.find("ROLES")), [])
+        self.assertEqual(list(self.source.find("BRIDGE_MEDIA_ROLE")), [])
+        self.assertTrue((Path(self.tmp_dir.name) / "imdb").is_dir())
+
+
+if __name__ == "__main__":
+    unittest.main()
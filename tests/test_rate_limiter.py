@@ -0,0 +1,129 @@
+import unittest
+import sys
+import time
+from pathlib import Path
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from DockerETL_Images.Ingestion.MetacriticScrapper.scripts.utils.rate_limiter import (
+    AdaptiveRateLimiter,
+)
+from DockerETL_Images.Ingestion.MetacriticScrapper.scripts.utils.http_client import (
+    HttpClient,
+)
+
+HOST = "www.metacritic.com"
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, headers=None):
+        self.status_code = status_code
+        self.headers = headers or {}
+        self.content = b""
+
+
+class _FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+class TestAdaptiveRateLimiter(unittest.TestCase):
+    """Test cases for the scraper's per host AIMD token bucket"""
+
+    def test_throttle_halves_rate(self):
+        """Test that a 429 halves the host rate"""
+        limiter = AdaptiveRateLimiter(initial_rate=8, min_rate=1, max_rate=20)
+        limiter.acquire(HOST)
+        limiter.observe(HOST, 429, 0.1, None)
+
+        stats = limiter.stats()[HOST]
+        self.assertEqual(stats["rate"], 4)
+        self.assertEqual(stats["throttle_events"], 1)
+
+    def test_rate_bounds(self):
+        """Test that the rate stays between min_rate and max_rate"""
+        limiter = AdaptiveRateLimiter(
+            initial_rate=2, min_rate=1, max_rate=2.5, increase=1
+        )
+        for _ in range(3):
+            limiter.observe(HOST, 200, 0.1, None)
+        self.assertEqual(limiter.stats()[HOST]["rate"], 2.5)
+        for _ in range(3):
+            limiter.observe(HOST, 503, 0.1, None)
+        self.assertEqual(limiter.stats()[HOST]["rate"], 1)
+
+    def test_slow_responses_reduce_rate(self):
+        """Test that latency above target slows the host down"""
+        limiter = AdaptiveRateLimiter(initial_rate=10, target_latency=1)
+        limiter.observe(HOST, 200, 5, None)
+
+        stats = limiter.stats()[HOST]
+        self.assertEqual(stats["rate"], 9)
+        self.assertEqual(stats["slowdowns"], 1)
+
+    def test_retry_after_pauses_host(self):
+        """Test that Retry-After blocks the next token"""
+        limiter = AdaptiveRateLimiter(initial_rate=10, max_rate=10)
+        limiter.observe(HOST, 429, 0.1, "0.2")
+
+        start = time.monotonic()
+        limiter.acquire(HOST)
+        self.assertGreaterEqual(time.monotonic() - start, 0.15)
+
+    def test_parse_retry_after(self):
+        """Test Retry-After seconds and HTTP date formats"""
+        self.assertEqual(AdaptiveRateLimiter.parse_retry_after("3"), 3.0)
+        self.assertEqual(AdaptiveRateLimiter.parse_retry_after(None), 0.0)
+        self.assertEqual(
+            AdaptiveRateLimiter.parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT"), 0.0
+        )
+
+
+class TestHttpClientThrottling(unittest.TestCase):
+    """Test cases for HttpClient retries on throttled answers"""
+
+    def _client(self, responses, throttle_retries=3):
+        client = HttpClient(
+            rate_limiter=AdaptiveRateLimiter(initial_rate=100, max_rate=100),
+            throttle_retries=throttle_retries,
+        )
+        client.session = _FakeSession(responses)
+        return client
+
+    def test_throttled_request_is_retried(self):
+        """Test that a 429 is retried until the server answers"""
+        client = self._client([_FakeResponse(429), _FakeResponse(200)])
+        response = client.get(f"https://{HOST}/movie/heat/")
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(client.session.calls, 2)
+        stats = client.stats()[HOST]
+        self.assertEqual(stats["throttle_retries"], 1)
+        self.assertEqual(stats["throttle_events"], 1)
+
+    def test_retries_exhausted(self):
+        """Test that the last throttled answer is returned"""
+        client = self._client([_FakeResponse(503)] * 2, throttle_retries=1)
+        response = client.get(f"https://{HOST}/movie/heat/")
+
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(client.session.calls, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
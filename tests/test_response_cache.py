@@ -0,0 +1,123 @@
+import unittest
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from DockerETL_Images.Ingestion.MetacriticScrapper.scripts.utils.response_cache import (
+    ResponseCache,
+)
+
+
+class _FakeResponse:
+    def __init__(self, content: bytes, headers=None, status_code=200):
+        self.content = content
+        self.headers = headers or {}
+        self.status_code = status_code
+        self.encoding = "utf-8"
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test cases for the scraper's on-disk ResponseCache"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = ResponseCache(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_classify_urls(self):
+        """Test that urls are mapped to their TTL class"""
+        self.assertEqual(
+            ResponseCache.classify("https://www.metacritic.com/browse/game/?page=2"),
+            "browse",
+        )
+        self.assertEqual(
+            ResponseCache.classify("https://www.metacritic.com/movie/heat/credits/"),
+            "credits",
+        )
+        self.assertEqual(
+            ResponseCache.classify(
+                "https://backend.metacritic.com/reviews/metacritic/user/movies/heat/web?offset=0"
+            ),
+            "reviews",
+        )
+        self.assertEqual(
+            ResponseCache.classify("https://www.metacritic.com/movie/heat/"), "media"
+        )
+
+    def test_store_and_load_roundtrip(self):
+        """Test that a stored response is served back identically"""
+        url = "https://www.metacritic.com/movie/heat/"
+        self.cache.store(url, _FakeResponse("<html>é</html>".encode("utf-8")))
+
+        entry = self.cache.lookup(url)
+        self.assertIsNotNone(entry)
+        response = self.cache.load(entry)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.text, "<html>é</html>")
+
+    def test_lookup_miss(self):
+        """Test that unknown urls are not found"""
+        self.assertIsNone(self.cache.lookup("https://www.metacritic.com/movie/x/"))
+
+    def test_identical_bodies_stored_once(self):
+        """Test that bodies are content-addressed"""
+        body = b'{"data": {}}'
+        self.cache.store("https://backend.metacritic.com/a", _FakeResponse(body))
+        self.cache.store("https://backend.metacritic.com/b", _FakeResponse(body))
+
+        objects = [p for p in (Path(self.tmp_dir.name) / "objects").rglob("*")]
+        self.assertEqual(len([p for p in objects if p.is_file()]), 1)
+
+    def test_freshness_follows_url_class_ttl(self):
+        """Test that browse pages expire before credits pages"""
+        cache = ResponseCache(self.tmp_dir.name, ttls={"browse": 10, "credits": 1000})
+        browse_url = "https://www.metacritic.com/browse/tv/?page=1"
+        credits_url = "https://www.metacritic.com/tv/dark/credits/"
+        cache.store(browse_url, _FakeResponse(b"a"))
+        cache.store(credits_url, _FakeResponse(b"b"))
+
+        browse_entry = cache.lookup(browse_url)
+        credits_entry = cache.lookup(credits_url)
+        browse_entry["fetched_at"] = credits_entry["fetched_at"] = time.time() - 100
+
+        self.assertFalse(cache.is_fresh(browse_entry))
+        self.assertTrue(cache.is_fresh(credits_entry))
+
+    def test_conditional_headers(self):
+        """Test that validators become conditional request headers"""
+        url = "https://www.metacritic.com/game/zelda/"
+        self.cache.store(
+            url,
+            _FakeResponse(
+                b"x",
+                headers={"ETag": '"v1"', "Last-Modified": "Mon, 01 Jan 2024 00:00:00"},
+            ),
+        )
+
+        headers = ResponseCache.conditional_headers(self.cache.lookup(url))
+        self.assertEqual(headers["If-None-Match"], '"v1"')
+        self.assertEqual(headers["If-Modified-Since"], "Mon, 01 Jan 2024 00:00:00")
+
+    def test_parse_ttls(self):
+        """Test TTL overrides parsing from environment strings"""
+        self.assertEqual(
+            ResponseCache.parse_ttls("browse=60, credits=3600"),
+            {"browse": 60.0, "credits": 3600.0},
+        )
+        self.assertEqual(ResponseCache.parse_ttls(None), {})
+
+
+if __name__ == "__main__":
+    unittest.main()
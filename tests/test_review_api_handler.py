@@ -0,0 +1,99 @@
+import unittest
+import sys
+from pathlib import Path
+from unittest import mock
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Scrapper modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Ingestion" / "MetacriticScrapper" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from metacritic_api_handler import MetacriticReviewAPIHandler
+from utils import AdaptiveRateLimiter, HttpClient
+
+USER_AGENT = {"User-agent": "Mozilla/5.0"}
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, payload=None):
+        self.status_code = status_code
+        self.headers = {}
+        self.content = b""
+        self.payload = payload
+
+    def json(self):
+        if self.payload is None:
+            raise ValueError("No JSON body")
+        return self.payload
+
+
+class _FakeSession:
+    def __init__(self, responses):
+        self.responses = list(responses)
+        self.calls = 0
+
+    def get(self, url, headers=None, timeout=None):
+        self.calls += 1
+        return self.responses.pop(0)
+
+    def close(self):
+        pass
+
+
+class TestReviewAPIHandlerRetries(unittest.TestCase):
+    """Test cases for the review API handler retries on top of the HTTP client"""
+
+    def setUp(self):
+        # Backoff delays of the handler retry loop, the rate limiter keeps its clock
+        patcher = mock.patch("metacritic_api_handler.time")
+        self.sleep = patcher.start().sleep
+        self.addCleanup(patcher.stop)
+
+    def _client(self, responses, rate_limiter=None):
+        client = HttpClient(rate_limiter=rate_limiter, throttle_retries=1)
+        client.session = _FakeSession(responses)
+        return client
+
+    def test_throttled_answer_not_retried_twice(self):
+        """Test that a 503 retried by the client is not retried again by the handler"""
+        client = self._client(
+            [_FakeResponse(503)] * 2,
+            rate_limiter=AdaptiveRateLimiter(initial_rate=100, max_rate=100),
+        )
+        handler = MetacriticReviewAPIHandler(
+            "critic/movies/heat", USER_AGENT, http_client=client
+        )
+
+        # One retry, by the client only
+        self.assertEqual(client.session.calls, 2)
+        self.sleep.assert_not_called()
+        self.assertEqual(handler.getTotalReviews(), 0)
+        self.assertEqual(handler._init_error["type"], "throttled")
+        self.assertEqual(handler._init_error["status_code"], 503)
+
+    def test_server_error_retried_without_rate_limiter(self):
+        """Test that the handler retries server errors the client does not retry"""
+        payload = {"data": {"totalResults": 1, "items": [{"author": "A. Critic"}]}}
+        client = self._client([_FakeResponse(503), _FakeResponse(200, payload)])
+        handler = MetacriticReviewAPIHandler(
+            "critic/movies/heat", USER_AGENT, http_client=client
+        )
+
+        self.assertEqual(client.session.calls, 2)
+        self.assertEqual(self.sleep.call_count, 1)
+        self.assertEqual(handler.getTotalReviews(), 1)
+        self.assertEqual(
+            [review.author for review in handler.getReviews()], ["A. Critic"]
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
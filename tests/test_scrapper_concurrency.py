@@ -0,0 +1,281 @@
+import unittest
+import sys
+import json
+import threading
+import time
+import zlib
+from collections import Counter
+from pathlib import Path
+from urllib.parse import urlsplit
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Scrapper modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Ingestion" / "MetacriticScrapper" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from metacritic_scrapper import MetacriticScrapper
+from utils import HostLimiter, HttpClient, MetacriticCategory
+
+USER_AGENT = {"User-agent": "Mozilla/5.0"}
+PAGES = 2
+GAMES_PER_PAGE = 3
+PLATFORMS = ("pc", "ps5")
+REVIEWS_PER_SECTION = 15
+
+NAV_SPAN = "c-navigationPagination_item c-navigationPagination_item--page enabled"
+NAV_INNER_SPAN = (
+    "c-navigationPagination_itemButtonContent u-flexbox "
+    "u-flexbox-alignCenter u-flexbox-justifyCenter"
+)
+SUBCONTAINER = (
+    "c-productListings_grid g-grid-container u-grid-columns "
+    "g-inner-spacing-bottom-large"
+)
+
+
+def browse_page(page_num: int) -> str:
+    cards = "".join(
+        f'<div class="c-finderProductCard"><a class="c-finderProductCard_container" '
+        f'href="/game/game-{page_num}-{i}/">Game</a></div>'
+        for i in range(GAMES_PER_PAGE)
+    )
+    nav = "".join(
+        f'<span class="{NAV_SPAN}"><span class="{NAV_INNER_SPAN}">{n}</span></span>'
+        for n in range(1, PAGES + 1)
+    )
+    return (
+        f'<html><body><div class="c-productListings">'
+        f'<div class="{SUBCONTAINER}">{cards}</div></div>{nav}</body></html>'
+    )
+
+
+def game_page(slug: str) -> str:
+    tiles = "".join(
+        f'<a class="c-gamePlatformTileLink" href="/game/{slug}/?platform={platform}">'
+        f'<div class="g-text-medium">{platform.upper()}</div></a>'
+        for platform in PLATFORMS
+    )
+    return f"<html><body><h1>{slug}</h1>{tiles}</body></html>"
+
+
+def reviews_batch(url: str) -> dict:
+    # .../reviews/metacritic/<critic|user>/games/<slug>/platform/<p>/web?offset=N
+    parts = urlsplit(url)
+    kind, _, slug, _, platform = parts.path.split("/")[3:8]
+    offset = int(parts.query.split("=")[1])
+    count = max(0, min(10, REVIEWS_PER_SECTION - offset))
+    return {
+        "data": {
+            "totalResults": REVIEWS_PER_SECTION,
+            "items": [
+                {"author": f"{kind}-{slug}-{platform}-{offset + i}"}
+                for i in range(count)
+            ],
+        }
+    }
+
+
+class _FakeResponse:
+    def __init__(self, status_code: int, text: str):
+        self.status_code = status_code
+        self.text = text
+        self.content = text.encode()
+        self.headers = {}
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class _FakeSite:
+    """
+    Stubbed requests.Session serving a small Metacritic games catalogue.
+    Answers take a few milliseconds, varying per url so concurrent requests
+    complete out of order. Requests in flight are tracked per host.
+    """
+
+    def __init__(self, delay: float = 0.002):
+        self.delay = delay
+        self.requested = Counter()
+        self.in_flight = Counter()
+        self.max_in_flight = Counter()
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None):
+        host = urlsplit(url).netloc
+        with self._lock:
+            self.requested[url] += 1
+            self.in_flight[host] += 1
+            self.max_in_flight[host] = max(
+                self.max_in_flight[host], self.in_flight[host]
+            )
+        try:
+            time.sleep(self.delay * (1 + zlib.crc32(url.encode()) % 4))
+            return _FakeResponse(200, self._answer(url))
+        finally:
+            with self._lock:
+                self.in_flight[host] -= 1
+
+    def _answer(self, url: str) -> str:
+        parts = urlsplit(url)
+        if parts.netloc == "backend.metacritic.com":
+            return json.dumps(reviews_batch(url))
+        if parts.path.startswith("/browse/"):
+            return browse_page(int(parts.query.split("=")[1]))
+        return game_page(parts.path.split("/")[2])
+
+    def close(self):
+        pass
+
+
+def make_client(site: _FakeSite, max_requests_per_host: int = 4) -> HttpClient:
+    client = HttpClient(max_requests_per_host=max_requests_per_host)
+    client.session = site
+    return client
+
+
+def crawl(**scrapper_kwargs) -> list[tuple]:
+    # (cursor, slug, critic review authors, user review authors) of every media
+    scr = MetacriticScrapper(
+        MetacriticCategory.GAMES, user_agent=USER_AGENT, **scrapper_kwargs
+    )
+    crawled = []
+    for media in scr:
+        crawled.append(
+            (
+                scr.cursor,
+                media.element_pagination_title,
+                {
+                    section: [review.author for review in reviews]
+                    for section, reviews in media.critic_reviews.items()
+                },
+                {
+                    section: [review.author for review in reviews]
+                    for section, reviews in media.user_reviews.items()
+                },
+            )
+        )
+    scr.close()
+    return crawled
+
+
+class TestConcurrentCrawl(unittest.TestCase):
+    """Test cases for the thread-pool crawl mode of MetacriticScrapper"""
+
+    def test_media_yielded_in_sequential_order(self):
+        """Test that the concurrent crawl yields the same media, in the same order"""
+        sequential = crawl(http_client=make_client(_FakeSite()))
+        concurrent = crawl(
+            http_client=make_client(_FakeSite()),
+            max_workers=4,
+            fan_out_sections=True,
+        )
+
+        self.assertEqual(len(sequential), PAGES * GAMES_PER_PAGE)
+        self.assertEqual(concurrent, sequential)
+        # Cursor points to the browse page and element of each media
+        self.assertEqual(sequential[0][:2], ((1, 1), "game-1-0"))
+        self.assertEqual(sequential[-1][:2], ((2, 3), "game-2-2"))
+        critic_reviews = sequential[0][2]
+        self.assertEqual(list(critic_reviews), ["PC", "PS5"])
+        self.assertEqual(
+            critic_reviews["PC"],
+            [f"critic-game-1-0-pc-{i}" for i in range(REVIEWS_PER_SECTION)],
+        )
+
+    def test_host_limiter_caps_in_flight_requests(self):
+        """Test that a host never has more than max_requests_per_host requests in flight"""
+        limiter = HostLimiter(max_requests_per_host=2)
+        site = _FakeSite()
+
+        def fetch(i):
+            url = f"https://www.metacritic.com/game/game-1-{i}/"
+            with limiter.slot(url):
+                site.get(url)
+
+        threads = [threading.Thread(target=fetch, args=(i,)) for i in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sum(site.requested.values()), 8)
+        self.assertEqual(site.max_in_flight["www.metacritic.com"], 2)
+
+
+class TestSharedHttpClient(unittest.TestCase):
+    """Test cases for the pooled HTTP client shared by every fetch path"""
+
+    def test_client_caps_in_flight_requests_per_host(self):
+        """Test that the scrapper and review API requests respect the per host cap"""
+        site = _FakeSite()
+        client = make_client(site, max_requests_per_host=2)
+        crawl(http_client=client, max_workers=4, fan_out_sections=True)
+
+        # Busy enough to reach the cap on both hosts, never above it
+        self.assertEqual(site.max_in_flight["www.metacritic.com"], 2)
+        self.assertEqual(site.max_in_flight["backend.metacritic.com"], 2)
+        self.assertEqual(client.stats()["backend.metacritic.com"]["errors"], 0)
+
+
+class TestSectionFanOut(unittest.TestCase):
+    """Test cases for the per-section review fan-out"""
+
+    def _crawl_with_timeout(self, timeout=30, **scrapper_kwargs):
+        # A deadlocked crawl never returns, it is detected with the join timeout
+        result = {}
+        thread = threading.Thread(
+            target=lambda: result.update(crawled=crawl(**scrapper_kwargs)),
+            daemon=True,
+        )
+        thread.start()
+        thread.join(timeout)
+        self.assertFalse(thread.is_alive(), "crawl deadlocked")
+        return result["crawled"]
+
+    def test_nested_fan_out_single_worker(self):
+        """Test that sections waiting on their offset requests do not deadlock"""
+        site = _FakeSite()
+        crawled = self._crawl_with_timeout(
+            http_client=make_client(site, max_requests_per_host=1),
+            max_workers=1,
+            fan_out_sections=True,
+        )
+
+        self.assertEqual(len(crawled), PAGES * GAMES_PER_PAGE)
+        self.assertEqual(crawled, crawl(http_client=make_client(_FakeSite())))
+
+    def test_first_batch_fetched_once(self):
+        """Test that the offset 0 batch read for the total is reused, not fetched again"""
+        site = _FakeSite()
+        crawl(http_client=make_client(site), max_workers=2, fan_out_sections=True)
+
+        review_urls = [url for url in site.requested if "backend" in url]
+        # 6 games x 2 platforms x (critic, user) x offsets (0, 10)
+        self.assertEqual(len(review_urls), PAGES * GAMES_PER_PAGE * 2 * 2 * 2)
+        self.assertEqual({site.requested[url] for url in review_urls}, {1})
+
+
+class TestBrowsePrefetch(unittest.TestCase):
+    """Test cases for the browse page lookahead"""
+
+    def test_prefetched_pages_keep_order(self):
+        """Test that prefetched browse pages are loaded once and yield the same media"""
+        site = _FakeSite()
+        prefetched = crawl(http_client=make_client(site), browse_lookahead=2)
+
+        self.assertEqual(prefetched, crawl(http_client=make_client(_FakeSite())))
+        browse_urls = [url for url in site.requested if "/browse/" in url]
+        self.assertEqual(len(browse_urls), PAGES)
+        self.assertEqual({site.requested[url] for url in browse_urls}, {1})
+
+
+if __name__ == "__main__":
+    unittest.main()
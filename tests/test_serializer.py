@@ -0,0 +1,68 @@
+import unittest
+import sys
+import json
+from pathlib import Path
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from DockerETL_Images.Ingestion.MetacriticScrapper.scripts.utils import serializer
+
+MEDIA = {
+    "title": "Heat",
+    "media_details": {"Release Date": "Dec 15, 1995", "Genres": ["Crime"]},
+    "critic_reviews": {
+        "_default": [
+            {
+                "author": "Roger Ebert",
+                "company": "Chicago Sun-Times",
+                "quote": "Un polar à l'ancienne",
+                "rating": 100,
+                "post_date": None,
+                "full_review_src_url": None,
+                "spoiler": None,
+                "isCritic": True,
+            }
+        ]
+    },
+    "user_reviews": {},
+}
+
+
+class TestSerializer(unittest.TestCase):
+    """Test cases for the media json serializer"""
+
+    def test_roundtrip(self):
+        """Test that pretty and compact outputs decode to the same record"""
+        for pretty in (False, True):
+            data = serializer.dumps(MEDIA, pretty=pretty)
+            self.assertIsInstance(data, bytes)
+            self.assertEqual(serializer.loads(data), MEDIA)
+            self.assertEqual(json.loads(data), MEDIA)
+
+    def test_non_ascii_kept(self):
+        """Test that accents are written as utf-8, not escaped"""
+        self.assertIn("à".encode("utf-8"), serializer.dumps(MEDIA))
+
+    def test_typed_decoding_matches_untyped(self):
+        """Test that schema checked decoding returns the same record"""
+        data = serializer.dumps(MEDIA)
+        self.assertEqual(serializer.decode_media(data, typed=True), MEDIA)
+
+    @unittest.skipIf(serializer.msgspec is None, "msgspec not installed")
+    def test_typed_decoding_rejects_unknown_keys(self):
+        """Test that a record outside of the media layout raises SchemaError"""
+        data = serializer.dumps({**MEDIA, "metascore": 76})
+        with self.assertRaises(serializer.SchemaError):
+            serializer.decode_media(data, typed=True)
+        self.assertEqual(serializer.decode_media(data)["metascore"], 76)
+
+
+if __name__ == "__main__":
+    unittest.main()
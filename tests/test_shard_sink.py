@@ -0,0 +1,93 @@
+import unittest
+import sys
+import json
+import tempfile
+from pathlib import Path
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Wrangler modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Staging" / "TransformerWrangler" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+from DockerETL_Images.Ingestion.MetacriticScrapper.scripts.utils.shard_sink import (
+    ShardSink,
+)
+from DockerETL_Images.Staging.TransformerWrangler.scripts.utils.media_source_reader import (
+    MediaSourceReader,
+)
+
+
+class TestShardSink(unittest.TestCase):
+    """Test cases for the scraper ndjson shards and the wrangler reader"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cat_dir = Path(self.tmp_dir.name) / "MOVIES"
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _read(self):
+        return list(MediaSourceReader.iter_records(self.cat_dir))
+
+    def test_roundtrip_and_rolling(self):
+        """Test that records are split over shards and read back in order"""
+        sink = ShardSink(self.cat_dir, max_records_per_shard=2)
+        for i in range(5):
+            sink.write(f"movie-{i}", {"title": f"Movie {i}", "critic_reviews": {}})
+        sink.close()
+
+        self.assertEqual(len(list(self.cat_dir.glob("part-*.ndjson.gz"))), 3)
+        self.assertEqual(
+            [r["title"] for r in self._read()], [f"Movie {i}" for i in range(5)]
+        )
+
+    def test_last_write_of_slug_wins(self):
+        """Test that a re-scraped slug is only read once, with its latest record"""
+        sink = ShardSink(self.cat_dir)
+        sink.write("heat", {"title": "Heat", "v": 1})
+        sink.close()
+        sink = ShardSink(self.cat_dir)
+        self.assertIn("heat", sink)
+        sink.write("heat", {"title": "Heat", "v": 2})
+        sink.close()
+
+        self.assertEqual(self._read(), [{"title": "Heat", "v": 2}])
+
+    def test_unindexed_and_truncated_records_ignored(self):
+        """Test that writes cut by a crash do not break the reader"""
+        sink = ShardSink(self.cat_dir)
+        sink.write("heat", {"title": "Heat"})
+        sink.write("alien", {"title": "Alien"})
+        sink._shard.close()
+        sink._index.close()
+
+        shard = next(self.cat_dir.glob("part-*.ndjson.gz"))
+        shard.write_bytes(shard.read_bytes()[:-12])  # gzip trailer lost
+        with open(self.cat_dir / ShardSink.INDEX_NAME, "a", encoding="utf-8") as f:
+            f.write('{"slug": "ja')
+
+        self.assertEqual(self._read(), [{"title": "Heat"}, {"title": "Alien"}])
+
+    def test_json_files_still_read(self):
+        """Test that per media json files are read along with shards"""
+        self.cat_dir.mkdir(parents=True)
+        with open(self.cat_dir / "heat.json", "w", encoding="utf-8") as f:
+            json.dump({"title": "Heat"}, f, indent=4)
+        sink = ShardSink(self.cat_dir)
+        sink.write("alien", {"title": "Alien"})
+        sink.close()
+
+        self.assertCountEqual([r["title"] for r in self._read()], ["Heat", "Alien"])
+
+
+if __name__ == "__main__":
+    unittest.main()
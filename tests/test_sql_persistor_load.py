@@ -0,0 +1,138 @@
+import unittest
+import sys
+import os
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from sqlalchemy import func, select, text
+
+# ============================================================
+# AJOUT DU CHEMIN RACINE DU PROJET
+# ============================================================
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+# Persistor modules import their siblings from the scripts directory
+sys.path.insert(
+    0, str(ROOT / "DockerETL_Images" / "Staging" / "SQLPersistor" / "scripts")
+)
+
+# ============================================================
+# IMPORT ABSOLU PROPRE
+# ============================================================
+# Key column types are read from the environment when the models are imported
+with mock.patch.dict(
+    os.environ, {"SURROGATE_KEY_STRATEGY": "hash", "SURROGATE_KEYS": ""}
+):
+    from persistor import Persistor
+    from utils.execution import SUCCESS
+    from models import (
+        ModelsBase,
+        GenreORM,
+        MediaInfoDimORM,
+        MediaGenreBridgeORM,
+        SectionDimORM,
+        ReviewerDimORM,
+        TimeDimORM,
+        ReviewsFactORM,
+    )
+
+STAGED_ROWS = [  # Load order of the SQL persistor
+    (GenreORM, [{"id": 11, "genre_title": "crime"}]),
+    (
+        MediaInfoDimORM,
+        [
+            {
+                "id": 21,
+                "media_type": "Movie",
+                "primary_title": "Heat",
+                "release_date": "Dec 15, 1995",
+                "duration": 170.0,
+            }
+        ],
+    ),
+    (SectionDimORM, [{"id": 31, "section_type": "Display", "section_name": "_"}]),
+    (
+        ReviewerDimORM,
+        [{"id": 41, "association": "Chicago", "is_critic": True}],
+    ),
+    (TimeDimORM, [{"id": 51, "year": 1995, "month": 12, "day": 15}]),
+    (MediaGenreBridgeORM, [{"media_id": 21, "genre_id": 11, "weight": 1.0}]),
+    (
+        ReviewsFactORM,
+        [
+            {
+                "reviewer_id": 41,
+                "time_id": 51,
+                "section_id": 31,
+                "media_info_id": 21,
+                "rating": 100,
+            }
+        ],
+    ),
+]
+
+
+class TestPersistorLoad(unittest.TestCase):
+    """Test cases for re-running the DW load with deterministic keys"""
+
+    def setUp(self):
+        tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp_dir.cleanup)
+        self.persistor = Persistor(f"sqlite:///{tmp_dir.name}/dw.db", retries=1)
+        self.addCleanup(self.persistor.engine.dispose)
+
+    def load(self, staged_rows) -> bool:
+        # Same transaction as SQLPersistor main: every collection or none
+        with self.persistor.session_scope() as session:
+            for orm, rows in staged_rows:
+                self.persistor.upsert_all(orm, rows, session=session)
+        return self.persistor.last_execution_status
+
+    def count(self, orm) -> int:
+        with self.persistor.engine.connect() as conn:
+            return conn.execute(select(func.count()).select_from(orm)).scalar()
+
+    def test_same_rows_loaded_twice(self):
+        """Test that a second load of the same staged rows neither fails nor duplicates"""
+        self.assertEqual(self.persistor.create_tables(ModelsBase), SUCCESS)
+        self.assertEqual(self.load(STAGED_ROWS), SUCCESS)
+        self.assertEqual(self.persistor.create_tables(ModelsBase), SUCCESS)
+        self.assertEqual(self.load(STAGED_ROWS), SUCCESS)
+
+        for orm, rows in STAGED_ROWS:
+            self.assertEqual(self.count(orm), len(rows), orm.__tablename__)
+
+    def test_reloaded_rows_are_updated(self):
+        """Test that a re-scraped value replaces the loaded one, keys kept"""
+        self.persistor.create_tables(ModelsBase)
+        self.load(STAGED_ROWS)
+        rescraped = [
+            (ReviewsFactORM, [STAGED_ROWS[-1][1][0] | {"rating": 90}] * 2),
+        ]
+        self.assertEqual(self.load(rescraped), SUCCESS)
+
+        with self.persistor.engine.connect() as conn:
+            ratings = conn.execute(select(ReviewsFactORM.rating)).scalars().all()
+        self.assertEqual(ratings, [90])
+
+    def test_key_type_change_rebuilds_tables(self):
+        """Test that string keys of a previous uuid DW are replaced by BIGINT tables"""
+        with self.persistor.engine.begin() as conn:
+            conn.execute(
+                text(
+                    'CREATE TABLE "GENRES" (id VARCHAR PRIMARY KEY, '
+                    "genre_title VARCHAR NOT NULL)"
+                )
+            )
+            conn.execute(text("INSERT INTO \"GENRES\" VALUES ('uuid-1', 'crime')"))
+
+        self.assertEqual(self.persistor.migrate_key_columns(ModelsBase), ["GENRES"])
+        self.assertEqual(self.persistor.create_tables(ModelsBase), SUCCESS)
+        self.assertEqual(self.persistor.migrate_key_columns(ModelsBase), [])
+        self.assertEqual(self.count(GenreORM), 0)
+        self.assertEqual(self.load(STAGED_ROWS), SUCCESS)
+
+
+if __name__ == "__main__":
+    unittest.main()